@@ -0,0 +1,297 @@
+"""
+gbHam Archive
+Hot/cold tiering of old entries into per-year SQLite files.
+
+Almost every read hits the first pages of the guestbook, yet the whole
+history lives in one table. Entries older than ARCHIVE_AFTER_DAYS are moved
+into `ARCHIVE_DIR/gbham_<year>.db`, so the live table and its indexes stay
+small enough to remain in the page cache.
+
+Archived years stay readable: deep pagination, search and CSV export ATTACH
+the yearly files one at a time. Because only entries older than every live
+entry are archived, the sources form one continuous newest-first sequence:
+live database, then the archive years in descending order.
+
+Archiving relies on ATTACH and is only available with SQLite; with
+PostgreSQL the live table is the only source (use partitioning there).
+"""
+
+import logging
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import is_sqlite
+from app.models import GuestbookEntry
+from app.search import FTS_TABLE_DDL
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# AppSettings key holding the number of archived entries
+ARCHIVED_COUNT_KEY = "archived_entries"
+
+ARCHIVE_FILE_PATTERN = re.compile(r"^gbham_(\d{4})\.db$")
+
+ENTRY_COLUMNS = "id, callsign, message, runde_datetime, created_at"
+
+
+@dataclass
+class ArchiveReport:
+    """Entries moved into one yearly archive file."""
+
+    year: int
+    moved: int
+
+
+def archive_path(year: int) -> str:
+    """Path of the archive file for a year."""
+    return os.path.join(settings.ARCHIVE_DIR, f"gbham_{year}.db")
+
+
+def archive_years() -> List[int]:
+    """Years that have an archive file, newest first."""
+    if not os.path.isdir(settings.ARCHIVE_DIR):
+        return []
+    years = [
+        int(match.group(1))
+        for match in map(ARCHIVE_FILE_PATTERN.match, os.listdir(settings.ARCHIVE_DIR))
+        if match
+    ]
+    return sorted(years, reverse=True)
+
+
+def _attach(connection: Connection, year: int) -> str:
+    alias = f"archive_{year}"
+    connection.exec_driver_sql(f"ATTACH DATABASE ? AS {alias}", (archive_path(year),))
+    return alias
+
+
+def _detach(connection: Connection, alias: str):
+    connection.exec_driver_sql(f"DETACH DATABASE {alias}")
+
+
+@contextmanager
+def attached(db: Session, year: int) -> Iterator[str]:
+    """Attach one archive year to the session's connection; yields the schema alias."""
+    connection = db.connection()
+    alias = _attach(connection, year)
+    try:
+        yield alias
+    finally:
+        _detach(connection, alias)
+
+
+def entry_sources(
+    db: Session,
+    newest_first: bool = True,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+) -> Iterator[Optional[str]]:
+    """
+    Yield the schema of every entry source in time order.
+
+    None stands for the live database; archive years are attached while the
+    consumer works with them and detached when it moves on (or stops early).
+    `min_year`/`max_year` skip archive years that cannot contain matches.
+    """
+    if not is_sqlite(db.get_bind()):
+        yield None
+        return
+    years = [
+        year for year in archive_years()
+        if (min_year is None or year >= min_year) and (max_year is None or year <= max_year)
+    ]
+    if newest_first:
+        yield None
+        for year in years:
+            with attached(db, year) as alias:
+                yield alias
+    else:
+        for year in reversed(years):
+            with attached(db, year) as alias:
+                yield alias
+        yield None
+
+
+def source_query(db: Session, schema: Optional[str], *columns):
+    """
+    Entry query against the live database (None) or an attached archive.
+
+    Queries full GuestbookEntry objects, or only the given columns.
+    """
+    query = db.query(*columns) if columns else db.query(GuestbookEntry)
+    if schema is not None:
+        query = query.execution_options(schema_translate_map={None: schema})
+    return query
+
+
+def archive_boundary(connection: Connection) -> Optional[datetime]:
+    """
+    created_at of the newest archived entry, or None without archives.
+
+    Live entries must be newer than this (see the module docstring); writers
+    that take created_at from their input (CSV import) check against it.
+    Needs a connection outside a transaction, like archive_entries.
+    """
+    if not is_sqlite(connection):
+        return None
+    for year in archive_years():
+        alias = _attach(connection, year)
+        try:
+            newest = connection.execute(
+                text(f"SELECT MAX(created_at) FROM {alias}.guestbook_entries")
+            ).scalar()
+        finally:
+            connection.rollback()
+            _detach(connection, alias)
+        if newest is not None:
+            return datetime.fromisoformat(str(newest))
+    return None
+
+
+def archived_count() -> int:
+    """Number of archived entries (from the cached runtime settings)."""
+    from app.runtime_settings import runtime_settings
+    return int(runtime_settings.get(ARCHIVED_COUNT_KEY, "0"))
+
+
+def _create_archive_schema(connection: Connection, alias: str):
+    translated = connection.execution_options(schema_translate_map={None: alias})
+    GuestbookEntry.__table__.create(bind=translated, checkfirst=True)
+    connection.execute(text(FTS_TABLE_DDL.format(schema=f"{alias}.")))
+
+
+def _count(connection: Connection, alias: str) -> int:
+    return connection.execute(text(f"SELECT COUNT(*) FROM {alias}.guestbook_entries")).scalar()
+
+
+def archive_entries(connection: Connection, older_than_days: Optional[int] = None) -> List[ArchiveReport]:
+    """
+    Move entries older than the cutoff into their yearly archive files.
+
+    Needs its own connection (not a session's), because archive files can
+    only be detached outside a transaction. The entry with the highest id
+    is never archived, so SQLite never reuses an archived id, and neither
+    is anything newer than it: an imported row can be old yet have the
+    highest id, and live entries must stay newer than archived ones.
+
+    In WAL mode a transaction spanning attached files is atomic per file
+    only; entries are therefore copied first (idempotently) and then
+    deleted, so an interrupted run can at worst be repeated, never lose
+    entries.
+    """
+    if not is_sqlite(connection):
+        raise ValueError("Archivierung ist nur mit SQLite verfügbar")
+    if older_than_days is None:
+        older_than_days = settings.ARCHIVE_AFTER_DAYS
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).replace(tzinfo=None)
+    os.makedirs(settings.ARCHIVE_DIR, exist_ok=True)
+
+    oldest, retained = connection.execute(
+        text(
+            "SELECT MIN(created_at), "
+            "(SELECT created_at FROM guestbook_entries ORDER BY id DESC LIMIT 1) "
+            "FROM guestbook_entries"
+        )
+    ).one()
+    connection.commit()
+    if oldest is None:
+        return []
+    oldest = datetime.fromisoformat(str(oldest))
+    cutoff = min(cutoff, datetime.fromisoformat(str(retained)))
+    if oldest >= cutoff:
+        return []
+
+    reports = []
+    for year in range(oldest.year, cutoff.year + 1):
+        start = datetime(year, 1, 1)
+        end = min(datetime(year + 1, 1, 1), cutoff)
+        params = {"start": str(start), "end": str(end)}
+        where = "created_at >= :start AND created_at < :end"
+
+        found = connection.execute(
+            text(f"SELECT 1 FROM guestbook_entries WHERE {where} LIMIT 1"), params
+        ).first()
+        connection.commit()
+        if not found:
+            continue
+
+        alias = _attach(connection, year)
+        try:
+            _create_archive_schema(connection, alias)
+            connection.commit()
+
+            connection.execute(
+                text(
+                    f"INSERT OR IGNORE INTO {alias}.guestbook_entries ({ENTRY_COLUMNS}) "
+                    f"SELECT {ENTRY_COLUMNS} FROM main.guestbook_entries WHERE {where}"
+                ),
+                params,
+            )
+            connection.commit()
+            moved = connection.execute(
+                text(f"DELETE FROM main.guestbook_entries WHERE {where}"), params
+            ).rowcount
+            connection.commit()
+            connection.execute(text(f"INSERT INTO {alias}.guestbook_fts (guestbook_fts) VALUES ('rebuild')"))
+            connection.commit()
+        finally:
+            connection.rollback()
+            _detach(connection, alias)
+
+        logger.info(f"Archived {moved} entries into {archive_path(year)}")
+        reports.append(ArchiveReport(year, moved))
+
+    return reports
+
+
+def delete_archived_entry(connection: Connection, entry_id: int) -> Optional[str]:
+    """Delete an entry from the archive. Returns its callsign, or None if not found."""
+    if not is_sqlite(connection):
+        return None
+    for year in archive_years():
+        alias = _attach(connection, year)
+        try:
+            row = connection.execute(
+                text(f"SELECT callsign, message FROM {alias}.guestbook_entries WHERE id = :id"),
+                {"id": entry_id},
+            ).first()
+            if row is None:
+                continue
+            connection.execute(
+                text(
+                    f"INSERT INTO {alias}.guestbook_fts (guestbook_fts, rowid, callsign, message) "
+                    "VALUES ('delete', :id, :callsign, :message)"
+                ),
+                {"id": entry_id, "callsign": row.callsign, "message": row.message},
+            )
+            connection.execute(
+                text(f"DELETE FROM {alias}.guestbook_entries WHERE id = :id"), {"id": entry_id}
+            )
+            connection.commit()
+            return row.callsign
+        finally:
+            connection.rollback()
+            _detach(connection, alias)
+    return None
+
+
+def update_archived_count(db: Session) -> int:
+    """Recount archived entries and publish the total via runtime settings."""
+    from app.runtime_settings import runtime_settings
+
+    total = 0
+    for year in archive_years() if is_sqlite(db.get_bind()) else []:
+        with attached(db, year) as alias:
+            total += _count(db.connection(), alias)
+    runtime_settings.set(db, ARCHIVED_COUNT_KEY, str(total))
+    return total
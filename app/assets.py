@@ -0,0 +1,193 @@
+"""
+gbHam Static Assets
+Minified, content-hashed static files served from memory.
+
+At startup the files in app/static are minified (CSS, SVG), hashed and
+compressed (gzip, Brotli if installed) once. Templates link them with
+`static_url("style.css")`, which returns the hashed name
+(/static/style.3f2a9c1b7d4e.css). A hashed name changes whenever the
+content does, so browsers and proxies may cache it forever: upgrades never
+serve stale CSS. Unhashed names keep working for external links.
+
+`python -m app.cli build-assets` writes the same files, with .gz/.br
+variants and a manifest.json, to a directory for serving by a web server
+or CDN.
+"""
+
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.compression import Precompressed, PrecompressedStaticFiles, encoded_etag, strip_encoding
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = "app/static"
+URL_PREFIX = "/static"
+
+# Hashed assets never change under their name
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+HASH_LENGTH = 12
+
+FILE_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def minify_css(text: str) -> str:
+    """Remove comments and insignificant whitespace from a stylesheet."""
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    # Not around ":" - "a :hover" and "a:hover" differ
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    text = text.replace(";}", "}")
+    return text.strip()
+
+
+def minify_svg(text: str) -> str:
+    """Remove comments and whitespace between tags from an SVG file."""
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
+    text = re.sub(r">\s+<", "><", text)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*(/?>)", r"\1", text)
+    return text.strip()
+
+
+MINIFIERS = {
+    ".css": minify_css,
+    ".svg": minify_svg,
+}
+
+
+@dataclass
+class Asset:
+    """A processed static file."""
+
+    name: str
+    hashed_name: str
+    media_type: str
+    content: Precompressed
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.hashed_name}"'
+
+
+def hashed_name(name: str, body: bytes) -> str:
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(body).hexdigest()[:HASH_LENGTH]}{suffix}"
+
+
+class AssetPipeline:
+    """Processed assets by original and by hashed name."""
+
+    def __init__(self, source_dir: str = SOURCE_DIR):
+        self.source_dir = source_dir
+        self._by_name: Dict[str, Asset] = {}
+        self._by_hashed_name: Dict[str, Asset] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self) -> List[Asset]:
+        """(Re)process every file in the source directory."""
+        by_name, by_hashed_name = {}, {}
+        for name in sorted(os.listdir(self.source_dir)):
+            path = os.path.join(self.source_dir, name)
+            if not os.path.isfile(path) or name.startswith("."):
+                continue
+            with open(path, "rb") as f:
+                body = f.read()
+            minify = MINIFIERS.get(os.path.splitext(name)[1].lower())
+            if minify is not None:
+                body = minify(body.decode("utf-8")).encode("utf-8")
+            asset = Asset(
+                name=name,
+                hashed_name=hashed_name(name, body),
+                media_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+                content=Precompressed.of(body),
+            )
+            by_name[name] = by_hashed_name[asset.hashed_name] = asset
+
+        with self._lock:
+            self._by_name, self._by_hashed_name = by_name, by_hashed_name
+            self._built = True
+        logger.info(f"Static assets built: {len(by_name)} files")
+        return list(by_name.values())
+
+    def _ensure_built(self):
+        if not self._built:
+            self.build()
+
+    def url(self, name: str) -> str:
+        """URL of an asset; the hashed name if the file is known."""
+        self._ensure_built()
+        asset = self._by_name.get(name)
+        return f"{URL_PREFIX}/{asset.hashed_name if asset else name}"
+
+    def get(self, hashed_name: str) -> Optional[Asset]:
+        self._ensure_built()
+        return self._by_hashed_name.get(hashed_name)
+
+    def write(self, output_dir: str) -> List[Asset]:
+        """Write hashed files, compressed variants and manifest.json to a directory."""
+        assets = self.build()
+        os.makedirs(output_dir, exist_ok=True)
+        for asset in assets:
+            target = os.path.join(output_dir, asset.hashed_name)
+            with open(target, "wb") as f:
+                f.write(asset.content.body)
+            for encoding, body in asset.content.variants.items():
+                with open(target + FILE_SUFFIXES[encoding], "wb") as f:
+                    f.write(body)
+        with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({a.name: a.hashed_name for a in assets}, f, indent=2, sort_keys=True)
+        return assets
+
+
+class AssetStaticFiles(PrecompressedStaticFiles):
+    """
+    Static file handler that serves hashed assets from memory.
+
+    Other paths (original names, files added after startup) fall back to
+    the files on disk.
+    """
+
+    def __init__(self, pipeline: "AssetPipeline", *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pipeline = pipeline
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self.pipeline.get(path) if scope["method"] in ("GET", "HEAD") else None
+        if asset is None:
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding, body = asset.content.select(request_headers.get("accept-encoding", ""))
+        headers = {
+            **asset.content.headers(encoding),
+            "ETag": encoded_etag(asset.etag, encoding),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        }
+        if_none_match = request_headers.get("if-none-match", "")
+        if asset.etag in [strip_encoding(tag.strip(" W/")) for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+
+# Global pipeline
+assets = AssetPipeline()
+
+
+def static_url(name: str) -> str:
+    """Template helper: URL of a static file."""
+    return assets.url(name)
@@ -0,0 +1,185 @@
+"""
+gbHam Command Line Interface
+Maintenance commands for operators.
+
+Usage:
+    python -m app.cli migrate [--dry-run] [--database PATH]
+    python -m app.cli recount-entries
+    python -m app.cli archive [--older-than-days N]
+    python -m app.cli import-csv FILE [--batch-size N]
+    python -m app.cli build-assets [--output DIR]
+"""
+
+import argparse
+import logging
+import sys
+
+from sqlalchemy.engine import make_url
+
+from app.config import get_settings
+from app.database import SessionLocal, engine, init_db, is_sqlite
+
+settings = get_settings()
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """Apply pending schema migrations, or estimate their cost on a copy."""
+    from app.migrations import dry_run, pending_migrations, run_migrations
+
+    if args.dry_run:
+        if not is_sqlite(engine):
+            print("--dry-run ist nur mit SQLite verfügbar", file=sys.stderr)
+            return 1
+        path = args.database or make_url(settings.DATABASE_URL).database
+        print(f"Probelauf auf Kopie von {path}")
+        reports = dry_run(path)
+    else:
+        for migration in pending_migrations(engine):
+            print(f"Ausstehend: {migration.version} - {migration.description}")
+        reports = run_migrations(engine)
+
+    for report in reports:
+        print(f"{report.version:>4}  {report.seconds:>8.3f}s  {report.description}")
+    print(f"{len(reports)} Migration(en), {sum(r.seconds for r in reports):.3f}s gesamt")
+    return 0
+
+
+def cmd_recount_entries(args: argparse.Namespace) -> int:
+    """Recount all entries and repair the entry counter."""
+    from app.counters import recount_entries
+
+    init_db()
+    db = SessionLocal()
+    try:
+        total = recount_entries(db)
+    finally:
+        db.close()
+    print(f"Einträge gesamt: {total}")
+    return 0
+
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    """Move old entries into the yearly archive files."""
+    from app.archive import archive_entries, update_archived_count
+
+    if not is_sqlite(engine):
+        print("Archivierung ist nur mit SQLite verfügbar", file=sys.stderr)
+        return 1
+
+    init_db()
+    with engine.connect() as connection:
+        reports = archive_entries(connection, args.older_than_days)
+
+    db = SessionLocal()
+    try:
+        archived = update_archived_count(db)
+    finally:
+        db.close()
+
+    for report in reports:
+        print(f"{report.year}: {report.moved} Einträge archiviert")
+    print(f"Archivierte Einträge gesamt: {archived}")
+    return 0
+
+
+def cmd_import_csv(args: argparse.Namespace) -> int:
+    """Import entries from a CSV file in the export format."""
+    from app.importer import import_csv
+
+    init_db()
+    with open(args.file, encoding="utf-8-sig", errors="replace", newline="") as f:
+        try:
+            report = import_csv(f, batch_size=args.batch_size)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+
+    for rejected in report.rejected:
+        print(f"Zeile {rejected.line}: {rejected.reason}")
+    if report.rejected_count > len(report.rejected):
+        print(f"... und {report.rejected_count - len(report.rejected)} weitere")
+    print(
+        f"{report.imported} importiert, {report.rejected_count} abgelehnt, "
+        f"{report.seconds:.2f}s ({report.rows_per_second:.0f} Zeilen/s)"
+    )
+    return 0
+
+
+def cmd_build_assets(args: argparse.Namespace) -> int:
+    """Write minified, content-hashed static files for a web server or CDN."""
+    from app.assets import assets
+
+    for asset in assets.write(args.output):
+        variants = ", ".join(sorted(asset.content.variants)) or "-"
+        print(f"{asset.name} -> {asset.hashed_name} ({len(asset.content.body)} Bytes; {variants})")
+    print(f"Geschrieben nach {args.output}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="gbHam Wartung")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate", help="Datenbankschema aktualisieren")
+    migrate.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Auf einer Kopie ausführen und Dauer je Schritt melden",
+    )
+    migrate.add_argument("--database", help="Pfad zur SQLite-Datei (für --dry-run)")
+    migrate.set_defaults(func=cmd_migrate)
+
+    recount = subparsers.add_parser(
+        "recount-entries",
+        help="Eintragszähler neu berechnen und reparieren",
+    )
+    recount.set_defaults(func=cmd_recount_entries)
+
+    archive = subparsers.add_parser(
+        "archive",
+        help="Alte Einträge in Jahresarchive verschieben",
+    )
+    archive.add_argument(
+        "--older-than-days",
+        type=int,
+        default=None,
+        help=f"Einträge älter als N Tage archivieren (Standard: {settings.ARCHIVE_AFTER_DAYS})",
+    )
+    archive.set_defaults(func=cmd_archive)
+
+    import_parser = subparsers.add_parser(
+        "import-csv",
+        help="Einträge aus einer CSV-Datei (Exportformat) importieren",
+    )
+    import_parser.add_argument("file", help="Pfad zur CSV-Datei")
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help=f"Zeilen pro Transaktion (Standard: {settings.IMPORT_BATCH_SIZE})",
+    )
+    import_parser.set_defaults(func=cmd_import_csv)
+
+    build_assets = subparsers.add_parser(
+        "build-assets",
+        help="Statische Dateien minifizieren, mit Hash benennen und vorkomprimieren",
+    )
+    build_assets.add_argument(
+        "--output",
+        default="./data/static",
+        help="Zielverzeichnis (Standard: ./data/static)",
+    )
+    build_assets.set_defaults(func=cmd_build_assets)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
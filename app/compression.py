@@ -0,0 +1,330 @@
+"""
+gbHam Compression
+Content-negotiated gzip and Brotli compression of responses.
+
+Dynamic responses above COMPRESSION_MIN_SIZE are compressed on the fly by
+CompressionMiddleware, with the cheaper COMPRESSION_LEVEL / BROTLI_QUALITY
+settings. Bodies that are served many times (cached index pages, the static
+pages, static files) are compressed once at the highest levels with
+`Precompressed.of()`; the route then sets Content-Encoding itself and the
+middleware passes the response through.
+
+Brotli is used when the `brotli` package is installed, gzip otherwise.
+Server-sent events are never compressed, since compressors buffer and
+would hold back events.
+
+Strong ETags of compressed responses get an encoding suffix ("...-gzip"),
+as the bytes differ from the identity representation; `strip_encoding`
+removes it again when checking If-None-Match.
+"""
+
+import gzip
+import os
+import threading
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+settings = get_settings()
+
+# Supported codings in order of preference
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Never compressed: compressors buffer, which would delay events
+STREAMING_TYPES = ("text/event-stream",)
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(STREAMING_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Returns the acceptable coding with the highest q-value (ties go to the
+    order of `available`), or None for the identity encoding.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of the `encoding` representation of a strong ETag."""
+    if not encoding or not etag.endswith('"') or etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_encoding(etag: str) -> str:
+    """Undo `encoded_etag`."""
+    for encoding in ("br", "gzip"):
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def vary_on_encoding(headers: MutableHeaders):
+    """Add Accept-Encoding to Vary unless a precompressed response already did."""
+    tokens = {token.strip().lower() for token in headers.get("vary", "").split(",")}
+    if "accept-encoding" not in tokens and "*" not in tokens:
+        headers.add_vary_header("Accept-Encoding")
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a complete body; `level` defaults to the best compression."""
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if level is None else level)
+    return gzip.compress(body, compresslevel=9 if level is None else level, mtime=0)
+
+
+@dataclass
+class Precompressed:
+    """A body together with its compressed variants."""
+
+    body: bytes
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, body: bytes, brotli_quality: Optional[int] = None) -> "Precompressed":
+        variants = {}
+        if len(body) >= settings.COMPRESSION_MIN_SIZE:
+            for encoding in ENCODINGS:
+                compressed = compress(body, encoding, brotli_quality if encoding == "br" else None)
+                if len(compressed) < len(body):
+                    variants[encoding] = compressed
+        return cls(body, variants)
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """The best variant for an Accept-Encoding header: (encoding, bytes)."""
+        encoding = negotiate_encoding(accept_encoding, self.variants)
+        if encoding is None:
+            return None, self.body
+        return encoding, self.variants[encoding]
+
+    def headers(self, encoding: Optional[str]) -> Dict[str, str]:
+        """Content-Encoding / Vary headers for a selected variant."""
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+
+class _Compressor:
+    """Incremental compressor for streamed bodies."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            # wbits 31: gzip container
+            self._zlib = zlib.compressobj(settings.COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress compressible responses the client accepts in compressed form.
+
+    Responses that already carry a Content-Encoding, small responses and
+    event streams are passed through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.COMPRESSION_MIN_SIZE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        responder = _CompressionResponder(
+            self.app, encoding, self.minimum_size, request_headers.get("if-none-match", "")
+        )
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: Optional[str], minimum_size: int, if_none_match: str):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.if_none_match = if_none_match
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if message["status"] == 304 and "etag" in headers:
+                # Confirm the validator of the variant the client holds
+                variant = encoded_etag(headers["etag"], self.encoding)
+                if variant in self.if_none_match:
+                    headers["ETag"] = variant
+            compressible = is_compressible(headers.get("content-type", ""))
+            if compressible:
+                # The representation depends on Accept-Encoding, even when sent as is
+                vary_on_encoding(headers)
+            self.passthrough = (
+                self.encoding is None or not compressible or "content-encoding" in headers
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Hold the headers back until the size of the body is known
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoding
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+            if more_body:
+                del headers["content-length"]
+                self.compressor = _Compressor(self.encoding)
+                body = self.compressor.process(body)
+            else:
+                body = compress(
+                    body,
+                    self.encoding,
+                    settings.BROTLI_QUALITY if self.encoding == "br" else settings.COMPRESSION_LEVEL,
+                )
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        body = self.compressor.process(body)
+        if not more_body:
+            body += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serve compressed variants of text assets.
+
+    Each file is compressed once (at the best levels) and kept in memory
+    until it changes on disk.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._variants: Dict[str, Tuple[float, int, Precompressed]] = {}
+        self._lock = threading.Lock()
+
+    def _precompressed(self, path: str, stat_result: os.stat_result) -> Precompressed:
+        with self._lock:
+            cached = self._variants.get(path)
+            if cached and cached[:2] == (stat_result.st_mtime, stat_result.st_size):
+                return cached[2]
+        with open(path, "rb") as f:
+            content = Precompressed.of(f.read())
+        with self._lock:
+            self._variants[path] = (stat_result.st_mtime, stat_result.st_size, content)
+        return content
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if not isinstance(response, FileResponse) or status_code != 200:
+            return response
+        if not is_compressible(response.media_type or ""):
+            return response
+
+        vary_on_encoding(response.headers)
+        content = self._precompressed(str(full_path), stat_result)
+        encoding, body = content.select(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return response
+
+        headers = MutableHeaders(headers={
+            k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")
+        })
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = encoded_etag(response.headers["etag"], encoding)
+        return Response(body, media_type=response.media_type, headers=dict(headers))
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None and "etag" in response_headers:
+            tags = [strip_encoding(tag.strip(" W/")) for tag in if_none_match.split(",")]
+            if response_headers["etag"] in tags:
+                return True
+        return super().is_not_modified(response_headers, request_headers)
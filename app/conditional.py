@@ -0,0 +1,123 @@
+"""
+gbHam Conditional Requests
+ETag / Last-Modified validators for pages and the JSON API.
+
+Clients that poll the guestbook (browsers, club websites, scripts) send
+the validators of their last copy back in If-None-Match / If-Modified-Since.
+Both are checked before any entries are loaded or templates rendered, and
+an unchanged guestbook is answered with an empty 304.
+
+ETags are strong and derived from the content version (see page_cache),
+the runtime settings version, the snapshot being read, the request's query
+and the language, plus the entry count and newest entry so that writes by
+other processes change them too. The versions restart at zero with the
+process, so a per-process nonce keeps tags from different runs apart.
+"""
+
+import hashlib
+import secrets
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.compression import strip_encoding
+from app.counters import get_entry_count
+from app.models import GuestbookEntry
+from app.page_cache import content_version
+from app.runtime_settings import runtime_settings
+
+# Distinguishes ETags of different process runs
+BOOT_NONCE = secrets.token_hex(8)
+
+
+def entity_tag(request: Request, *parts) -> str:
+    """Strong ETag for the current guestbook state as seen by this request."""
+    key = "|".join(str(p) for p in (
+        BOOT_NONCE,
+        content_version.value,
+        runtime_settings.version,
+        getattr(request.state, "data_generation", 0),
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        *parts,
+    ))
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def newest_entry_time(db: Session) -> Optional[datetime]:
+    """created_at of the newest entry (an index seek on (created_at, id))."""
+    return db.query(func.max(GuestbookEntry.created_at)).scalar()
+
+
+def last_modified(db: Session) -> datetime:
+    """
+    Last-Modified for guestbook content.
+
+    The newest entry's created_at, or the last change seen by this process
+    if later (deleting an entry or toggling read-only mode creates none).
+    """
+    newest = newest_entry_time(db)
+    changed = content_version.changed_at
+    if newest is None:
+        return changed
+    if newest.tzinfo is None:
+        newest = newest.replace(tzinfo=timezone.utc)
+    return max(newest, changed)
+
+
+def content_state(db: Session) -> Tuple[datetime, int]:
+    """Last-Modified and entry count; both are cheap lookups."""
+    return last_modified(db), get_entry_count(db)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison; compressed variants share the validator
+    candidates = [c.strip() for c in header.split(",")]
+    return any(strip_encoding(c.removeprefix("W/")) == etag for c in candidates)
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[datetime] = None) -> bool:
+    """
+    Whether the client's copy is current.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    without it (RFC 9110, section 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, modified: Optional[datetime] = None) -> Dict[str, str]:
+    """Response headers carrying the validators."""
+    headers = {
+        "ETag": etag,
+        # Allow storing, but revalidate every time
+        "Cache-Control": "no-cache",
+    }
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 response with the given validator headers."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
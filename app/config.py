@@ -19,6 +19,59 @@ class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./data/gbham.db")
 
+    # Connection pool for server databases (PostgreSQL); SQLite uses its own pools
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+
+    # SQLite tuning (applied to every new connection)
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(64 * 1024 * 1024)))  # bytes
+    SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-16000"))  # negative = KiB
+    SQLITE_TEMP_STORE: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+    SQLITE_READ_POOL_SIZE: int = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+    # Rendered index pages kept in memory (0 disables the cache)
+    PAGE_CACHE_SIZE: int = int(os.getenv("PAGE_CACHE_SIZE", "256"))
+    PAGE_CACHE_TTL: float = float(os.getenv("PAGE_CACHE_TTL", "30"))  # seconds
+
+    # Templates: compiled bytecode cache ("" disables), reload on file changes
+    TEMPLATE_CACHE_DIR: str = os.getenv("TEMPLATE_CACHE_DIR", "./data/template-cache")
+    TEMPLATE_AUTO_RELOAD: bool = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+
+    # Response compression (gzip, Brotli if installed) of dynamic responses
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))  # bytes
+    COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", "6"))  # gzip, 1-9
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "5"))  # 0-11
+
+    # CSV import: rows per executemany transaction
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+    MAX_CHECKIN_ENTRIES: int = int(os.getenv("MAX_CHECKIN_ENTRIES", "200"))
+
+    # Read replica: GET routes read from a periodically published snapshot
+    REPLICA_ENABLED: bool = os.getenv("REPLICA_ENABLED", "false").lower() == "true"
+    REPLICA_PATH: str = os.getenv("REPLICA_PATH", "./data/gbham-replica.db")
+    REPLICA_INTERVAL: float = float(os.getenv("REPLICA_INTERVAL", "5"))  # seconds
+    REPLICA_MAX_WRITES: int = int(os.getenv("REPLICA_MAX_WRITES", "100"))
+    REPLICA_MAX_STALENESS: float = float(os.getenv("REPLICA_MAX_STALENESS", "30"))  # seconds
+
+    # Hot/cold tiering: entries older than this move to per-year archive files
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "./data/archive")
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+
+    # Group commit for new entries
+    WRITE_BATCH_SIZE: int = int(os.getenv("WRITE_BATCH_SIZE", "50"))
+    WRITE_BATCH_DELAY_MS: int = int(os.getenv("WRITE_BATCH_DELAY_MS", "5"))
+
+    # Live feed (Server-Sent Events)
+    EVENTS_MAX_SUBSCRIBERS: int = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "500"))
+    EVENTS_BUFFER_SIZE: int = int(os.getenv("EVENTS_BUFFER_SIZE", "200"))
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "50"))
+    EVENTS_HEARTBEAT: float = float(os.getenv("EVENTS_HEARTBEAT", "15"))  # seconds
+
     # Security
     ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", secrets.token_urlsafe(32))
 
@@ -27,6 +80,10 @@ class Settings:
     RATE_LIMIT_WINDOW: int = int(os.getenv("RATE_LIMIT_WINDOW", "60"))  # seconds
     ENTRY_COOLDOWN: int = int(os.getenv("ENTRY_COOLDOWN", "60"))  # seconds between entries per IP
 
+    # Repeated form submissions (double clicks, browser retries)
+    IDEMPOTENCY_TTL: int = int(os.getenv("IDEMPOTENCY_TTL", "3600"))  # seconds
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+
     # Content limits
     MAX_MESSAGE_LENGTH: int = 300
     MAX_CALLSIGN_LENGTH: int = 15
@@ -36,10 +93,15 @@ class Settings:
 
     # Language (de, en, it, sl)
     DEFAULT_LANGUAGE: str = os.getenv("DEFAULT_LANGUAGE", "de")
+    # Optional directory of <lang>.json catalogs (extra languages, overrides)
+    TRANSLATIONS_DIR: str = os.getenv("TRANSLATIONS_DIR", "")
 
     # Read-only mode
     READ_ONLY_MODE: bool = os.getenv("READ_ONLY_MODE", "false").lower() == "true"
 
+    # Seconds between checks for settings changed by other workers
+    SETTINGS_REFRESH_INTERVAL: float = float(os.getenv("SETTINGS_REFRESH_INTERVAL", "2"))
+
     # Operator contact (for privacy notice and imprint)
     OPERATOR_NAME: str = os.getenv("OPERATOR_NAME", "Funkrundenbetreiber")
     OPERATOR_EMAIL: str = os.getenv("OPERATOR_EMAIL", "kontakt@example.com")
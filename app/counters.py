@@ -0,0 +1,105 @@
+"""
+gbHam Entry Counter
+O(1) entry count kept in sync by database triggers.
+
+Pagination needs the total number of entries on every page view. Instead of
+running COUNT(*) per request, the count lives in the singleton
+`entry_count` row. Insert and delete triggers on `guestbook_entries` update
+it inside the same transaction as the change, so every write path (ORM,
+bulk inserts, raw SQL) stays consistent. PostgreSQL gets the same triggers
+as a PL/pgSQL function.
+"""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import is_sqlite
+from app.models import EntryCount, GuestbookEntry
+
+logger = logging.getLogger(__name__)
+
+ENTRY_COUNT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS entry_count_after_insert
+    AFTER INSERT ON guestbook_entries
+    BEGIN
+        UPDATE entry_count SET total = total + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entry_count_after_delete
+    AFTER DELETE ON guestbook_entries
+    BEGIN
+        UPDATE entry_count SET total = total - 1 WHERE id = 1;
+    END
+    """,
+]
+
+POSTGRES_ENTRY_COUNT_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION entry_count_change() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE entry_count SET total = total + 1 WHERE id = 1;
+        ELSE
+            UPDATE entry_count SET total = total - 1 WHERE id = 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS entry_count_after_change ON guestbook_entries",
+    """
+    CREATE TRIGGER entry_count_after_change
+    AFTER INSERT OR DELETE ON guestbook_entries
+    FOR EACH ROW EXECUTE FUNCTION entry_count_change()
+    """,
+]
+
+
+def install_entry_counter(connection: Connection):
+    """Create the counter triggers and seed the counter row if missing."""
+    if is_sqlite(connection):
+        for ddl in ENTRY_COUNT_TRIGGERS:
+            connection.execute(text(ddl))
+        connection.execute(text(
+            "INSERT OR IGNORE INTO entry_count (id, total) "
+            "SELECT 1, COUNT(*) FROM guestbook_entries"
+        ))
+    else:
+        for ddl in POSTGRES_ENTRY_COUNT_TRIGGERS:
+            connection.execute(text(ddl))
+        connection.execute(text(
+            "INSERT INTO entry_count (id, total) "
+            "SELECT 1, COUNT(*) FROM guestbook_entries "
+            "ON CONFLICT (id) DO NOTHING"
+        ))
+
+
+def get_entry_count(db: Session) -> int:
+    """Get the number of guestbook entries without scanning the table."""
+    total = db.query(EntryCount.total).filter(EntryCount.id == 1).scalar()
+    if total is None:
+        # Counter not installed yet - fall back to a full count
+        return db.query(GuestbookEntry).count()
+    return total
+
+
+def recount_entries(db: Session) -> int:
+    """Recount all entries from scratch and repair the counter row."""
+    total = db.query(GuestbookEntry).count()
+    counter = db.get(EntryCount, 1)
+    if counter is None:
+        db.add(EntryCount(id=1, total=total))
+        previous = None
+    else:
+        previous = counter.total
+        counter.total = total
+    db.commit()
+
+    if previous != total:
+        logger.warning(f"Entry counter repaired: {previous} -> {total}")
+    return total
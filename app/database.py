@@ -1,37 +1,200 @@
 """
 gbHam Database Connection
-SQLAlchemy setup with SQLite.
+SQLAlchemy setup for SQLite (default) and PostgreSQL.
+
+SQLite allows many concurrent readers but only one writer. The app therefore
+uses two engines on the same file: a pool of read-only connections for page
+rendering and GET endpoints, and a single writer connection for POST and
+admin routes. WAL journaling lets the readers keep working while a write
+transaction commits.
+
+PostgreSQL handles concurrent writers itself, so both roles share one pool
+sized by DB_POOL_SIZE / DB_MAX_OVERFLOW; readers get READ ONLY transactions.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
 
 settings = get_settings()
 
-# Create engine with SQLite-specific settings
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Required for SQLite
-    pool_pre_ping=True,
-)
+
+def sqlite_pragmas(readonly: bool = False) -> Dict[str, object]:
+    """Per-connection pragmas derived from settings."""
+    pragmas: Dict[str, object] = {
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+    if readonly:
+        pragmas["query_only"] = "ON"
+    else:
+        # journal_mode is persistent in the file; the writer sets it
+        pragmas = {"journal_mode": settings.SQLITE_JOURNAL_MODE, **pragmas}
+    return pragmas
+
+
+def is_sqlite_url(url: str) -> bool:
+    """Check whether a database URL points to SQLite."""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def is_sqlite(bind) -> bool:
+    """Check whether an engine, connection or session bind uses SQLite."""
+    return bind.dialect.name == "sqlite"
+
+
+# Largest value of a 64-bit INTEGER / BIGINT column
+MAX_SQL_INTEGER = 2 ** 63 - 1
+
+
+def sql_integer(value: str) -> int:
+    """Parse an integer for a query parameter, raising ValueError if it does not fit 64 bits."""
+    number = int(value)
+    if not -MAX_SQL_INTEGER - 1 <= number <= MAX_SQL_INTEGER:
+        raise ValueError(f"Zahl außerhalb des gültigen Bereichs: {value}")
+    return number
+
+
+def is_memory_url(url: str) -> bool:
+    """Check whether a SQLite URL is an in-memory database."""
+    database = make_url(url).database
+    return not database or database == ":memory:"
+
+
+def create_sqlite_engine(
+    url: str,
+    readonly: bool = False,
+    pool_size: int = 1,
+    pragmas: Optional[Dict[str, object]] = None,
+) -> Engine:
+    """
+    Create a SQLite engine with tuned per-connection pragmas.
+
+    Writer engines get exactly one pooled connection so that writes are
+    serialized in-process instead of fighting over the file lock.
+    Reader engines are marked query_only.
+    """
+    if pragmas is None:
+        pragmas = sqlite_pragmas(readonly=readonly)
+
+    pool_kwargs = {}
+    if not is_memory_url(url):
+        pool_kwargs = {"poolclass": QueuePool, "pool_size": pool_size, "max_overflow": 0}
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Required for SQLite
+        **pool_kwargs,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+def create_server_engine(url: str) -> Engine:
+    """
+    Create an engine for a client/server database such as PostgreSQL.
+
+    Connections are checked before use and recycled periodically, so a
+    restarted database or an idle timeout in a proxy (e.g. PgBouncer) does
+    not surface as errors in requests. Sessions run in UTC because the
+    models store naive UTC timestamps.
+    """
+    connect_args = {}
+    if make_url(url).get_backend_name() == "postgresql":
+        connect_args["options"] = "-c timezone=UTC"
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+if is_sqlite_url(settings.DATABASE_URL):
+    # Single writer connection for POST/admin routes
+    engine = create_sqlite_engine(settings.DATABASE_URL)
+
+    # Read-only pool for GET routes (in-memory databases cannot be shared)
+    if is_memory_url(settings.DATABASE_URL):
+        read_engine = engine
+    else:
+        read_engine = create_sqlite_engine(
+            settings.DATABASE_URL,
+            readonly=True,
+            pool_size=settings.SQLITE_READ_POOL_SIZE,
+        )
+else:
+    engine = create_server_engine(settings.DATABASE_URL)
+    # Same pool, but every reader transaction is READ ONLY
+    read_engine = engine.execution_options(postgresql_readonly=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency for database session."""
-    db = SessionLocal()
+class AsyncDB:
+    """
+    Async handle for a blocking SQLAlchemy session.
+
+    Route handlers are `async def`, so calling the session directly would
+    block the event loop for the duration of every query. Instead, database
+    work is passed as a function and runs in Starlette's threadpool:
+
+        entries = await db.run(load_entries, limit)   # load_entries(session, limit)
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(session, *args, **kwargs) in the threadpool."""
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def close(self):
+        """Close the session and return its connection to the pool."""
+        await run_in_threadpool(self.session.close)
+
+
+async def get_db():
+    """Dependency for a read-only database session (GET routes)."""
+    db = AsyncDB(ReadSessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_write_db():
+    """Dependency for a session on the single writer connection."""
+    db = AsyncDB(SessionLocal())
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
 
 def init_db():
-    """Initialize database tables."""
-    from app import models  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    """Bring the database schema up to date."""
+    from app.migrations import run_migrations
+    run_migrations(engine)
@@ -0,0 +1,209 @@
+"""
+gbHam Live Events
+In-process broadcast hub for the Server-Sent Events feed.
+
+During a net, listeners keep /api/entries/events open instead of reloading
+the index page. create_entry and delete_entry publish to the hub; the hub
+hands each event to every open connection without touching the database,
+so the number of listeners does not add queries.
+
+Event ids are "<boot>.<sequence>". The last EVENTS_BUFFER_SIZE events are
+kept, so a browser that reconnects with Last-Event-ID gets what it missed.
+If the id is older than the buffer or from before a restart, the client
+receives a `reset` event and should reload the page instead.
+
+Every connection has a queue of at most EVENTS_QUEUE_SIZE events. A
+client that falls that far behind is disconnected rather than buffered
+for; its EventSource reconnects and catches up from the ring buffer. At
+most EVENTS_MAX_SUBSCRIBERS connections are accepted.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, List, Optional, Set
+
+from app.config import get_settings
+from app.models import naive_utc
+from app.serialization import ENTRY_FIELDS, dumps
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Reconnect delay suggested to the browser, in milliseconds
+RETRY_MS = 3000
+
+
+class TooManySubscribers(Exception):
+    """Raised when EVENTS_MAX_SUBSCRIBERS connections are already open."""
+
+
+@dataclass
+class Event:
+    """One published event, encoded once for all subscribers."""
+
+    id: str
+    sequence: int
+    name: str
+    data: bytes
+
+    def encode(self) -> bytes:
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            self.id.encode(), self.name.encode(), self.data,
+        )
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One open event stream."""
+
+    queue: asyncio.Queue
+    # Events to send before the live ones (Last-Event-ID resume)
+    backlog: List[Event] = field(default_factory=list)
+    # Last-Event-ID could not be resumed; the client has to reload
+    reset: bool = False
+    # Disconnected because it fell behind
+    dropped: bool = False
+
+
+class EventHub:
+    """Fans published events out to all subscribers."""
+
+    def __init__(
+        self,
+        buffer_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        max_subscribers: Optional[int] = None,
+    ):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self.max_subscribers = (
+            max_subscribers if max_subscribers is not None else settings.EVENTS_MAX_SUBSCRIBERS
+        )
+        self.boot = str(int(time.time()))
+        self._sequence = 0
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size or settings.EVENTS_BUFFER_SIZE)
+        self._subscribers: Set[Subscription] = set()
+        # Statistics
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.boot}.{self._sequence}"
+
+    def publish(self, name: str, payload: dict) -> Event:
+        """Send an event to every subscriber. Must run on the event loop."""
+        self._sequence += 1
+        event = Event(f"{self.boot}.{self._sequence}", self._sequence, name, dumps(payload))
+        self._buffer.append(event)
+        self.published += 1
+
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+        return event
+
+    def publish_created(self, entry) -> Event:
+        """Publish a new entry, in the shape of /api/entries items."""
+        payload = {}
+        for name in ENTRY_FIELDS:
+            value = getattr(entry, name)
+            # A fresh entry still has the aware default; the database returns naive UTC
+            if isinstance(value, datetime):
+                value = naive_utc(value)
+            payload[name] = value
+        return self.publish("created", payload)
+
+    def publish_deleted(self, entry_id: int) -> Event:
+        return self.publish("deleted", {"id": entry_id})
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Open a subscription, resuming after `last_event_id` if possible."""
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers()
+
+        subscription = Subscription(queue=asyncio.Queue(maxsize=self.queue_size))
+        if last_event_id:
+            backlog = self._events_after(last_event_id)
+            if backlog is None:
+                subscription.reset = True
+            else:
+                subscription.backlog = backlog
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def close(self):
+        """End all streams (shutdown)."""
+        for subscription in list(self._subscribers):
+            self._end(subscription)
+        self._subscribers.clear()
+
+    def _events_after(self, last_event_id: str) -> Optional[List[Event]]:
+        """Buffered events after `last_event_id`, or None if it cannot be resumed."""
+        boot, _, sequence = last_event_id.partition(".")
+        if boot != self.boot or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._sequence:
+            return None
+        oldest = self._buffer[0].sequence if self._buffer else self._sequence + 1
+        if sequence < oldest - 1:
+            return None
+        return [event for event in self._buffer if event.sequence > sequence]
+
+    def _drop(self, subscription: Subscription):
+        """Disconnect a subscriber whose queue is full."""
+        subscription.dropped = True
+        self._subscribers.discard(subscription)
+        self._end(subscription)
+        self.dropped += 1
+        logger.info("Dropped slow event subscriber")
+
+    @staticmethod
+    def _end(subscription: Subscription):
+        """Discard the queued events and end the stream."""
+        queue = subscription.queue
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+async def event_stream(hub: EventHub, subscription: Subscription, heartbeat: Optional[float] = None):
+    """Encode a subscription as a text/event-stream body."""
+    heartbeat = heartbeat if heartbeat is not None else settings.EVENTS_HEARTBEAT
+    try:
+        yield b"retry: %d\n\n" % RETRY_MS
+        if subscription.reset:
+            yield b"id: %s\nevent: reset\ndata: {}\n\n" % hub.last_event_id.encode()
+        for event in subscription.backlog:
+            yield event.encode()
+        subscription.backlog = []
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Comment line; keeps proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield event.encode()
+    finally:
+        hub.unsubscribe(subscription)
+
+
+# Global hub instance
+event_hub = EventHub()
@@ -0,0 +1,117 @@
+"""
+gbHam Idempotency Keys
+Recognizes repeated submissions of the entry form.
+
+On weak portable links people click submit twice, or the browser sends the
+form again after a timeout. The form carries a random token (rendered with
+the page); the token and the submitted fields are hashed into a key. The
+key is stored in the same transaction as the entry it created, together
+with the redirect that was sent, and a second submission with the same key
+gets that redirect again instead of a second entry.
+
+Keys live for IDEMPOTENCY_TTL seconds, in a bounded in-memory LRU for the
+common case (a retry a few seconds later) and in the `idempotency_keys`
+table, so they survive a restart. Expired rows are deleted by the writer,
+at most once per PURGE_INTERVAL.
+
+The index page is cached, so visitors served the same cached page share
+its token. Because the key also covers callsign, message and runde, that
+only merges identical entries submitted within the cache lifetime, which
+would be duplicates anyway.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import IdempotencyKey
+
+settings = get_settings()
+
+# Seconds between deletions of expired keys from the database
+PURGE_INTERVAL = 300
+
+
+def idempotency_key(token: Optional[str], *fields: str) -> Optional[str]:
+    """Key for a submission, or None if the form carried no token."""
+    if not token:
+        return None
+    data = "\0".join((token, *fields)).encode("utf-8", "surrogatepass")
+    return hashlib.sha256(data).hexdigest()
+
+
+class IdempotencyStore:
+    """Recently used keys and the redirects they were answered with."""
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else settings.IDEMPOTENCY_TTL
+        self.max_entries = max_entries if max_entries is not None else settings.IDEMPOTENCY_CACHE_SIZE
+        self._keys: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        # Statistics
+        self.replays = 0
+
+    def cached(self, key: str) -> Optional[str]:
+        """Stored redirect from memory, or None."""
+        with self._lock:
+            cached = self._keys.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[0] > self.ttl:
+                del self._keys[key]
+                return None
+            return cached[1]
+
+    def lookup(self, db: Session, key: str) -> Optional[str]:
+        """Stored redirect for `key` (memory, then database), or None."""
+        location = self.cached(key)
+        if location is not None:
+            return location
+        row = (
+            db.query(IdempotencyKey.location)
+            .filter(IdempotencyKey.key == key, IdempotencyKey.created_at >= self._cutoff())
+            .first()
+        )
+        if row is None:
+            return None
+        self.remember(key, row.location)
+        return row.location
+
+    def remember(self, key: str, location: str):
+        """Keep a committed key in memory, evicting the oldest if full."""
+        with self._lock:
+            self._keys[key] = (time.monotonic(), location)
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.max_entries:
+                self._keys.popitem(last=False)
+
+    def purge(self, db: Session) -> int:
+        """Delete expired keys (within the caller's transaction), at most every PURGE_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return 0
+        self._last_purge = now
+        return (
+            db.query(IdempotencyKey)
+            .filter(IdempotencyKey.created_at < self._cutoff())
+            .delete(synchronize_session=False)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def _cutoff(self) -> datetime:
+        # Stored as naive UTC
+        return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.ttl)
+
+
+# Global store instance
+idempotency_store = IdempotencyStore()
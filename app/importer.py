@@ -0,0 +1,338 @@
+"""
+gbHam CSV Import
+Streaming import of CSV files in the format written by the admin export.
+
+Expected columns (header row required, order free, ID is ignored so
+imported entries never collide with existing ones):
+
+    ID, Rufzeichen, Nachricht, Runde, Datum
+
+Every row goes through the same checks as the guestbook form (UTF-8,
+sanitize_input, GuestbookEntryCreate, bad words, URLs). Rows that fail are
+reported with their line number and skipped; rows identical to an existing
+entry (same net, callsign and message) are skipped as duplicates, so an
+import can safely be repeated. Rows dated at or before the newest archived
+entry are rejected: the live table may only hold entries newer than the
+archive (see app/archive.py). Valid rows are inserted with executemany in
+one transaction per batch, so the file is never held in memory and the
+writer connection is released between batches.
+
+Net control can also submit the stations of one runde as a check-in batch
+(`checkin_entries`): the same checks per row, duplicates skipped, all
+valid rows inserted in a single transaction, and a result for every row.
+"""
+
+import csv
+import html
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.engine import Engine
+
+from app.archive import archive_boundary
+from app.config import get_settings
+from app.database import engine as default_engine
+from app.models import GuestbookEntry, naive_utc
+from app.replica import replica_publisher
+from app.schemas import GuestbookEntryCreate
+from app.security import contains_bad_words, contains_url, sanitize_input, validate_utf8
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REQUIRED_COLUMNS = ("Rufzeichen", "Nachricht", "Runde")
+
+# Rejected rows listed individually in a report (all are counted)
+MAX_REPORTED_REJECTS = 100
+
+
+@dataclass
+class RejectedRow:
+    """A row that was not imported."""
+
+    line: int
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import."""
+
+    imported: int = 0
+    rejected_count: int = 0
+    rejected: List[RejectedRow] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        total = self.imported + self.rejected_count
+        return total / self.seconds if self.seconds > 0 else 0.0
+
+    def reject(self, line: int, reason: str):
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTS:
+            self.rejected.append(RejectedRow(line, reason))
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "rejected_count": self.rejected_count,
+            "rejected": [{"line": r.line, "reason": r.reason} for r in self.rejected],
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+@dataclass
+class CheckinResult:
+    """Outcome of one row of a check-in batch."""
+
+    index: int
+    status: str  # "created", "duplicate" or "rejected"
+    id: Optional[int] = None
+    reason: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        result = {"index": self.index, "status": self.status}
+        if self.id is not None:
+            result["id"] = self.id
+        if self.reason is not None:
+            result["reason"] = self.reason
+        return result
+
+
+@dataclass
+class CheckinReport:
+    """Outcome of a check-in batch."""
+
+    results: List[CheckinResult] = field(default_factory=list)
+    # The inserted entries, with their ids
+    entries: List[GuestbookEntry] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        counts = {"created": 0, "duplicate": 0, "rejected": 0}
+        for result in self.results:
+            counts[result.status] += 1
+        return {**counts, "results": [r.as_dict() for r in self.results]}
+
+
+def prepare_entry(callsign: str, message: str, runde_datetime: datetime) -> GuestbookEntryCreate:
+    """
+    Run raw input through the guestbook's validation and filter chain.
+
+    Raises ValueError with a German reason if the entry must be rejected.
+    """
+    if not validate_utf8(callsign) or not validate_utf8(message):
+        raise ValueError("Ungültige Zeichenkodierung")
+
+    try:
+        entry = GuestbookEntryCreate(
+            callsign=sanitize_input(callsign),
+            message=sanitize_input(message),
+            runde_datetime=runde_datetime,
+        )
+    except ValidationError as e:
+        raise ValueError(f"Ungültige Eingabe: {e.errors()[0]['msg']}") from e
+
+    if contains_bad_words(entry.message):
+        raise ValueError("Unerwünschte Begriffe")
+    if contains_url(entry.message):
+        raise ValueError("Enthält einen Link")
+    return entry
+
+
+def _parse_row(row: Dict[str, str], boundary: Optional[datetime] = None) -> dict:
+    """
+    Validate one CSV row and return the values to insert.
+
+    `boundary` is the newest archived created_at; older rows are rejected.
+    """
+    if any(row.get(column) is None for column in REQUIRED_COLUMNS):
+        raise ValueError("Zu wenige Spalten")
+    if any("\ufffd" in (value or "") for value in row.values() if isinstance(value, str)):
+        raise ValueError("Ungültige Zeichenkodierung")
+
+    try:
+        runde = datetime.fromisoformat(row["Runde"].strip())
+    except ValueError:
+        raise ValueError(f"Ungültiges Datum der Runde: {row['Runde']!r}")
+
+    created_at = datetime.now(timezone.utc)
+    if (row.get("Datum") or "").strip():
+        try:
+            created_at = naive_utc(datetime.fromisoformat(row["Datum"].strip()))
+        except ValueError:
+            raise ValueError(f"Ungültiges Eintragsdatum: {row['Datum']!r}")
+        if boundary is not None and created_at <= boundary:
+            raise ValueError(f"Älter als das Archiv (bis {boundary.isoformat()})")
+
+    # Exported text is already HTML-escaped; unescape so it is not escaped twice
+    entry = prepare_entry(html.unescape(row["Rufzeichen"]), html.unescape(row["Nachricht"]), runde)
+    return {
+        "callsign": entry.callsign,
+        "message": entry.message,
+        "runde_datetime": entry.runde_datetime,
+        "created_at": created_at,
+    }
+
+
+def _drop_duplicates(connection, batch: List[Tuple[int, dict]], report: ImportReport) -> List[dict]:
+    """Remove rows that already exist, in the database or earlier in the batch."""
+    keys = {(values["runde_datetime"], values["callsign"]) for _, values in batch}
+    existing = set(
+        connection.execute(
+            select(GuestbookEntry.runde_datetime, GuestbookEntry.callsign, GuestbookEntry.message)
+            .where(tuple_(GuestbookEntry.runde_datetime, GuestbookEntry.callsign).in_(keys))
+        ).all()
+    )
+
+    rows = []
+    for line, values in batch:
+        key = (values["runde_datetime"], values["callsign"], values["message"])
+        if key in existing:
+            report.reject(line, "Doppelter Eintrag")
+            continue
+        existing.add(key)
+        rows.append(values)
+    return rows
+
+
+def _insert_batch(bind: Engine, batch: List[Tuple[int, dict]], report: ImportReport):
+    with bind.begin() as connection:
+        rows = _drop_duplicates(connection, batch, report)
+        if rows:
+            connection.execute(insert(GuestbookEntry.__table__), rows)
+    report.imported += len(rows)
+    replica_publisher.note_writes(len(rows))
+
+
+def checkin_entries(
+    runde_datetime: datetime,
+    rows: Sequence[Tuple[str, str]],
+    bind: Optional[Engine] = None,
+) -> CheckinReport:
+    """
+    Insert (callsign, message) pairs for one runde in a single transaction.
+
+    Every row is validated like a form submission; rows that fail, or that
+    repeat an existing entry of the runde (or an earlier row), are reported
+    and skipped. The per-IP cooldown does not apply.
+    """
+    bind = bind or default_engine
+    report = CheckinReport()
+    created_at = datetime.now(timezone.utc)
+
+    valid: List[Tuple[int, dict]] = []
+    for index, (callsign, message) in enumerate(rows):
+        try:
+            entry = prepare_entry(callsign, message, runde_datetime)
+        except ValueError as e:
+            report.results.append(CheckinResult(index, "rejected", reason=str(e)))
+            continue
+        valid.append((index, {
+            "callsign": entry.callsign,
+            "message": entry.message,
+            "runde_datetime": entry.runde_datetime,
+            "created_at": created_at,
+        }))
+
+    with bind.begin() as connection:
+        existing = set()
+        if valid:
+            existing = set(
+                connection.execute(
+                    select(GuestbookEntry.callsign, GuestbookEntry.message).where(
+                        GuestbookEntry.runde_datetime == valid[0][1]["runde_datetime"],
+                        GuestbookEntry.callsign.in_({values["callsign"] for _, values in valid}),
+                    )
+                ).all()
+            )
+
+        pending: List[Tuple[int, dict]] = []
+        for index, values in valid:
+            key = (values["callsign"], values["message"])
+            if key in existing:
+                report.results.append(CheckinResult(index, "duplicate", reason="Doppelter Eintrag"))
+                continue
+            existing.add(key)
+            pending.append((index, values))
+
+        if pending:
+            ids = connection.execute(
+                insert(GuestbookEntry.__table__).returning(
+                    GuestbookEntry.__table__.c.id, sort_by_parameter_order=True
+                ),
+                [values for _, values in pending],
+            ).scalars().all()
+            for (index, values), entry_id in zip(pending, ids):
+                report.results.append(CheckinResult(index, "created", id=entry_id))
+                report.entries.append(GuestbookEntry(id=entry_id, **values))
+
+    report.results.sort(key=lambda result: result.index)
+    replica_publisher.note_writes(len(report.entries))
+    logger.info(
+        f"Check-in batch for {runde_datetime}: {len(report.entries)} of {len(rows)} entries inserted"
+    )
+    return report
+
+
+def import_csv(
+    lines: Iterable[str],
+    bind: Optional[Engine] = None,
+    batch_size: Optional[int] = None,
+) -> ImportReport:
+    """
+    Import entries from CSV text, read incrementally from `lines`.
+
+    `lines` is any iterable of text lines, e.g. a file opened with
+    newline="". Raises ValueError if the header lacks required columns.
+    """
+    bind = bind or default_engine
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    report = ImportReport()
+    start = time.perf_counter()
+
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Fehlende Spalten: {', '.join(missing)}")
+
+    with bind.connect() as connection:
+        boundary = archive_boundary(connection)
+
+    batch: List[Tuple[int, dict]] = []
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            # The parser cannot resynchronise after a broken row
+            report.reject(reader.line_num, f"Ungültiges CSV, Import abgebrochen: {e}")
+            break
+
+        line = reader.line_num
+        try:
+            batch.append((line, _parse_row(row, boundary)))
+        except ValueError as e:
+            report.reject(line, str(e))
+            continue
+
+        if len(batch) >= batch_size:
+            _insert_batch(bind, batch, report)
+            batch = []
+
+    if batch:
+        _insert_batch(bind, batch, report)
+
+    report.seconds = time.perf_counter() - start
+    logger.info(
+        f"CSV import: {report.imported} imported, {report.rejected_count} rejected "
+        f"in {report.seconds:.2f}s ({report.rows_per_second:.0f} rows/s)"
+    )
+    return report
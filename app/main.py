@@ -7,16 +7,22 @@ import logging
 import sys
 
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app.assets import AssetStaticFiles, assets
+from app.compression import CompressionMiddleware
 from app.config import get_settings
-from app.database import init_db
+from app.database import ReadSessionLocal, init_db
+from app.events import event_hub
+from app.replica import StalenessHeaderMiddleware, replica_publisher, replica_reader, replica_supported
 from app.security import RateLimitMiddleware, SecurityHeadersMiddleware
 from app.routes import guestbook_router, admin_router, pages_router
+from app.routes.pages import static_pages
 from app.translations import t, DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES
+from app.runtime_settings import runtime_settings
+from app.templating import precompile, templates
+from app.writer import entry_writer
 
 # Configure logging
 logging.basicConfig(
@@ -28,9 +34,6 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Initialize templates for error pages
-templates = Jinja2Templates(directory="app/templates")
-
 
 def get_language_from_request(request: Request) -> str:
     """Extract language preference from cookie or default."""
@@ -51,9 +54,12 @@ app = FastAPI(
 # Add security middlewares
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(RateLimitMiddleware)
+app.add_middleware(StalenessHeaderMiddleware)
+# Outermost, so it sees the final headers of every response
+app.add_middleware(CompressionMiddleware)
 
 # Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", AssetStaticFiles(assets, directory="app/static"), name="static")
 
 # Include routers
 app.include_router(pages_router)
@@ -68,10 +74,38 @@ async def startup_event():
     init_db()
     logger.info("Database initialized")
 
+    db = ReadSessionLocal()
+    try:
+        runtime_settings.load(db)
+    finally:
+        db.close()
+
+    assets.build()
+    logger.info(f"Templates compiled in {precompile(templates.env) * 1000:.0f} ms")
+    static_pages.prerender()
+    logger.info("Static pages rendered")
+
+    if settings.REPLICA_ENABLED:
+        if replica_supported():
+            await replica_publisher.start()
+            logger.info(f"Read replica published to {replica_publisher.replica_path}")
+        else:
+            logger.warning("REPLICA_ENABLED requires a SQLite database file; replica disabled")
+
     # Log admin token (only at startup, for initial setup)
     logger.info(f"Admin URL: /admin?token={settings.ADMIN_TOKEN}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Commit queued entries before the process exits."""
+    event_hub.close()
+    await entry_writer.stop()
+    logger.info("Entry writer drained")
+    await replica_publisher.stop()
+    replica_reader.dispose()
+
+
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Custom exception handler - renders friendly HTML error pages."""
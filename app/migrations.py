@@ -0,0 +1,246 @@
+"""
+gbHam Schema Migrations
+Versioned, ordered schema changes for existing databases.
+
+`Base.metadata.create_all` only creates missing tables, so new indexes,
+triggers or columns never reach databases created by an older release.
+Each migration below runs once, in order, in its own transaction, and is
+recorded in the `schema_version` table.
+
+Rules for new steps:
+- Append only; never renumber or edit a released step.
+- Steps must tolerate objects that already exist (IF NOT EXISTS), because
+  step 1 creates fresh databases from the current models.
+- Index builds use `create_index_online()` in a step marked `online=True`.
+  SQLite cannot build an index without the write lock, but in WAL mode
+  readers keep working while it is built, and running each index in its
+  own transaction keeps the lock no longer than that one build. Writers
+  wait up to SQLITE_BUSY_TIMEOUT (new entries are buffered by the
+  group-commit writer meanwhile). On PostgreSQL, online steps run outside
+  a transaction, so the index is built with CREATE INDEX CONCURRENTLY and
+  writes continue during the build.
+- Steps must run on SQLite and PostgreSQL; branch on `is_sqlite(connection)`
+  where the SQL differs.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import Base, create_sqlite_engine, is_sqlite
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Migration:
+    """One schema change."""
+
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+    # Builds indexes; on PostgreSQL runs on an autocommit connection
+    online: bool = False
+
+
+@dataclass
+class StepReport:
+    """Result of applying one migration."""
+
+    version: int
+    description: str
+    seconds: float
+
+
+# -- Helpers ---------------------------------------------------------------
+
+def create_index_online(
+    connection: Connection,
+    name: str,
+    table: str,
+    columns: List[str],
+    using: Optional[str] = None,
+):
+    """
+    Create an index if missing without blocking writes longer than needed.
+
+    SQLite holds the write lock for this one build; PostgreSQL builds it
+    CONCURRENTLY, which needs an autocommit connection (an online step).
+    `using` (index method) is PostgreSQL only.
+    """
+    if is_sqlite(connection):
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+        ))
+        return
+
+    method = f" USING {using}" if using else ""
+    # An interrupted concurrent build leaves an invalid index behind, which
+    # IF NOT EXISTS would skip; drop it and build again
+    invalid = connection.execute(
+        text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    connection.execute(text(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}{method} ({', '.join(columns)})"
+    ))
+
+
+def _create_base_tables(connection: Connection):
+    from app import models  # noqa: F401
+    Base.metadata.create_all(bind=connection)
+
+
+def _install_entry_counter(connection: Connection):
+    from app.counters import install_entry_counter
+    install_entry_counter(connection)
+
+
+def _install_fts(connection: Connection):
+    from app.search import install_fts
+    install_fts(connection)
+
+
+def _create_idempotency_keys(connection: Connection):
+    from app.models import IdempotencyKey
+    IdempotencyKey.__table__.create(bind=connection, checkfirst=True)
+
+
+# -- Migrations ------------------------------------------------------------
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Basistabellen", _create_base_tables),
+    Migration(
+        2,
+        "Index guestbook_entries (created_at, id)",
+        lambda c: create_index_online(
+            c, "ix_guestbook_entries_created_at_id", "guestbook_entries", ["created_at", "id"]
+        ),
+        online=True,
+    ),
+    Migration(
+        3,
+        "Index guestbook_entries (runde_datetime, callsign)",
+        lambda c: create_index_online(
+            c, "ix_guestbook_entries_runde_callsign", "guestbook_entries",
+            ["runde_datetime", "callsign"],
+        ),
+        online=True,
+    ),
+    Migration(4, "Eintragszähler mit Triggern", _install_entry_counter),
+    Migration(
+        5,
+        "Redundanten Index guestbook_entries (created_at) entfernen",
+        lambda c: c.execute(text("DROP INDEX IF EXISTS ix_guestbook_entries_created_at")),
+    ),
+    Migration(6, "Volltextsuche (FTS5) über Rufzeichen und Nachricht", _install_fts, online=True),
+    Migration(7, "Idempotenz-Schlüssel für Formulareinträge", _create_idempotency_keys),
+]
+
+
+# -- Runner ----------------------------------------------------------------
+
+def _ensure_version_table(connection: Connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied migration version (0 for a new database)."""
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        return connection.execute(
+            text("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        ).scalar()
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    """Migrations not yet applied to the database."""
+    version = current_version(engine)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def _record(connection: Connection, migration: Migration):
+    connection.execute(
+        text(
+            "INSERT INTO schema_version (version, description, applied_at) "
+            "VALUES (:version, :description, :applied_at)"
+        ),
+        {
+            "version": migration.version,
+            "description": migration.description,
+            "applied_at": datetime.now(timezone.utc),
+        },
+    )
+
+
+def run_migrations(engine: Engine) -> List[StepReport]:
+    """
+    Apply all pending migrations, each in its own transaction.
+
+    Online steps on PostgreSQL run without a transaction (CREATE INDEX
+    CONCURRENTLY refuses to run inside one) and are recorded afterwards;
+    they must therefore be safe to repeat.
+    """
+    reports = []
+    for migration in pending_migrations(engine):
+        start = time.perf_counter()
+        if migration.online and not is_sqlite(engine):
+            with engine.connect() as connection:
+                migration.apply(connection.execution_options(isolation_level="AUTOCOMMIT"))
+            with engine.begin() as connection:
+                _record(connection, migration)
+        else:
+            with engine.begin() as connection:
+                migration.apply(connection)
+                _record(connection, migration)
+        seconds = time.perf_counter() - start
+        logger.info(f"Migration {migration.version} applied in {seconds:.3f}s: {migration.description}")
+        reports.append(StepReport(migration.version, migration.description, seconds))
+    return reports
+
+
+def dry_run(database_path: str, workdir: Optional[str] = None) -> List[StepReport]:
+    """
+    Estimate migration cost on a copy of a database file.
+
+    The copy is taken with the SQLite backup API, so it is consistent even
+    while the production database is in use. The timings of each step on
+    the copy approximate how long the write lock will be held in production.
+    """
+    tmpdir = tempfile.mkdtemp(prefix="gbham-migrate-", dir=workdir)
+    copy_path = os.path.join(tmpdir, "gbham-dryrun.db")
+    try:
+        source = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+        target = sqlite3.connect(copy_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        engine = create_sqlite_engine(f"sqlite:///{copy_path}")
+        try:
+            return run_migrations(engine)
+        finally:
+            engine.dispose()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
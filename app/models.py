@@ -4,16 +4,30 @@ SQLAlchemy models for guestbook entries and settings.
 """
 
 from datetime import datetime, timezone
+from typing import Optional
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
 
 from app.database import Base
 
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, as created_at is stored."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class GuestbookEntry(Base):
     """Guestbook entry model."""
 
     __tablename__ = "guestbook_entries"
+    __table_args__ = (
+        # Keyset pagination order; also serves plain created_at lookups
+        Index("ix_guestbook_entries_created_at_id", "created_at", "id"),
+        # Entries of one net, grouped by station
+        Index("ix_guestbook_entries_runde_callsign", "runde_datetime", "callsign"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     callsign = Column(String(15), nullable=False, index=True)
@@ -23,7 +37,6 @@ class GuestbookEntry(Base):
         DateTime,
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
-        index=True,
     )
 
     def __repr__(self) -> str:
@@ -47,3 +60,27 @@ class ReadOnlyMode(Base):
 
     id = Column(Integer, primary_key=True, default=1)
     enabled = Column(Boolean, default=False, nullable=False)
+
+
+class EntryCount(Base):
+    """Number of guestbook entries (singleton table, maintained by triggers)."""
+
+    __tablename__ = "entry_count"
+
+    id = Column(Integer, primary_key=True, default=1)
+    total = Column(Integer, default=0, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """Processed entry form submission; a replay gets the stored redirect."""
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)
+    location = Column(String(255), nullable=False)
+    created_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,99 @@
+"""
+gbHam Page Cache
+In-process cache of rendered guestbook pages.
+
+The index page only changes when an entry is added or deleted or read-only
+mode is toggled. Those code paths bump `content_version`; rendered pages
+are cached under a key that contains the version, so a bump makes every
+older page unreachable (and the cache is cleared to free the memory).
+
+Keys also contain the runtime settings version, so a read-only toggle made
+by another worker invalidates pages here as soon as it is picked up.
+Writes this process cannot see (CLI imports, other workers) are covered by
+PAGE_CACHE_TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Hashable, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class ContentVersion:
+    """Counter bumped whenever the visible guestbook content changes."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+        # Changes before this process started are unknown
+        self.changed_at = datetime.now(timezone.utc)
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        """Mark content as changed and drop cached pages."""
+        with self._lock:
+            self._value += 1
+            value = self._value
+            self.changed_at = datetime.now(timezone.utc)
+        page_cache.clear()
+        return value
+
+
+class PageCache:
+    """Size-bounded LRU cache of rendered pages (precompressed bodies) with a TTL."""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries if max_entries is not None else settings.PAGE_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else settings.PAGE_CACHE_TTL
+        self._pages: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached body, or None on a miss."""
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is None or time.monotonic() - cached[0] > self.ttl:
+                if cached is not None:
+                    del self._pages[key]
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, key: Hashable, body: Any):
+        """Store a body, evicting the least recently used pages if full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pages[key] = (time.monotonic(), body)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+# Global instances
+page_cache = PageCache()
+content_version = ContentVersion()
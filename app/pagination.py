@@ -0,0 +1,242 @@
+"""
+gbHam Keyset Pagination
+Cursor-based paging over (created_at, id) instead of OFFSET.
+
+OFFSET makes SQLite walk and discard every skipped row, so deep pages get
+slower as the guestbook grows. A cursor remembers the last row that was
+shown and the next page starts right after it using the composite
+(created_at, id) index.
+
+Entries moved to the yearly archive files (see app.archive) continue the
+same ordering, so a page that runs past the oldest live entry is filled up
+from the archive years in turn.
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from app.archive import entry_sources, source_query
+from app.database import sql_integer
+from app.models import GuestbookEntry
+
+
+@dataclass
+class Cursor:
+    """Position of an entry in the (created_at, id) ordering."""
+
+    created_at: datetime
+    id: int
+    page: int = 1  # Display hint: page the entry was shown on
+
+    def encode(self) -> str:
+        """Encode as an opaque URL-safe token."""
+        raw = f"{self.created_at.isoformat()}|{self.id}|{self.page}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        """Decode a token, raising ValueError if it is malformed."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+            created_at, entry_id, page = raw.split("|")
+            return cls(datetime.fromisoformat(created_at), sql_integer(entry_id), max(1, sql_integer(page)))
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise ValueError(f"Ungültiger Cursor: {token!r}") from e
+
+    @classmethod
+    def for_entry(cls, entry, page: int = 1) -> "Cursor":
+        """Cursor pointing at an entry."""
+        return cls(entry.created_at, entry.id, page)
+
+    @classmethod
+    def oldest(cls, last_page: int) -> "Cursor":
+        """Cursor just before the oldest entry; as `after` it opens `last_page`."""
+        return cls(datetime.min, 0, last_page + 1)
+
+    @property
+    def is_oldest(self) -> bool:
+        return (self.created_at, self.id) == (datetime.min, 0)
+
+
+@dataclass
+class KeysetPage:
+    """One page of entries plus the cursors to its neighbours."""
+
+    items: List = field(default_factory=list)
+    page: int = 1
+    has_prev: bool = False
+    has_next: bool = False
+    prev_cursor: Optional[str] = None  # use as ?after=
+    next_cursor: Optional[str] = None  # use as ?before=
+
+
+def _collect(
+    db: Session,
+    limit: int,
+    build,
+    newest_first: bool = True,
+    columns: Sequence = (),
+    **years,
+) -> List:
+    """Run `build(query)` against each entry source in order until `limit` rows are found."""
+    rows: List = []
+    sources = entry_sources(db, newest_first=newest_first, **years)
+    try:
+        for schema in sources:
+            rows.extend(build(source_query(db, schema, *columns)).limit(limit - len(rows)).all())
+            if len(rows) >= limit:
+                break
+    finally:
+        sources.close()
+    return rows
+
+
+def paginate(
+    db: Session,
+    per_page: int,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    filters: Sequence = (),
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    columns: Sequence = (),
+) -> KeysetPage:
+    """
+    Fetch one page of guestbook entries in newest-first order.
+
+    `before` returns the entries older than the cursor (next page),
+    `after` the entries newer than the cursor (previous page).
+    `filters` are extra WHERE criteria on GuestbookEntry; `min_year` and
+    `max_year` skip archive years that cannot match them. With `columns`,
+    items are rows of those columns (which must include id and created_at)
+    instead of GuestbookEntry objects.
+    Raises ValueError for malformed cursors.
+    """
+    key = tuple_(GuestbookEntry.created_at, GuestbookEntry.id)
+    newest_first = (GuestbookEntry.created_at.desc(), GuestbookEntry.id.desc())
+    oldest_first = (GuestbookEntry.created_at.asc(), GuestbookEntry.id.asc())
+
+    if after:
+        cursor = Cursor.decode(after)
+        page = max(1, cursor.page - 1)
+        rows = _collect(
+            db,
+            per_page + 1,
+            lambda q: q.filter(key > tuple_(cursor.created_at, cursor.id), *filters).order_by(*oldest_first),
+            newest_first=False,
+            columns=columns,
+            min_year=max(cursor.created_at.year, min_year or cursor.created_at.year),
+            max_year=max_year,
+        )
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_next = not cursor.is_oldest
+    else:
+        if before:
+            cursor = Cursor.decode(before)
+            page = cursor.page + 1
+            rows = _collect(
+                db,
+                per_page + 1,
+                lambda q: q.filter(key < tuple_(cursor.created_at, cursor.id), *filters).order_by(*newest_first),
+                columns=columns,
+                min_year=min_year,
+                max_year=min(cursor.created_at.year, max_year or cursor.created_at.year),
+            )
+        else:
+            page = 1
+            rows = _collect(
+                db,
+                per_page + 1,
+                lambda q: q.filter(*filters).order_by(*newest_first),
+                columns=columns,
+                min_year=min_year,
+                max_year=max_year,
+            )
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = before is not None
+
+    if has_prev and page == 1:
+        # Entries were added since the cursor was issued
+        page = 2
+    if not has_prev:
+        page = 1
+
+    result = KeysetPage(items=items, page=page, has_prev=has_prev, has_next=has_next)
+    if items and has_prev:
+        result.prev_cursor = Cursor.for_entry(items[0], page).encode()
+    if items and has_next:
+        result.next_cursor = Cursor.for_entry(items[-1], page).encode()
+    return result
+
+
+def entries_after(
+    db: Session,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    filters: Sequence = (),
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    columns: Sequence = (),
+) -> List:
+    """
+    Up to `limit` entries after the (created_at, id) key `after`, oldest first.
+
+    For walking the whole guestbook in batches; every batch is a separate
+    short query, so callers can release the session in between.
+    """
+    oldest_first = (GuestbookEntry.created_at.asc(), GuestbookEntry.id.asc())
+    criteria = list(filters)
+    if after is not None:
+        key = tuple_(GuestbookEntry.created_at, GuestbookEntry.id)
+        criteria.append(key > tuple_(*after))
+        min_year = max(after[0].year, min_year or after[0].year)
+    return _collect(
+        db,
+        limit,
+        lambda q: q.filter(*criteria).order_by(*oldest_first),
+        newest_first=False,
+        columns=columns,
+        min_year=min_year,
+        max_year=max_year,
+    )
+
+
+def cursor_for_offset(db: Session, offset: int, per_page: int) -> Optional[Cursor]:
+    """
+    Translate a legacy OFFSET into the equivalent `before` cursor.
+
+    Returns the cursor of the entry just above the offset, or None if the
+    offset lies beyond the last entry.
+    """
+    if offset <= 0:
+        return None
+    boundary = None
+    skip = offset - 1
+    sources = entry_sources(db)
+    try:
+        for schema in sources:
+            query = source_query(db, schema)
+            total = query.count()
+            if skip < total:
+                boundary = (
+                    query.order_by(GuestbookEntry.created_at.desc(), GuestbookEntry.id.desc())
+                    .offset(skip)
+                    .limit(1)
+                    .first()
+                )
+                break
+            skip -= total
+    finally:
+        sources.close()
+    if boundary is None:
+        return None
+    return Cursor.for_entry(boundary, page=max(1, offset // max(1, per_page)))
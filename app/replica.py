@@ -0,0 +1,289 @@
+"""
+gbHam Read Replica
+Periodically published read-only snapshot of the database for GET routes.
+
+With REPLICA_ENABLED, the process that owns the database publishes a copy
+of it every REPLICA_INTERVAL seconds (or as soon as REPLICA_MAX_WRITES new
+entries were committed) using the SQLite backup API. Page rendering and the
+public API then read from the copy and never wait on the live file, and
+backups can be taken from the copy as well.
+
+The copy is written to a temporary file and renamed into place, so readers
+always see a complete snapshot. Readers notice a new snapshot by its inode
+and reopen their connection pool. The replica file's mtime marks the last
+time it was known to match the live database; requests fall back to the
+live database when it is older than REPLICA_MAX_STALENESS. The age is sent
+as the X-Data-Staleness response header.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import get_settings
+from app.database import AsyncDB, ReadSessionLocal, create_sqlite_engine, is_memory_url, is_sqlite_url
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STALENESS_HEADER = "X-Data-Staleness"
+
+
+def replica_supported() -> bool:
+    """Replicas need a file-based SQLite database."""
+    return is_sqlite_url(settings.DATABASE_URL) and not is_memory_url(settings.DATABASE_URL)
+
+
+class ReplicaPublisher:
+    """Publishes snapshots of the live database to the replica path."""
+
+    def __init__(
+        self,
+        source_path: Optional[str] = None,
+        replica_path: Optional[str] = None,
+        interval: Optional[float] = None,
+        max_writes: Optional[int] = None,
+    ):
+        self.source_path = source_path
+        self.replica_path = replica_path or settings.REPLICA_PATH
+        self.interval = interval if interval is not None else settings.REPLICA_INTERVAL
+        self.max_writes = max_writes or settings.REPLICA_MAX_WRITES
+        self._source: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # Statistics
+        self.published = 0
+        self.last_publish_seconds = 0.0
+
+    # -- Publishing (blocking, threadpool) ---------------------------------
+
+    def _connect_source(self) -> sqlite3.Connection:
+        if self._source is None:
+            path = self.source_path or make_url(settings.DATABASE_URL).database
+            self._source = sqlite3.connect(path, check_same_thread=False)
+            self._source.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}")
+        return self._source
+
+    def _acquire_publisher_lock(self) -> bool:
+        """Only one process per replica path publishes (several workers may run)."""
+        if fcntl is None or self._lock_file is not None:
+            return True
+        lock_file = open(f"{self.replica_path}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def publish_if_changed(self) -> bool:
+        """
+        Publish a snapshot if the live database changed since the last one.
+
+        Otherwise just touch the replica to record that it is still current.
+        Returns whether a new snapshot was published.
+        """
+        with self._lock:
+            if not self._acquire_publisher_lock():
+                return False
+            source = self._connect_source()
+            # data_version changes whenever another connection commits
+            data_version = source.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version and os.path.exists(self.replica_path):
+                os.utime(self.replica_path)
+                return False
+            self._publish(source)
+            self._data_version = data_version
+            return True
+
+    def _publish(self, source: sqlite3.Connection):
+        start = time.perf_counter()
+        tmp_path = f"{self.replica_path}.tmp"
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target)
+            # Readers keep the old file open after the rename; a rollback
+            # journal (unlike WAL's shared -shm file) is tied to the open file
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+        os.replace(tmp_path, self.replica_path)
+
+        self._pending_writes = 0
+        self.published += 1
+        self.last_publish_seconds = time.perf_counter() - start
+        logger.debug(f"Replica published in {self.last_publish_seconds:.3f}s")
+
+    # -- Scheduling -------------------------------------------------------
+
+    def note_writes(self, count: int = 1):
+        """Record committed writes; publishes early after REPLICA_MAX_WRITES."""
+        self._pending_writes += count
+        if self._pending_writes >= self.max_writes and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self):
+        """Publish a first snapshot and start the background task."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        os.makedirs(os.path.dirname(os.path.abspath(self.replica_path)), exist_ok=True)
+        await run_in_threadpool(self.publish_if_changed)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and release the source connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        with self._lock:
+            if self._source is not None:
+                self._source.close()
+                self._source = None
+                self._data_version = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await run_in_threadpool(self.publish_if_changed)
+            except Exception:
+                logger.exception("Publishing the read replica failed")
+
+
+class ReplicaReader:
+    """Read-only connection pool on the replica file that follows new snapshots."""
+
+    def __init__(self, replica_path: Optional[str] = None, max_staleness: Optional[float] = None):
+        self.replica_path = replica_path or settings.REPLICA_PATH
+        self.max_staleness = (
+            max_staleness if max_staleness is not None else settings.REPLICA_MAX_STALENESS
+        )
+        self._engine = None
+        self._sessionmaker = None
+        self._inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def staleness(self) -> Optional[float]:
+        """Seconds since the replica was last known current, or None if missing."""
+        try:
+            return max(0.0, time.time() - os.stat(self.replica_path).st_mtime)
+        except FileNotFoundError:
+            return None
+
+    def session(self):
+        """
+        Open a session on the current snapshot.
+
+        Returns (session, staleness), or (None, None) if there is no replica
+        or it is too old to be used.
+        """
+        try:
+            stat = os.stat(self.replica_path)
+        except FileNotFoundError:
+            return None, None
+        staleness = max(0.0, time.time() - stat.st_mtime)
+        if staleness > self.max_staleness:
+            return None, None
+
+        with self._lock:
+            if stat.st_ino != self._inode:
+                # New snapshot: idle connections still point at the old file
+                if self._engine is not None:
+                    self._engine.dispose()
+                self._engine = create_sqlite_engine(
+                    f"sqlite:///{self.replica_path}",
+                    readonly=True,
+                    pool_size=settings.SQLITE_READ_POOL_SIZE,
+                )
+                self._sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+                self._inode = stat.st_ino
+            return self._sessionmaker(), staleness
+
+    @property
+    def generation(self) -> int:
+        """Identifier of the snapshot currently read (its inode)."""
+        return self._inode or 0
+
+    def dispose(self):
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+            self._engine = None
+            self._sessionmaker = None
+            self._inode = None
+
+
+async def get_replica_db(request: Request):
+    """
+    Dependency for GET routes that tolerate bounded staleness.
+
+    Reads from the replica when enabled and fresh enough, otherwise from the
+    live database. After posting an entry (`?success=` redirect) the live
+    database is used, so visitors always see their own entry.
+    """
+    session = None
+    staleness = 0.0
+    generation = 0
+    if settings.REPLICA_ENABLED and not request.query_params.get("success"):
+        session, staleness = replica_reader.session()
+        generation = replica_reader.generation
+    if session is None:
+        session, staleness, generation = ReadSessionLocal(), 0.0, 0
+    request.state.data_staleness = staleness
+    # Identifies the snapshot, so cached pages never mix replica and live data
+    request.state.data_generation = generation
+
+    db = AsyncDB(session)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+class StalenessHeaderMiddleware(BaseHTTPMiddleware):
+    """Expose the age of the data a response was rendered from."""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        staleness = getattr(request.state, "data_staleness", None)
+        if staleness is not None:
+            response.headers[STALENESS_HEADER] = f"{staleness:.1f}"
+        return response
+
+
+# Global replica instances
+replica_publisher = ReplicaPublisher()
+replica_reader = ReplicaReader()
@@ -6,16 +6,26 @@ Protected admin endpoints for entry management.
 import csv
 import io
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, Depends, Request, HTTPException, status, Query
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Depends, Request, HTTPException, status, Query, UploadFile, File
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app.models import GuestbookEntry, ReadOnlyMode
+from starlette.concurrency import run_in_threadpool
+
+from app.archive import archived_count, delete_archived_entry, entry_sources, source_query, update_archived_count
+from app.database import AsyncDB, ReadSessionLocal, get_db, get_write_db
+from app.events import event_hub
+from app.models import GuestbookEntry
+from app.counters import get_entry_count
+from app.importer import checkin_entries, import_csv
+from app.page_cache import content_version
+from app.pagination import KeysetPage, paginate
+from app.runtime_settings import runtime_settings
+from app.schemas import CheckinBatch
+from app.templating import templates
+from app.search import search_entries
 from app.security import verify_admin_token
 from app.config import get_settings
 from app.translations import Translator, SUPPORTED_LANGUAGES
@@ -24,7 +34,15 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 router = APIRouter(prefix="/admin", tags=["admin"])
-templates = Jinja2Templates(directory="app/templates")
+
+# Rows fetched per round trip and per streamed CSV chunk
+EXPORT_CHUNK_SIZE = 500
+
+# Results per admin search page
+SEARCH_PAGE_SIZE = 50
+
+# Entries per admin overview page
+ADMIN_PAGE_SIZE = 100
 
 
 def verify_token(token: Optional[str] = Query(None)) -> str:
@@ -37,64 +55,201 @@ def verify_token(token: Optional[str] = Query(None)) -> str:
     return token
 
 
+def entry_filters(
+    callsign: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list:
+    """WHERE criteria for the admin overview filters."""
+    filters = []
+    if callsign:
+        # Prefix match; LIKE wildcards typed by the admin are taken literally
+        pattern = callsign.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        filters.append(GuestbookEntry.callsign.ilike(f"{pattern}%", escape="\\"))
+    if date_from:
+        filters.append(GuestbookEntry.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        filters.append(GuestbookEntry.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    return filters
+
+
+def load_overview(
+    db: Session,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    callsign: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Tuple[KeysetPage, int]:
+    """Load one page of entries (newest first) and the entry count for the admin page."""
+    options = {
+        "filters": entry_filters(callsign, date_from, date_to),
+        "min_year": date_from.year if date_from else None,
+        "max_year": date_to.year if date_to else None,
+    }
+    try:
+        page = paginate(db, ADMIN_PAGE_SIZE, before=before, after=after, **options)
+    except ValueError:
+        page = paginate(db, ADMIN_PAGE_SIZE, **options)
+
+    return page, get_entry_count(db) + archived_count()
+
+
+def remove_entry(db: Session, entry_id: int) -> Optional[str]:
+    """Delete an entry. Returns its callsign, or None if it does not exist."""
+    entry = db.query(GuestbookEntry).filter(GuestbookEntry.id == entry_id).first()
+    if not entry:
+        # Release the writer connection; archives need a connection of their own
+        db.rollback()
+        with db.get_bind().connect() as connection:
+            callsign = delete_archived_entry(connection, entry_id)
+        if callsign is not None:
+            update_archived_count(db)
+        return callsign
+
+    callsign = entry.callsign
+    db.delete(entry)
+    db.commit()
+    return callsign
+
+
+def iter_csv_export():
+    """
+    Yield the CSV export in chunks.
+
+    Runs in the threadpool (StreamingResponse iterates sync generators there)
+    with its own read session, since request dependencies are closed before
+    the body is streamed.
+    """
+    db = ReadSessionLocal()
+    try:
+        output = io.StringIO()
+        writer = csv.writer(output, quoting=csv.QUOTE_ALL)
+
+        # Header
+        writer.writerow(["ID", "Rufzeichen", "Nachricht", "Runde", "Datum"])
+
+        # Data: live entries first, then the archive years, newest first.
+        # yield_per streams through a server-side cursor on PostgreSQL.
+        i = 0
+        for schema in entry_sources(db):
+            entries = (
+                source_query(db, schema)
+                .order_by(GuestbookEntry.created_at.desc())
+                .yield_per(EXPORT_CHUNK_SIZE)
+            )
+            for entry in entries:
+                writer.writerow([
+                    entry.id,
+                    entry.callsign,
+                    entry.message,
+                    entry.runde_datetime.isoformat() if entry.runde_datetime else "",
+                    entry.created_at.isoformat(),
+                ])
+                i += 1
+                if i % EXPORT_CHUNK_SIZE == 0:
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+
+        yield output.getvalue()
+    finally:
+        db.close()
+
+
 @router.get("", response_class=HTMLResponse)
 async def admin_page(
     request: Request,
     token: str = Depends(verify_token),
     lang: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    q: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    after: Optional[str] = Query(None),
+    callsign: Optional[str] = Query(None, max_length=settings.MAX_CALLSIGN_LENGTH),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: AsyncDB = Depends(get_db),
 ):
-    """Admin overview page."""
+    """
+    Admin overview page with filters and optional full-text search.
+
+    Only one page of entries is loaded, and the HTML is streamed while the
+    template renders, so memory use does not grow with the guestbook. The
+    page only reads, so it uses the read pool: a slow search must not hold
+    the single writer connection that new entries and imports wait for.
+    """
     current_lang = lang if lang in SUPPORTED_LANGUAGES else settings.DEFAULT_LANGUAGE
     t = Translator(current_lang)
 
-    entries = (
-        db.query(GuestbookEntry)
-        .order_by(GuestbookEntry.created_at.desc())
-        .limit(500)
-        .all()
-    )
-
-    readonly = db.query(ReadOnlyMode).first()
-    is_readonly = readonly.enabled if readonly else settings.READ_ONLY_MODE
-
-    total_count = db.query(GuestbookEntry).count()
-
-    return templates.TemplateResponse(
-        "admin.html",
-        {
-            "request": request,
-            "entries": entries,
-            "is_readonly": is_readonly,
-            "total_count": total_count,
-            "token": token,
-            "settings": settings,
-            "t": t,
-            "lang": current_lang,
-            "languages": SUPPORTED_LANGUAGES,
-        },
-    )
+    search_next = None
+    page = None
+    if q:
+        total_count = await db.run(get_entry_count) + archived_count()
+        try:
+            result = await db.run(search_entries, q, SEARCH_PAGE_SIZE, cursor)
+        except ValueError:
+            result = await db.run(search_entries, q, SEARCH_PAGE_SIZE)
+        entries = result.items
+        search_next = result.next_cursor
+    else:
+        page, total_count = await db.run(load_overview, before, after, callsign, date_from, date_to)
+        entries = page.items
+    await runtime_settings.ensure_fresh()
+    is_readonly = runtime_settings.readonly
+
+    # Query string that keeps token, language and filters across page links
+    filter_params = {
+        key: value for key, value in (
+            ("token", token),
+            ("lang", current_lang),
+            ("callsign", callsign),
+            ("date_from", date_from),
+            ("date_to", date_to),
+        ) if value
+    }
+
+    # generate() yields the output piece by piece; StreamingResponse runs
+    # the sync generator in the threadpool
+    body = templates.get_template("admin.html").generate({
+        "request": request,
+        "entries": entries,
+        "page": page,
+        "is_readonly": is_readonly,
+        "total_count": total_count,
+        "search_query": q or "",
+        "search_next": search_next,
+        "filter_callsign": callsign or "",
+        "filter_date_from": date_from.isoformat() if date_from else "",
+        "filter_date_to": date_to.isoformat() if date_to else "",
+        "filtered": bool(callsign or date_from or date_to),
+        "filter_params": filter_params,
+        "token": token,
+        "settings": settings,
+        "t": t,
+        "lang": current_lang,
+        "languages": SUPPORTED_LANGUAGES,
+    })
+    return StreamingResponse(body, media_type="text/html; charset=utf-8")
 
 
 @router.post("/delete/{entry_id}")
 async def delete_entry(
     entry_id: int,
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_write_db),
 ):
     """Delete a guestbook entry."""
-    entry = db.query(GuestbookEntry).filter(GuestbookEntry.id == entry_id).first()
+    callsign = await db.run(remove_entry, entry_id)
 
-    if not entry:
+    if callsign is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Eintrag nicht gefunden",
         )
 
-    callsign = entry.callsign
-    db.delete(entry)
-    db.commit()
-
+    content_version.bump()
+    event_hub.publish_deleted(entry_id)
     logger.info(f"Admin deleted entry {entry_id} ({callsign})")
 
     return RedirectResponse(
@@ -106,20 +261,13 @@ async def delete_entry(
 @router.post("/readonly/toggle")
 async def toggle_readonly(
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_write_db),
 ):
     """Toggle read-only mode."""
-    readonly = db.query(ReadOnlyMode).first()
+    enabled = await db.run(runtime_settings.toggle_readonly)
+    content_version.bump()
 
-    if not readonly:
-        readonly = ReadOnlyMode(enabled=True)
-        db.add(readonly)
-    else:
-        readonly.enabled = not readonly.enabled
-
-    db.commit()
-
-    new_state = "enabled" if readonly.enabled else "disabled"
+    new_state = "enabled" if enabled else "disabled"
     logger.info(f"Admin toggled read-only mode: {new_state}")
 
     return RedirectResponse(
@@ -131,40 +279,67 @@ async def toggle_readonly(
 @router.get("/export/csv")
 async def export_csv(
     token: str = Depends(verify_token),
-    db: Session = Depends(get_db),
 ):
     """Export all entries as CSV."""
-    entries = (
-        db.query(GuestbookEntry)
-        .order_by(GuestbookEntry.created_at.desc())
-        .all()
-    )
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output, quoting=csv.QUOTE_ALL)
-
-    # Header
-    writer.writerow(["ID", "Rufzeichen", "Nachricht", "Runde", "Datum"])
-
-    # Data
-    for entry in entries:
-        writer.writerow([
-            entry.id,
-            entry.callsign,
-            entry.message,
-            entry.runde_datetime.isoformat() if entry.runde_datetime else "",
-            entry.created_at.isoformat(),
-        ])
-
-    output.seek(0)
-
     # Generate filename with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"gbham_export_{timestamp}.csv"
 
     return StreamingResponse(
-        iter([output.getvalue()]),
+        iter_csv_export(),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
+
+
+@router.post("/import/csv")
+async def import_csv_upload(
+    file: UploadFile = File(...),
+    token: str = Depends(verify_token),
+):
+    """
+    Import entries from a CSV file in the export format.
+
+    Returns a JSON report with the number of imported and rejected rows.
+    """
+    # The upload is spooled to disk; decode and parse it incrementally
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        report = await run_in_threadpool(import_csv, lines)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    finally:
+        lines.detach()
+
+    if report.imported:
+        content_version.bump()
+    logger.info(f"Admin imported {report.imported} entries from {file.filename}")
+
+    return JSONResponse(report.as_dict())
+
+
+@router.post("/checkin")
+async def checkin_batch(
+    batch: CheckinBatch,
+    token: str = Depends(verify_token),
+):
+    """
+    Log the stations of one runde in one request (net control).
+
+    Body: {"runde_datetime": ..., "entries": [{"callsign": ..., "message": ...}]}.
+    Every row gets a result (created with its id, duplicate or rejected
+    with a reason); the valid rows are inserted in one transaction.
+    """
+    rows = [(row.callsign, row.message) for row in batch.entries]
+    report = await run_in_threadpool(checkin_entries, batch.runde_datetime, rows)
+
+    if report.entries:
+        content_version.bump()
+        for entry in report.entries:
+            event_hub.publish_created(entry)
+    logger.info(f"Admin checked in {len(report.entries)} of {len(rows)} stations")
+
+    return JSONResponse(report.as_dict())
@@ -5,15 +5,24 @@ Entry creation and listing endpoints.
 
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+from urllib.parse import quote_plus
 
-from fastapi import APIRouter, Depends, Request, Form, HTTPException, status
-from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response, Form, HTTPException, status
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.exc import IntegrityError
 
-from app.database import get_db
-from app.models import GuestbookEntry, ReadOnlyMode
+from app.conditional import content_state, entity_tag, is_not_modified, not_modified_response, validator_headers
+from app.database import AsyncDB, ReadSessionLocal, get_db
+from app.events import TooManySubscribers, event_hub, event_stream
+from app.replica import get_replica_db
+from app.idempotency import idempotency_key, idempotency_store
+from app.models import GuestbookEntry, IdempotencyKey, naive_utc
 from app.schemas import GuestbookEntryCreate, GuestbookEntryResponse
+from app.page_cache import content_version
+from app.pagination import entries_after, paginate, cursor_for_offset
+from app.search import search_entries
+from app.serialization import ENTRY_COLUMNS, entries_to_json, entries_to_ndjson
 from app.security import (
     get_client_ip,
     rate_limiter,
@@ -24,36 +33,188 @@ from app.security import (
     check_honeypot,
 )
 from app.config import get_settings
+from app.runtime_settings import runtime_settings
+from app.writer import entry_writer
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 router = APIRouter(prefix="/api", tags=["guestbook"])
 
+# Rows fetched per round trip and per streamed chunk
+STREAM_CHUNK_SIZE = 500
 
-def is_readonly_mode(db: Session) -> bool:
-    """Check if read-only mode is enabled."""
-    readonly = db.query(ReadOnlyMode).first()
-    if readonly:
-        return readonly.enabled
-    return settings.READ_ONLY_MODE
+
+def iter_entries_ndjson(since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """
+    Yield all entries (live and archived), oldest first, as NDJSON chunks.
+
+    Every chunk of STREAM_CHUNK_SIZE rows is a separate keyset query with a
+    short-lived read session. A slow client therefore holds no pooled
+    connection or read transaction while it reads, and memory use does not
+    depend on the number of entries.
+    """
+    filters = []
+    if since is not None:
+        filters.append(GuestbookEntry.created_at >= since)
+    if until is not None:
+        filters.append(GuestbookEntry.created_at < until)
+
+    last = None
+    while True:
+        db = ReadSessionLocal()
+        try:
+            rows = entries_after(
+                db,
+                STREAM_CHUNK_SIZE,
+                after=last,
+                filters=filters,
+                min_year=since.year if since else None,
+                max_year=until.year if until else None,
+                columns=ENTRY_COLUMNS,
+            )
+        finally:
+            db.close()
+        if rows:
+            yield entries_to_ndjson(rows)
+        if len(rows) < STREAM_CHUNK_SIZE:
+            return
+        last = (rows[-1].created_at, rows[-1].id)
 
 
 @router.get("/entries", response_model=List[GuestbookEntryResponse])
 async def get_entries(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncDB = Depends(get_replica_db),
     limit: int = 100,
     offset: int = 0,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
 ):
-    """Get guestbook entries in reverse chronological order."""
-    entries = (
-        db.query(GuestbookEntry)
-        .order_by(GuestbookEntry.created_at.desc())
-        .offset(offset)
-        .limit(min(limit, 500))  # Hard limit
-        .all()
+    """
+    Get guestbook entries in reverse chronological order.
+
+    Paginate with the opaque `before`/`after` cursors from the Link header.
+    Legacy `offset` requests are redirected to the equivalent cursor.
+    The response model documents the shape; rows are encoded by the fast
+    path in app.serialization without passing through it.
+    """
+    limit = max(1, min(limit, 500))  # Hard limit
+
+    if offset > 0 and not (before or after):
+        cursor = await db.run(cursor_for_offset, offset, limit)
+        if cursor is None:
+            return []
+        return RedirectResponse(
+            url=f"{request.url.path}?limit={limit}&before={cursor.encode()}",
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        )
+
+    # Conditional GET: answer unchanged lists before loading any entries
+    await runtime_settings.ensure_fresh()
+    modified, live_entries = await db.run(content_state)
+    headers = validator_headers(entity_tag(request, live_entries, modified), modified)
+    if is_not_modified(request, headers["ETag"], modified):
+        return not_modified_response(headers)
+
+    try:
+        # Plain column rows, encoded directly (see app.serialization)
+        result = await db.run(paginate, limit, before=before, after=after, columns=ENTRY_COLUMNS)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ungültiger Cursor",
+        )
+
+    links = []
+    if result.next_cursor:
+        links.append(f'<{request.url.path}?limit={limit}&before={result.next_cursor}>; rel="next"')
+    if result.prev_cursor:
+        links.append(f'<{request.url.path}?limit={limit}&after={result.prev_cursor}>; rel="prev"')
+    if links:
+        headers["Link"] = ", ".join(links)
+
+    return Response(entries_to_json(result.items), media_type="application/json", headers=headers)
+
+
+@router.get("/entries/stream")
+async def stream_entries(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    Stream the whole guestbook as newline-delimited JSON, oldest first.
+
+    `since` (inclusive) and `until` (exclusive) limit the entries by
+    created_at; a mirror can resume with since=<created_at of the last
+    line> (that line is sent again, as since is inclusive).
+    """
+    return StreamingResponse(
+        iter_entries_ndjson(naive_utc(since), naive_utc(until)),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/entries/events")
+async def entry_events(request: Request):
+    """
+    Live feed of new and deleted entries as Server-Sent Events.
+
+    Events are `created` (the entry, as in /api/entries) and `deleted`
+    ({"id": ...}). Served from the in-process hub; open connections cost
+    no database queries.
+    """
+    try:
+        subscription = event_hub.subscribe(request.headers.get("Last-Event-ID"))
+    except TooManySubscribers:
+        logger.warning(f"Event subscriber limit ({event_hub.max_subscribers}) reached")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Zu viele Verbindungen zum Live-Feed"},
+            headers={"Retry-After": "30"},
+        )
+
+    return StreamingResponse(
+        event_stream(event_hub, subscription),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Tell nginx not to buffer the stream
+            "X-Accel-Buffering": "no",
+        },
     )
-    return entries
+
+
+@router.get("/search", response_model=List[GuestbookEntryResponse])
+async def search(
+    request: Request,
+    response: Response,
+    q: str = "",
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncDB = Depends(get_replica_db),
+):
+    """
+    Full-text search over callsign and message, best matches first.
+
+    Further results are linked with rel="next" in the Link header.
+    """
+    limit = max(1, min(limit, 100))
+
+    try:
+        result = await db.run(search_entries, q, limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ungültiger Cursor",
+        )
+
+    if result.next_cursor:
+        response.headers["Link"] = (
+            f'<{request.url.path}?q={quote_plus(q)}&limit={limit}&cursor={result.next_cursor}>; rel="next"'
+        )
+
+    return result.items
 
 
 @router.post("/entries")
@@ -63,11 +224,15 @@ async def create_entry(
     message: str = Form(...),
     runde_datetime: str = Form(...),
     website: str = Form(default=""),  # Honeypot field
-    db: Session = Depends(get_db),
+    form_token: str = Form(default=""),  # Idempotency token of the rendered form
+    db: AsyncDB = Depends(get_db),
 ):
     """
     Create a new guestbook entry.
 
+    A repeated submission (same form token and fields) gets the redirect of
+    the first one and creates no second entry.
+
     Security measures:
     - Honeypot check
     - Rate limiting / cooldown
@@ -78,8 +243,18 @@ async def create_entry(
     """
     client_ip = get_client_ip(request)
 
+    # Replayed submission (double click, browser retry): answer as the first time
+    key = idempotency_key(form_token, callsign, message, runde_datetime)
+    if key is not None:
+        location = await db.run(idempotency_store.lookup, key)
+        if location is not None:
+            idempotency_store.replays += 1
+            logger.info(f"Replayed entry submission from {client_ip}")
+            return RedirectResponse(url=location, status_code=status.HTTP_303_SEE_OTHER)
+
     # Check read-only mode
-    if is_readonly_mode(db):
+    await runtime_settings.ensure_fresh()
+    if runtime_settings.readonly:
         return RedirectResponse(
             url="/?error=readonly",
             status_code=status.HTTP_303_SEE_OTHER,
@@ -143,14 +318,26 @@ async def create_entry(
         logger.warning(f"URL detected from {client_ip}")
         return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
 
-    # Create entry
-    db_entry = GuestbookEntry(
-        callsign=entry_data.callsign,
-        message=entry_data.message,
-        runde_datetime=entry_data.runde_datetime,
-    )
-    db.add(db_entry)
-    db.commit()
+    # Create entry (group-committed by the single writer, with its key)
+    location = "/?success=1"
+    try:
+        entry = await entry_writer.submit(
+            GuestbookEntry(
+                callsign=entry_data.callsign,
+                message=entry_data.message,
+                runde_datetime=entry_data.runde_datetime,
+            ),
+            IdempotencyKey(key=key, location=location) if key else None,
+        )
+    except IntegrityError:
+        if key is None or idempotency_store.cached(key) is None:
+            raise
+        # The same submission was committed concurrently
+        idempotency_store.replays += 1
+        return RedirectResponse(url=location, status_code=status.HTTP_303_SEE_OTHER)
+
+    content_version.bump()
+    event_hub.publish_created(entry)
 
     # Record entry for cooldown
     rate_limiter.record_entry(client_ip)
@@ -158,6 +345,6 @@ async def create_entry(
     logger.info(f"New entry from {entry_data.callsign}")
 
     return RedirectResponse(
-        url="/?success=1",
+        url=location,
         status_code=status.HTTP_303_SEE_OTHER,
     )
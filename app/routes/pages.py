@@ -3,30 +3,29 @@ gbHam Pages Routes
 Server-side rendered HTML pages with multi-language support.
 """
 
+import secrets
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Request, Query, Cookie
+from fastapi import APIRouter, Depends, Request, Query, Cookie, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import GuestbookEntry, ReadOnlyMode
+from app.database import AsyncDB
+from app.replica import get_replica_db
 from app.config import get_settings
+from app.archive import archived_count
+from app.compression import Precompressed, encoded_etag
+from app.conditional import content_state, entity_tag, is_not_modified, not_modified_response, validator_headers
+from app.page_cache import content_version, page_cache
+from app.pagination import Cursor, paginate, cursor_for_offset
+from app.runtime_settings import runtime_settings
+from app.templating import templates
+from app.static_pages import StaticPageCache, static_page_response
 from app.translations import Translator, SUPPORTED_LANGUAGES
 
 settings = get_settings()
 
 router = APIRouter(tags=["pages"])
-templates = Jinja2Templates(directory="app/templates")
-
-
-def get_readonly_status(db: Session) -> bool:
-    """Check if read-only mode is enabled."""
-    readonly = db.query(ReadOnlyMode).first()
-    if readonly:
-        return readonly.enabled
-    return settings.READ_ONLY_MODE
+static_pages = StaticPageCache(templates.env)
 
 
 def get_language(lang: Optional[str], lang_cookie: Optional[str]) -> str:
@@ -38,42 +37,107 @@ def get_language(lang: Optional[str], lang_cookie: Optional[str]) -> str:
     return settings.DEFAULT_LANGUAGE
 
 
+# Cached pages expire after PAGE_CACHE_TTL; quality 11 would cost several
+# times the CPU for a slightly smaller page
+PAGE_BROTLI_QUALITY = 9
+
+
+def precompressed_response(request: Request, content: Precompressed, headers: dict) -> HTMLResponse:
+    """Serve the best precompressed variant of a cached page."""
+    encoding, body = content.select(request.headers.get("accept-encoding", ""))
+    headers = {**headers, **content.headers(encoding), "ETag": encoded_etag(headers["ETag"], encoding)}
+    headers["Vary"] += ", Cookie"
+    return HTMLResponse(body, headers=headers)
+
+
+# Error codes of the entry form that can be cached (cooldown carries a
+# per-visitor countdown and is rendered fresh)
+CACHEABLE_ERRORS = {"readonly", "encoding", "validation"}
+
+
+def set_language_cookie(response, lang: Optional[str]):
+    """Remember an explicitly chosen language."""
+    if lang and lang in SUPPORTED_LANGUAGES:
+        response.set_cookie(
+            key="gbham_lang",
+            value=lang,
+            max_age=365 * 24 * 60 * 60,  # 1 year
+            httponly=True,
+            samesite="lax",
+        )
+
+
 @router.get("/", response_class=HTMLResponse)
 async def index(
     request: Request,
     page: int = Query(1, ge=1),
+    before: Optional[str] = Query(None),
+    after: Optional[str] = Query(None),
     lang: Optional[str] = Query(None),
     success: Optional[str] = Query(None),
     error: Optional[str] = Query(None),
     remaining: Optional[int] = Query(None),
     lang_cookie: Optional[str] = Cookie(None, alias="gbham_lang"),
-    db: Session = Depends(get_db),
+    db: AsyncDB = Depends(get_replica_db),
 ):
-    """Main guestbook page with pagination."""
+    """Main guestbook page with keyset pagination."""
     current_lang = get_language(lang, lang_cookie)
     t = Translator(current_lang)
     per_page = settings.ENTRIES_PER_PAGE
 
+    await runtime_settings.ensure_fresh()
+    is_readonly = runtime_settings.readonly
+
+    # Rendered pages are cached per position, language and flash message
+    legacy_page = page > 1 and not (before or after)
+    cacheable = not legacy_page and (error is None or error in CACHEABLE_ERRORS)
+
+    # Conditional GET: answer unchanged pages before loading any entries
+    modified, live_entries = await db.run(content_state)
+    headers = validator_headers(entity_tag(request, current_lang, live_entries, modified), modified)
+    headers["Vary"] = "Cookie"  # the language may come from the cookie
+    if not legacy_page and is_not_modified(request, headers["ETag"], modified):
+        response = not_modified_response(headers)
+        set_language_cookie(response, lang)
+        return response
+
+    # The ETag inputs are part of the key: writes from another process do not
+    # bump content_version, and a cached body must never carry a newer tag
+    cache_key = (
+        "index", before, after, current_lang, is_readonly, bool(success), error,
+        content_version.value, runtime_settings.version,
+        getattr(request.state, "data_generation", 0), live_entries, modified,
+    )
+    if cacheable:
+        content = page_cache.get(cache_key)
+        if content is not None:
+            response = precompressed_response(request, content, {**headers, "X-Page-Cache": "hit"})
+            set_language_cookie(response, lang)
+            return response
+
     # Get total count for pagination
-    total_entries = db.query(GuestbookEntry).count()
+    total_entries = live_entries + archived_count()
     total_pages = max(1, (total_entries + per_page - 1) // per_page)
 
-    # Ensure page is within valid range
-    page = min(page, total_pages)
-
-    # Calculate offset
-    offset = (page - 1) * per_page
-
-    # Get paginated entries
-    entries = (
-        db.query(GuestbookEntry)
-        .order_by(GuestbookEntry.created_at.desc())
-        .offset(offset)
-        .limit(per_page)
-        .all()
-    )
-
-    is_readonly = get_readonly_status(db)
+    # Legacy ?page=N links: redirect to the equivalent cursor
+    if legacy_page:
+        page = min(page, total_pages)
+        cursor = await db.run(cursor_for_offset, (page - 1) * per_page, per_page)
+        url = f"/?before={cursor.encode()}&lang={current_lang}" if cursor else f"/?lang={current_lang}"
+        return RedirectResponse(url=url, status_code=status.HTTP_302_FOUND)
+
+    # "Last page" opens the oldest entries directly instead of counting an
+    # offset; like the ?page=N pages, it holds the remainder
+    last_cursor = Cursor.oldest(total_pages).encode()
+    page_size = per_page
+    if after == last_cursor:
+        page_size = total_entries - (total_pages - 1) * per_page or per_page
+
+    try:
+        result = await db.run(paginate, page_size, before=before, after=after)
+    except ValueError:
+        return RedirectResponse(url=f"/?lang={current_lang}", status_code=status.HTTP_302_FOUND)
+    entries = result.items
 
     # Prepare error messages using translations
     error_message = None
@@ -87,42 +151,40 @@ async def index(
 
     # Pagination info
     pagination = {
-        "page": page,
+        "page": min(result.page, total_pages),
         "per_page": per_page,
         "total_entries": total_entries,
         "total_pages": total_pages,
-        "has_prev": page > 1,
-        "has_next": page < total_pages,
-        "prev_page": page - 1 if page > 1 else None,
-        "next_page": page + 1 if page < total_pages else None,
+        "has_prev": result.has_prev,
+        "has_next": result.has_next,
+        "prev_cursor": result.prev_cursor,
+        "next_cursor": result.next_cursor,
+        "last_cursor": last_cursor,
     }
 
-    response = templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "entries": entries,
-            "is_readonly": is_readonly,
-            "error_message": error_message,
-            "success_message": success_message,
-            "settings": settings,
-            "pagination": pagination,
-            "t": t,
-            "lang": current_lang,
-            "languages": SUPPORTED_LANGUAGES,
-        },
-    )
-
-    # Set language cookie if changed
-    if lang and lang in SUPPORTED_LANGUAGES:
-        response.set_cookie(
-            key="gbham_lang",
-            value=lang,
-            max_age=365 * 24 * 60 * 60,  # 1 year
-            httponly=True,
-            samesite="lax",
-        )
-
+    body = templates.get_template("index.html").render({
+        "request": request,
+        "entries": entries,
+        "is_readonly": is_readonly,
+        "error_message": error_message,
+        "success_message": success_message,
+        "settings": settings,
+        "pagination": pagination,
+        "t": t,
+        "lang": current_lang,
+        "languages": SUPPORTED_LANGUAGES,
+        # Shared by visitors of a cached page; see app/idempotency.py
+        "form_token": secrets.token_urlsafe(16),
+    }).encode("utf-8")
+
+    if cacheable:
+        # Compressed once here, every hit is served without compressing again
+        content = Precompressed.of(body, brotli_quality=PAGE_BROTLI_QUALITY)
+        page_cache.put(cache_key, content)
+        response = precompressed_response(request, content, {**headers, "X-Page-Cache": "miss"})
+    else:
+        response = HTMLResponse(body, headers={**headers, "X-Page-Cache": "bypass"})
+    set_language_cookie(response, lang)
     return response
 
 
@@ -133,29 +195,9 @@ async def privacy(
     lang_cookie: Optional[str] = Cookie(None, alias="gbham_lang"),
 ):
     """Privacy notice page (DSGVO/GDPR)."""
-    current_lang = get_language(lang, lang_cookie)
-    t = Translator(current_lang)
-
-    response = templates.TemplateResponse(
-        "privacy.html",
-        {
-            "request": request,
-            "settings": settings,
-            "t": t,
-            "lang": current_lang,
-            "languages": SUPPORTED_LANGUAGES,
-        },
-    )
-
-    if lang and lang in SUPPORTED_LANGUAGES:
-        response.set_cookie(
-            key="gbham_lang",
-            value=lang,
-            max_age=365 * 24 * 60 * 60,
-            httponly=True,
-            samesite="lax",
-        )
-
+    page = static_pages.get("privacy", get_language(lang, lang_cookie))
+    response = static_page_response(request, page)
+    set_language_cookie(response, lang)
     return response
 
 
@@ -166,27 +208,7 @@ async def imprint(
     lang_cookie: Optional[str] = Cookie(None, alias="gbham_lang"),
 ):
     """Imprint page (Impressum)."""
-    current_lang = get_language(lang, lang_cookie)
-    t = Translator(current_lang)
-
-    response = templates.TemplateResponse(
-        "imprint.html",
-        {
-            "request": request,
-            "settings": settings,
-            "t": t,
-            "lang": current_lang,
-            "languages": SUPPORTED_LANGUAGES,
-        },
-    )
-
-    if lang and lang in SUPPORTED_LANGUAGES:
-        response.set_cookie(
-            key="gbham_lang",
-            value=lang,
-            max_age=365 * 24 * 60 * 60,
-            httponly=True,
-            samesite="lax",
-        )
-
+    page = static_pages.get("imprint", get_language(lang, lang_cookie))
+    response = static_page_response(request, page)
+    set_language_cookie(response, lang)
     return response
@@ -0,0 +1,155 @@
+"""
+gbHam Runtime Settings
+In-memory cache of the settings stored in the database.
+
+The read-only flag (`readonly_mode`) and the key/value table `app_settings`
+change rarely but used to be queried on every request. They are now loaded
+once and served from memory. Every write bumps `settings_version` in
+`app_settings` in the same transaction; other workers and processes compare
+that single value at most every SETTINGS_REFRESH_INTERVAL seconds and reload
+only when it changed.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import ReadSessionLocal
+from app.models import AppSettings, ReadOnlyMode
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+VERSION_KEY = "settings_version"
+
+
+class RuntimeSettings:
+    """Process-local cache of ReadOnlyMode and AppSettings."""
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = (
+            refresh_interval if refresh_interval is not None else settings.SETTINGS_REFRESH_INTERVAL
+        )
+        self._values: Dict[str, str] = {}
+        self._readonly: bool = settings.READ_ONLY_MODE
+        self._version: Optional[int] = None  # None = not loaded yet
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Held while one thread checks the stored version
+        self._refresh_lock = threading.Lock()
+
+    # -- Reads (memory only) ----------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Current settings version (changes on every settings write)."""
+        return self._version or 0
+
+    @property
+    def readonly(self) -> bool:
+        """Whether the guestbook is in read-only mode."""
+        return self._readonly
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get an AppSettings value."""
+        return self._values.get(key, default)
+
+    # -- Loading ----------------------------------------------------------
+
+    def load(self, db: Session):
+        """Load all settings from the database."""
+        values = {row.key: row.value for row in db.query(AppSettings).all()}
+        readonly = db.query(ReadOnlyMode).first()
+
+        with self._lock:
+            self._values = values
+            self._readonly = readonly.enabled if readonly else settings.READ_ONLY_MODE
+            self._version = int(values.get(VERSION_KEY, "0"))
+            self._checked_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        """Whether the stored version should be checked again."""
+        return (
+            self._version is None
+            or time.monotonic() - self._checked_at >= self.refresh_interval
+        )
+
+    def refresh(self, db: Session):
+        """Reload if another worker or process changed the settings."""
+        stored = (
+            db.query(AppSettings.value)
+            .filter(AppSettings.key == VERSION_KEY)
+            .scalar()
+        )
+        if self._version is None or int(stored or "0") != self._version:
+            self.load(db)
+            logger.debug(f"Runtime settings reloaded (version {self._version})")
+        else:
+            self._checked_at = time.monotonic()
+
+    def _refresh_with_own_session(self):
+        # One thread checks the stored version; the others keep serving the
+        # cached state. Only the very first load is waited for.
+        if not self._refresh_lock.acquire(blocking=self._version is None):
+            return
+        try:
+            if not self.is_stale():
+                return
+            db = ReadSessionLocal()
+            try:
+                self.refresh(db)
+            finally:
+                db.close()
+        finally:
+            self._refresh_lock.release()
+
+    async def ensure_fresh(self):
+        """Check the stored version if the refresh interval has passed."""
+        if self.is_stale():
+            await run_in_threadpool(self._refresh_with_own_session)
+
+    # -- Writes -----------------------------------------------------------
+
+    def _bump_version(self, db: Session) -> int:
+        row = db.query(AppSettings).filter(AppSettings.key == VERSION_KEY).first()
+        if row is None:
+            row = AppSettings(key=VERSION_KEY, value="1")
+            db.add(row)
+        else:
+            row.value = str(int(row.value) + 1)
+        return int(row.value)
+
+    def set(self, db: Session, key: str, value: str):
+        """Store an AppSettings value."""
+        row = db.query(AppSettings).filter(AppSettings.key == key).first()
+        if row is None:
+            db.add(AppSettings(key=key, value=value))
+        else:
+            row.value = value
+        self._bump_version(db)
+        db.commit()
+        self.load(db)
+
+    def toggle_readonly(self, db: Session) -> bool:
+        """Toggle read-only mode. Returns the new state."""
+        readonly = db.query(ReadOnlyMode).first()
+
+        if not readonly:
+            readonly = ReadOnlyMode(enabled=True)
+            db.add(readonly)
+        else:
+            readonly.enabled = not readonly.enabled
+
+        self._bump_version(db)
+        db.commit()
+        self.load(db)
+        return self._readonly
+
+
+# Global runtime settings instance
+runtime_settings = RuntimeSettings()
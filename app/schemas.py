@@ -4,7 +4,7 @@ Request/Response validation schemas.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, field_validator, Field
 
@@ -63,6 +63,20 @@ class GuestbookEntryResponse(BaseModel):
         from_attributes = True
 
 
+class CheckinRow(BaseModel):
+    """One station in a check-in batch; validated by prepare_entry."""
+
+    callsign: str
+    message: str
+
+
+class CheckinBatch(BaseModel):
+    """Stations logged by net control for one runde."""
+
+    runde_datetime: datetime
+    entries: List[CheckinRow] = Field(..., min_length=1, max_length=settings.MAX_CHECKIN_ENTRIES)
+
+
 class StatusResponse(BaseModel):
     """Schema for status responses."""
 
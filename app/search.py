@@ -0,0 +1,257 @@
+"""
+gbHam Full-Text Search
+Ranked search over callsign and message using SQLite FTS5.
+
+The `guestbook_fts` virtual table is an external-content index over
+`guestbook_entries` kept in sync by triggers (see migration 6). Results are
+ordered by bm25 relevance and paginated with a (rank, id) cursor, so later
+pages cost the same as the first one.
+
+Yearly archive files (see app.archive) carry their own FTS index; a search
+queries the live index and every attached archive and merges the results.
+bm25 statistics are per index, so ranks across years are close to, but not
+exactly, what a single combined index would give.
+
+On PostgreSQL the same API is served by a GIN expression index over
+to_tsvector('simple', callsign || ' ' || message), ranked by ts_rank.
+"""
+
+import base64
+import binascii
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import is_sqlite, sql_integer
+from app.models import GuestbookEntry
+
+# Maximum number of search terms taken from a query
+MAX_TERMS = 8
+
+# {schema} is empty for the live database or "<alias>." for an attached archive
+FTS_TABLE_DDL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS {schema}guestbook_fts USING fts5(
+        callsign,
+        message,
+        content='guestbook_entries',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+FTS_SCHEMA = [
+    FTS_TABLE_DDL.format(schema=""),
+    """
+    CREATE TRIGGER IF NOT EXISTS guestbook_fts_after_insert
+    AFTER INSERT ON guestbook_entries
+    BEGIN
+        INSERT INTO guestbook_fts (rowid, callsign, message)
+        VALUES (new.id, new.callsign, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS guestbook_fts_after_delete
+    AFTER DELETE ON guestbook_entries
+    BEGIN
+        INSERT INTO guestbook_fts (guestbook_fts, rowid, callsign, message)
+        VALUES ('delete', old.id, old.callsign, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS guestbook_fts_after_update
+    AFTER UPDATE ON guestbook_entries
+    BEGIN
+        INSERT INTO guestbook_fts (guestbook_fts, rowid, callsign, message)
+        VALUES ('delete', old.id, old.callsign, old.message);
+        INSERT INTO guestbook_fts (rowid, callsign, message)
+        VALUES (new.id, new.callsign, new.message);
+    END
+    """,
+]
+
+# PostgreSQL: the indexed expression must match POSTGRES_DOCUMENT exactly
+POSTGRES_DOCUMENT = "to_tsvector('simple', callsign || ' ' || message)"
+
+POSTGRES_FTS_INDEX = "ix_guestbook_entries_fts"
+
+
+def install_fts(connection: Connection):
+    """Create the FTS index and its triggers, then index existing entries."""
+    if not is_sqlite(connection):
+        from app.migrations import create_index_online
+        create_index_online(
+            connection, POSTGRES_FTS_INDEX, "guestbook_entries", [f"({POSTGRES_DOCUMENT})"], using="GIN"
+        )
+        return
+    for ddl in FTS_SCHEMA:
+        connection.execute(text(ddl))
+    connection.execute(text("INSERT INTO guestbook_fts (guestbook_fts) VALUES ('rebuild')"))
+
+
+# ASCII control characters other than whitespace (FTS5 rejects e.g. NUL
+# inside a quoted term); whitespace still separates words
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0e-\x1f\x7f]")
+
+
+def _terms(query: str) -> List[str]:
+    """Words of a search query, without control characters."""
+    query = CONTROL_CHARS.sub("", query)
+    return [t for t in re.split(r"\s+", query.strip()) if t][:MAX_TERMS]
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Turn user input into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so FTS5 operators and syntax
+    characters in the input are treated as plain text; control characters
+    are dropped. Returns None if the input contains no searchable words.
+    """
+    terms = [t.replace('"', '""') for t in _terms(query)]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Turn user input into a safe PostgreSQL to_tsquery expression.
+
+    Same rules as build_match_query(): every word becomes a quoted prefix
+    lexeme, all of which must match.
+    """
+    terms = [t.replace("\\", "\\\\").replace("'", "''") for t in _terms(query)]
+    if not terms:
+        return None
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+@dataclass
+class SearchCursor:
+    """Position in a ranked result list."""
+
+    rank: float
+    id: int
+
+    def encode(self) -> str:
+        raw = f"{self.rank!r}|{self.id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SearchCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            rank, entry_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+            return cls(float(rank), sql_integer(entry_id))
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise ValueError(f"Ungültiger Cursor: {token!r}") from e
+
+
+@dataclass
+class SearchPage:
+    """One page of ranked search results."""
+
+    items: List = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def search_entries(
+    db: Session,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> SearchPage:
+    """
+    Search entries by callsign and message, best matches first.
+
+    Raises ValueError for malformed cursors.
+    """
+    if not is_sqlite(db.get_bind()):
+        return _search_postgres(db, query, limit, cursor)
+
+    match = build_match_query(query)
+    if match is None:
+        return SearchPage()
+
+    params = {"match": match, "limit": limit + 1}
+    after = ""
+    if cursor:
+        position = SearchCursor.decode(cursor)
+        after = "AND (bm25(guestbook_fts), guestbook_fts.rowid) > (:rank, :id)"
+        params.update(rank=position.rank, id=position.id)
+
+    from app.archive import entry_sources, source_query
+
+    rows = []
+    sources = entry_sources(db)
+    try:
+        for schema in sources:
+            fts = f"{schema}.guestbook_fts" if schema else "guestbook_fts"
+            found = db.execute(
+                text(
+                    "SELECT guestbook_fts.rowid AS id, bm25(guestbook_fts) AS rank "
+                    f"FROM {fts} AS guestbook_fts "
+                    f"WHERE guestbook_fts MATCH :match {after} "
+                    "ORDER BY rank, id LIMIT :limit"
+                ),
+                params,
+            ).all()
+            if not found:
+                continue
+            ids = [r.id for r in found]
+            entries = source_query(db, schema).filter(GuestbookEntry.id.in_(ids)).all()
+            by_id = {entry.id: entry for entry in entries}
+            rows.extend((r.rank, r.id, by_id[r.id]) for r in found if r.id in by_id)
+    finally:
+        sources.close()
+
+    rows.sort(key=lambda row: (row[0], row[1]))
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    page = SearchPage(items=[entry for _, _, entry in rows])
+    if has_next and rows:
+        page.next_cursor = SearchCursor(rows[-1][0], rows[-1][1]).encode()
+    return page
+
+
+def _search_postgres(db: Session, query: str, limit: int, cursor: Optional[str]) -> SearchPage:
+    """search_entries() for PostgreSQL. Ranks are negated so that lower is better, as with bm25."""
+    match = build_tsquery(query)
+    if match is None:
+        return SearchPage()
+
+    params = {"match": match, "limit": limit + 1}
+    after = ""
+    if cursor:
+        position = SearchCursor.decode(cursor)
+        after = "WHERE (hits.rank, hits.id) > (:rank, :id)"
+        params.update(rank=position.rank, id=position.id)
+
+    rows = db.execute(
+        text(
+            "SELECT hits.id, hits.rank FROM ("
+            f"SELECT id, -ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', :match)) AS rank "
+            "FROM guestbook_entries "
+            f"WHERE {POSTGRES_DOCUMENT} @@ to_tsquery('simple', :match)"
+            f") AS hits {after} "
+            "ORDER BY hits.rank, hits.id LIMIT :limit"
+        ),
+        params,
+    ).all()
+
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    by_id = {
+        entry.id: entry
+        for entry in db.query(GuestbookEntry).filter(GuestbookEntry.id.in_([r.id for r in rows]))
+    }
+    page = SearchPage(items=[by_id[r.id] for r in rows if r.id in by_id])
+    if has_next and rows:
+        page.next_cursor = SearchCursor(rows[-1].rank, rows[-1].id).encode()
+    return page
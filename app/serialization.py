@@ -0,0 +1,56 @@
+"""
+gbHam JSON Serialization
+Fast path for the JSON entry API.
+
+/api/entries and /api/entries/stream select only the columns of
+GuestbookEntryResponse and encode the rows straight to bytes, without
+building ORM objects or validating them through Pydantic. orjson is used
+when installed, the standard library otherwise. The output has the same
+shape as the Pydantic path: the fields of GuestbookEntryResponse in order,
+ISO 8601 datetimes, UTC as "Z".
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from app.models import GuestbookEntry
+from app.schemas import GuestbookEntryResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Columns selected for the API, in response order
+ENTRY_FIELDS = list(GuestbookEntryResponse.model_fields)
+ENTRY_COLUMNS = [getattr(GuestbookEntry, name) for name in ENTRY_FIELDS]
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        if value.utcoffset() == timedelta(0):
+            text = text[:-6] + "Z"
+        return text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Encode a JSON value to bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        value, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def entries_to_json(rows: Iterable) -> bytes:
+    """Encode rows of ENTRY_COLUMNS as a JSON array of entry objects."""
+    items: List[dict] = [dict(zip(ENTRY_FIELDS, row)) for row in rows]
+    return dumps(items)
+
+
+def entries_to_ndjson(rows: Iterable) -> bytes:
+    """Encode rows of ENTRY_COLUMNS as newline-delimited JSON, one entry per line."""
+    return b"".join(dumps(dict(zip(ENTRY_FIELDS, row))) + b"\n" for row in rows)
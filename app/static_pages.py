@@ -0,0 +1,100 @@
+"""
+gbHam Static Pages
+Pre-rendered privacy notice and imprint.
+
+Both pages depend only on the operator settings and the language, so they
+are rendered once per language (at startup, or on first use) and served as
+bytes, together with gzip/Brotli variants compressed ahead of time. The ETag is
+a hash of the body, so it stays valid across restarts; browsers may keep
+the pages for a day and revalidate cheaply afterwards.
+
+The operator settings are read once per process (get_settings is cached),
+so a rendered page stays valid until the next restart.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from fastapi import Request, Response
+from jinja2 import Environment
+
+from app.compression import Precompressed, encoded_etag
+from app.conditional import is_not_modified, not_modified_response
+from app.config import get_settings
+from app.translations import Translator, SUPPORTED_LANGUAGES
+
+settings = get_settings()
+
+# Page name -> template
+STATIC_PAGES = {
+    "privacy": "privacy.html",
+    "imprint": "imprint.html",
+}
+
+CACHE_CONTROL = "public, max-age=86400"
+
+
+@dataclass
+class RenderedPage:
+    """A rendered page and its precompressed variants."""
+
+    content: Precompressed
+    etag: str
+
+
+class StaticPageCache:
+    """Rendered static pages per (page, language)."""
+
+    def __init__(self, env: Environment):
+        self.env = env
+        self._pages: Dict[Tuple[str, str], RenderedPage] = {}
+        self._lock = threading.Lock()
+        # Statistics
+        self.renders = 0
+
+    def _render(self, name: str, lang: str) -> RenderedPage:
+        body = self.env.get_template(STATIC_PAGES[name]).render({
+            "settings": settings,
+            "t": Translator(lang),
+            "lang": lang,
+            "languages": SUPPORTED_LANGUAGES,
+        }).encode("utf-8")
+        self.renders += 1
+        return RenderedPage(
+            content=Precompressed.of(body),
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        )
+
+    def get(self, name: str, lang: str) -> RenderedPage:
+        """Rendered page, rendering it first if missing."""
+        page = self._pages.get((name, lang))
+        if page is not None:
+            return page
+        with self._lock:
+            page = self._pages.get((name, lang))
+            if page is None:
+                page = self._pages[(name, lang)] = self._render(name, lang)
+            return page
+
+    def prerender(self):
+        """Render every page in every supported language."""
+        for name in STATIC_PAGES:
+            for lang in SUPPORTED_LANGUAGES:
+                self.get(name, lang)
+
+
+def static_page_response(request: Request, page: RenderedPage) -> Response:
+    """Serve a rendered page: 304, or the best precompressed variant."""
+    encoding, body = page.content.select(request.headers.get("accept-encoding", ""))
+    headers = {
+        **page.content.headers(encoding),
+        "ETag": encoded_etag(page.etag, encoding),
+        "Cache-Control": CACHE_CONTROL,
+    }
+    headers["Vary"] += ", Cookie"
+
+    if is_not_modified(request, page.etag):
+        return not_modified_response(headers)
+    return Response(body, media_type="text/html; charset=utf-8", headers=headers)
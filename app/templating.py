@@ -0,0 +1,70 @@
+"""
+gbHam Templating
+The Jinja2 environment shared by all routes.
+
+One environment means one template cache: base.html and friends are
+compiled once per process, not once per router. Templates are compiled
+eagerly at startup (`precompile()`), so the first visitor does not pay for
+it, and the compiled bytecode is kept in TEMPLATE_CACHE_DIR, so restarts
+skip the parsing step as well.
+
+Jinja checks the template files for changes on every lookup unless
+auto-reload is off; it is off by default and can be turned on with
+TEMPLATE_AUTO_RELOAD=true while editing templates.
+"""
+
+import logging
+import os
+import time
+from typing import Optional
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.assets import static_url
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TEMPLATE_DIR = "app/templates"
+
+
+def bytecode_cache(directory: Optional[str] = None) -> Optional[FileSystemBytecodeCache]:
+    """Bytecode cache in `directory`, or None if disabled or not writable."""
+    directory = settings.TEMPLATE_CACHE_DIR if directory is None else directory
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled: {e}")
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def create_environment(
+    cache_dir: Optional[str] = None,
+    auto_reload: Optional[bool] = None,
+) -> Environment:
+    """Create a template environment with the app's globals."""
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=settings.TEMPLATE_AUTO_RELOAD if auto_reload is None else auto_reload,
+        bytecode_cache=bytecode_cache(cache_dir),
+    )
+    env.globals["static_url"] = static_url
+    return env
+
+
+def precompile(env: Environment) -> float:
+    """Load (and compile) every template; returns the time taken in seconds."""
+    start = time.perf_counter()
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+    return time.perf_counter() - start
+
+
+# Shared instance
+templates = Jinja2Templates(env=create_environment())
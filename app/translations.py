@@ -1,11 +1,24 @@
 """
 gbHam Translations
 Multi-language support for German, English, Italian, Slovenian.
+Further languages can be added as catalog files (see TRANSLATIONS_DIR).
 """
 
-from typing import Dict
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Tuple, Union
 
-SUPPORTED_LANGUAGES = ["de", "en", "it", "sl"]
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BUILTIN_LANGUAGES = ["de", "en", "it", "sl"]
+# Extended by catalog files in TRANSLATIONS_DIR
+SUPPORTED_LANGUAGES = list(BUILTIN_LANGUAGES)
 DEFAULT_LANGUAGE = "de"
 
 TRANSLATIONS: Dict[str, Dict[str, str]] = {
@@ -788,6 +801,60 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "it": "Nessuna voce disponibile.",
         "sl": "Ni vnosov.",
     },
+    "admin_search": {
+        "de": "Suchen",
+        "en": "Search",
+        "it": "Cerca",
+        "sl": "Išči",
+    },
+    "admin_search_placeholder": {
+        "de": "Rufzeichen oder Text",
+        "en": "Callsign or text",
+        "it": "Nominativo o testo",
+        "sl": "Klicni znak ali besedilo",
+    },
+    "admin_search_clear": {
+        "de": "Suche zurücksetzen",
+        "en": "Clear search",
+        "it": "Azzera ricerca",
+        "sl": "Počisti iskanje",
+    },
+    "admin_search_no_results": {
+        "de": "Keine passenden Einträge gefunden.",
+        "en": "No matching entries found.",
+        "it": "Nessuna voce corrispondente trovata.",
+        "sl": "Ni ustreznih vnosov.",
+    },
+    "admin_filter": {
+        "de": "Filtern",
+        "en": "Filter",
+        "it": "Filtra",
+        "sl": "Filtriraj",
+    },
+    "admin_filter_from": {
+        "de": "Von",
+        "en": "From",
+        "it": "Dal",
+        "sl": "Od",
+    },
+    "admin_filter_to": {
+        "de": "Bis",
+        "en": "To",
+        "it": "Al",
+        "sl": "Do",
+    },
+    "admin_filter_clear": {
+        "de": "Filter zurücksetzen",
+        "en": "Clear filter",
+        "it": "Azzera filtro",
+        "sl": "Počisti filter",
+    },
+    "admin_filter_no_results": {
+        "de": "Keine Einträge für diesen Filter.",
+        "en": "No entries match this filter.",
+        "it": "Nessuna voce per questo filtro.",
+        "sl": "Ni vnosov za ta filter.",
+    },
 
     # ===================
     # Error Pages
@@ -843,6 +910,105 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
 }
 
 
+# ===================
+# Compiled catalogs
+# ===================
+#
+# TRANSLATIONS is compiled into one flat table per language: the fallback
+# to German is resolved once, and texts with {0}, {1}, ... placeholders are
+# split into literal parts and argument indices. A lookup is then a single
+# dict access, and formatting a join.
+#
+# Catalogs can also be supplied as JSON files (<lang>.json, a flat object
+# of key -> text) in TRANSLATIONS_DIR. A file adds or overrides texts of a
+# language; a file for a new language makes that language selectable.
+# Files are only read when their language is first used.
+
+# Literal text, or a tuple of literal parts and argument indices
+Message = Union[str, Tuple[Union[str, int], ...]]
+
+_PLACEHOLDER = re.compile(r"\{(\d+)\}")
+
+
+def compile_message(text: str) -> Message:
+    """Pre-parse the placeholders of a text."""
+    parts = _PLACEHOLDER.split(text)
+    if len(parts) == 1:
+        return text
+    # re.split puts the captured indices at odd positions
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts) if part or i % 2)
+
+
+def format_message(message: Message, args: tuple) -> str:
+    """Fill in placeholders; those without an argument are kept as they are."""
+    if isinstance(message, str):
+        return message
+    return "".join(
+        part if isinstance(part, str) else (str(args[part]) if part < len(args) else f"{{{part}}}")
+        for part in message
+    )
+
+
+class Catalogs:
+    """Compiled lookup tables per language, built on first use."""
+
+    def __init__(self, translations: Dict[str, Dict[str, str]], directory: str = ""):
+        self.translations = translations
+        self.directory = directory
+        self._tables: Dict[str, Dict[str, Message]] = {}
+        self._lock = threading.Lock()
+
+    def external_languages(self) -> List[str]:
+        """Languages with a catalog file in the directory."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[:-5] for name in os.listdir(self.directory)
+            if name.endswith(".json") and re.fullmatch(r"[a-z]{2,3}", name[:-5])
+        )
+
+    def _texts(self, lang: str) -> Dict[str, str]:
+        texts = {key: texts[lang] for key, texts in self.translations.items() if texts.get(lang)}
+        path = os.path.join(self.directory, f"{lang}.json") if self.directory else ""
+        if path and os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                external = json.load(f)
+            texts.update({key: text for key, text in external.items() if isinstance(text, str) and text})
+            logger.info(f"Translation catalog loaded: {path} ({len(external)} texts)")
+        return texts
+
+    def table(self, lang: str) -> Dict[str, Message]:
+        """The compiled table for a language (German texts fill the gaps)."""
+        table = self._tables.get(lang)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(lang)
+                if table is None:
+                    texts = self._texts(DEFAULT_LANGUAGE)
+                    if lang != DEFAULT_LANGUAGE:
+                        texts.update(self._texts(lang))
+                    table = {key: compile_message(text) for key, text in texts.items()}
+                    self._tables[lang] = table
+        return table
+
+    def compile(self, languages: List[str]):
+        """Build the tables of the given languages now."""
+        for lang in languages:
+            self.table(lang)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+
+catalogs = Catalogs(TRANSLATIONS, settings.TRANSLATIONS_DIR)
+SUPPORTED_LANGUAGES.extend(
+    lang for lang in catalogs.external_languages() if lang not in SUPPORTED_LANGUAGES
+)
+# Built-in languages are compiled right away; external ones on first use
+catalogs.compile(BUILTIN_LANGUAGES)
+
+
 def get_translation(key: str, lang: str, *args) -> str:
     """
     Get translation for a key in the specified language.
@@ -852,18 +1018,10 @@ def get_translation(key: str, lang: str, *args) -> str:
     if lang not in SUPPORTED_LANGUAGES:
         lang = DEFAULT_LANGUAGE
 
-    translation_dict = TRANSLATIONS.get(key)
-    if not translation_dict:
+    message = catalogs.table(lang).get(key)
+    if message is None:
         return key
-
-    text = translation_dict.get(lang) or translation_dict.get(DEFAULT_LANGUAGE) or key
-
-    # Replace placeholders {0}, {1}, etc.
-    if args:
-        for i, arg in enumerate(args):
-            text = text.replace(f"{{{i}}}", str(arg))
-
-    return text
+    return format_message(message, args)
 
 
 def t(key: str, lang: str, *args) -> str:
@@ -876,9 +1034,15 @@ class Translator:
 
     def __init__(self, lang: str):
         self.lang = lang if lang in SUPPORTED_LANGUAGES else DEFAULT_LANGUAGE
+        self._table = catalogs.table(self.lang)
 
     def __call__(self, key: str, *args) -> str:
-        return get_translation(key, self.lang, *args)
+        message = self._table.get(key)
+        if message is None:
+            return key
+        if isinstance(message, str):
+            return message
+        return format_message(message, args)
 
     @property
     def current_lang(self) -> str:
@@ -0,0 +1,175 @@
+"""
+gbHam Entry Writer
+Single-writer queue with group commit for new guestbook entries.
+
+At the start and end of a net many stations check in within a few seconds.
+Committing each entry separately costs one fsync per request and makes the
+requests queue up on the SQLite write lock. Instead, requests hand their
+entry to this queue and await the result; one writer task collects whatever
+is pending for a few milliseconds (or until the batch is full) and commits
+the whole batch in a single transaction.
+
+An entry can be queued with its IdempotencyKey row; the key is committed
+in the same transaction, so it exists exactly when the entry does.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.idempotency import idempotency_store
+from app.models import GuestbookEntry, IdempotencyKey
+from app.replica import replica_publisher
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Result of one queued insert: the new entry, or the error that prevented it
+InsertResult = Union[GuestbookEntry, Exception]
+
+# One queued insert: the entry and, optionally, the key of the submission
+PendingInsert = Tuple[GuestbookEntry, Optional[IdempotencyKey]]
+
+
+class EntryWriter:
+    """Batches entry inserts from concurrent requests into group commits."""
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: Optional[int] = None,
+        batch_delay: Optional[float] = None,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.WRITE_BATCH_SIZE
+        self.batch_delay = (
+            batch_delay if batch_delay is not None else settings.WRITE_BATCH_DELAY_MS / 1000
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Statistics
+        self.batches = 0
+        self.rows = 0
+
+    def _ensure_started(self):
+        """Start the writer task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(
+        self,
+        entry: GuestbookEntry,
+        idempotency_key: Optional[IdempotencyKey] = None,
+    ) -> GuestbookEntry:
+        """
+        Queue an entry for insertion and wait until it is committed.
+
+        Raises IntegrityError if `idempotency_key` was already committed
+        (a concurrent replay of the same submission).
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put(((entry, idempotency_key), future))
+        return await future
+
+    async def stop(self):
+        """Commit everything still queued and stop the writer task."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        """Writer loop: collect a batch, commit it, resolve the waiters."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Gather more entries until the batch is full or the delay is over
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), max(0, timeout))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            results = await run_in_threadpool(self._commit, [pending for pending, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit(self, pending: List[PendingInsert]) -> List[InsertResult]:
+        """Insert a batch in one transaction, falling back to row by row."""
+        entries = [entry for entry, _ in pending]
+        keys = [key for _, key in pending if key is not None]
+        # Keep attribute values after commit; entries are handed back detached
+        db = self._session_factory(expire_on_commit=False)
+        try:
+            try:
+                db.add_all(entries)
+                db.add_all(keys)
+                if keys:
+                    idempotency_store.purge(db)
+                db.commit()
+                self.batches += 1
+                self.rows += len(entries)
+                replica_publisher.note_writes(len(entries))
+                for key in keys:
+                    idempotency_store.remember(key.key, key.location)
+                db.expunge_all()
+                return list(entries)
+            except Exception:
+                db.rollback()
+                if len(entries) == 1:
+                    raise
+                logger.warning(f"Group commit of {len(entries)} entries failed, retrying singly")
+
+            results: List[InsertResult] = []
+            for entry, key in pending:
+                try:
+                    db.add(entry)
+                    if key is not None:
+                        db.add(key)
+                    db.commit()
+                    self.batches += 1
+                    self.rows += 1
+                    replica_publisher.note_writes()
+                    if key is not None:
+                        idempotency_store.remember(key.key, key.location)
+                    db.expunge_all()
+                    results.append(entry)
+                except Exception as e:
+                    db.rollback()
+                    results.append(e)
+            return results
+        except Exception as e:
+            return [e] * len(entries)
+        finally:
+            db.close()
+
+
+# Global writer instance
+entry_writer = EntryWriter()
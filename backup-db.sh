@@ -28,8 +28,17 @@ if [ ! -f "$DB_PATH" ]; then
     exit 1
 fi
 
+# Back up from the read replica if the app keeps a current one
+# (REPLICA_ENABLED), so the backup does not compete with live readers
+REPLICA_PATH="${REPLICA_PATH:-/app/data/gbham-replica.db}"
+SOURCE_PATH="$DB_PATH"
+if [ -n "$(find "$REPLICA_PATH" -mmin -2 2>/dev/null)" ]; then
+    SOURCE_PATH="$REPLICA_PATH"
+    log "Using read replica $REPLICA_PATH"
+fi
+
 # Perform backup using SQLite .backup command (safe for live database)
-if sqlite3 "$DB_PATH" ".backup '$BACKUP_PATH'"; then
+if sqlite3 "$SOURCE_PATH" ".backup '$BACKUP_PATH'"; then
     BACKUP_SIZE=$(du -h "$BACKUP_PATH" | cut -f1)
     log "Backup completed (size: $BACKUP_SIZE)"
 
@@ -43,6 +52,17 @@ else
     exit 1
 fi
 
+# Archive years rarely change; keep one current copy of each
+ARCHIVE_DIR="${ARCHIVE_DIR:-/app/data/archive}"
+if [ -d "$ARCHIVE_DIR" ]; then
+    mkdir -p "${BACKUP_DIR}/archive"
+    for ARCHIVE in "$ARCHIVE_DIR"/gbham_*.db; do
+        [ -f "$ARCHIVE" ] || continue
+        sqlite3 "$ARCHIVE" ".backup '${BACKUP_DIR}/archive/$(basename "$ARCHIVE")'"
+        log "Archive backed up: $(basename "$ARCHIVE")"
+    done
+fi
+
 # Clean up old backups
 DELETED=$(find "$BACKUP_DIR" -name "gbham_*.db.gz" -type f -mtime +$RETENTION_DAYS -delete -print | wc -l)
 log "Cleaned up $DELETED old backup(s)"
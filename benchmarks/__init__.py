@@ -0,0 +1 @@
+"""gbHam Benchmarks"""
@@ -0,0 +1,85 @@
+"""
+gbHam Benchmark: /api/entries serialization
+
+Compares the response path of /api/entries before and after the fast JSON
+path, for one page of `--limit` entries:
+
+    pydantic   ORM objects -> GuestbookEntryResponse -> jsonable_encoder -> json
+    fast       selected columns -> orjson (or json) bytes
+
+Both include the keyset query. Results are given in rows per second.
+
+Usage:
+    python -m benchmarks.bench_api_json [--rows 20000] [--limit 500] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_sqlite_engine
+from app.pagination import paginate
+from app.schemas import GuestbookEntryResponse
+from app.serialization import ENTRY_COLUMNS, entries_to_json, orjson
+from benchmarks.bench_search import _seed
+
+RESPONSE_LIST = TypeAdapter(List[GuestbookEntryResponse])
+
+
+def pydantic_path(session, limit: int) -> bytes:
+    items = paginate(session, limit).items
+    # What FastAPI does for response_model=List[GuestbookEntryResponse]
+    validated = RESPONSE_LIST.validate_python(items, from_attributes=True)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_path(session, limit: int) -> bytes:
+    return entries_to_json(paginate(session, limit, columns=ENTRY_COLUMNS).items)
+
+
+def _median(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "api.db")
+        _seed(path, args.rows)
+        engine = create_sqlite_engine(f"sqlite:///{path}", readonly=True)
+        Session = sessionmaker(bind=engine)
+
+        print(f"encoder: {'orjson' if orjson is not None else 'json (stdlib)'}, {args.limit} rows per page")
+        print(f"{'path':<10} {'ms/page':>9} {'rows/s':>10}")
+        for label, fn in (("pydantic", pydantic_path), ("fast", fast_path)):
+            session = Session()
+            fn(session, args.limit)  # warm up
+            seconds = _median(lambda: fn(session, args.limit), args.repeat)
+            session.close()
+            print(f"{label:<10} {seconds * 1000:>9.2f} {args.limit / seconds:>10.0f}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+gbHam Benchmark: LIKE scan versus FTS5 search
+
+Fills a scratch database with synthetic entries (1M by default) and compares
+the latency of a LIKE '%term%' scan with the FTS5 query behind /api/search.
+
+Usage:
+    python -m benchmarks.bench_search [--rows 1000000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.database import create_sqlite_engine
+from app.migrations import run_migrations
+from app.search import search_entries
+
+WORDS = [
+    "Grüße", "Runde", "Relais", "Villach", "Dobratsch", "Gerlitzen", "Signal",
+    "Rapport", "QTH", "Antenne", "Portabel", "Kärnten", "Wetter", "Mobil",
+    "schöne", "danke", "bis", "nächste", "Woche", "Empfang", "laut", "klar",
+]
+TERMS = ["dobratsch", "OE8X", "antenne portabel", "zzzkeintreffer"]
+
+
+def _seed(path: str, rows: int):
+    engine = create_sqlite_engine(f"sqlite:///{path}")
+    run_migrations(engine)
+    engine.dispose()
+
+    rng = random.Random(73)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    batch = []
+    for i in range(rows):
+        callsign = f"OE{rng.randint(1, 9)}{''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))}"
+        message = " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+        batch.append((callsign, message, "2024-01-01 19:00:00", f"2024-01-01 19:{i % 60:02d}:00"))
+        if len(batch) == 50000:
+            conn.executemany(
+                "INSERT INTO guestbook_entries (callsign, message, runde_datetime, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                batch,
+            )
+            conn.commit()
+            batch.clear()
+    if batch:
+        conn.executemany(
+            "INSERT INTO guestbook_entries (callsign, message, runde_datetime, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            batch,
+        )
+        conn.commit()
+    conn.close()
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        print(f"Seeding {args.rows} entries...")
+        start = time.perf_counter()
+        _seed(path, args.rows)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        raw = sqlite3.connect(path)
+        engine = create_sqlite_engine(f"sqlite:///{path}", readonly=True)
+        session = sessionmaker(bind=engine)()
+
+        print(f"{'term':<20} {'LIKE ms':>10} {'FTS ms':>10} {'speedup':>8}")
+        for term in TERMS:
+            pattern = f"%{term.split()[0]}%"
+
+            def like():
+                raw.execute(
+                    "SELECT id FROM guestbook_entries WHERE message LIKE ? OR callsign LIKE ? "
+                    "ORDER BY created_at DESC LIMIT ?",
+                    (pattern, pattern, args.limit),
+                ).fetchall()
+
+            def fts():
+                search_entries(session, term, limit=args.limit)
+
+            like_ms = _time(like, args.repeat)
+            fts_ms = _time(fts, args.repeat)
+            print(f"{term:<20} {like_ms:>10.2f} {fts_ms:>10.2f} {like_ms / fts_ms:>7.1f}x")
+
+        session.close()
+        engine.dispose()
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+gbHam Benchmark: SQLite reader/writer concurrency
+
+Simulates a busy net: several threads render the first page of entries while
+one thread keeps inserting check-ins. Compares the old setup (one engine,
+rollback journal) with the tuned WAL engines from app.database.
+
+Usage:
+    python -m benchmarks.bench_sqlite_concurrency [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert, select
+
+from app.database import Base, create_sqlite_engine
+from app.models import GuestbookEntry
+
+
+def _seed(engine, rows: int):
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(GuestbookEntry),
+            [
+                {
+                    "callsign": f"OE{i % 10}ABC",
+                    "message": f"Grüße aus der Runde #{i}",
+                    "runde_datetime": now,
+                    "created_at": now,
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def _run(write_engine, read_engine, readers: int, seconds: float) -> dict:
+    stop = threading.Event()
+    latencies = []
+    writes = [0]
+    lock = threading.Lock()
+
+    page_query = (
+        select(GuestbookEntry.__table__)
+        .order_by(GuestbookEntry.created_at.desc())
+        .limit(15)
+    )
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            with read_engine.connect() as conn:
+                conn.execute(page_query).fetchall()
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        now = datetime.now(timezone.utc)
+        while not stop.is_set():
+            with write_engine.begin() as conn:
+                conn.execute(
+                    insert(GuestbookEntry),
+                    {"callsign": "OE8XBB", "message": "73", "runde_datetime": now, "created_at": now},
+                )
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "reads_per_s": len(latencies) / seconds,
+        "writes_per_s": writes[0] / seconds,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Baseline: one engine, default rollback journal
+        url = f"sqlite:///{os.path.join(tmp, 'baseline.db')}"
+        baseline = create_engine(url, connect_args={"check_same_thread": False})
+        _seed(baseline, args.rows)
+        results = {"baseline": _run(baseline, baseline, args.readers, args.seconds)}
+        baseline.dispose()
+
+        # Tuned: WAL writer + read-only pool
+        url = f"sqlite:///{os.path.join(tmp, 'tuned.db')}"
+        writer = create_sqlite_engine(url)
+        reader = create_sqlite_engine(url, readonly=True, pool_size=args.readers)
+        _seed(writer, args.rows)
+        results["tuned"] = _run(writer, reader, args.readers, args.seconds)
+        writer.dispose()
+        reader.dispose()
+
+    print(f"{'setup':<10} {'reads/s':>10} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['reads_per_s']:>10.0f} {r['writes_per_s']:>10.0f} "
+            f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+gbHam Benchmark: template cold start and first render
+
+Measures, for a fresh template environment, how long loading every
+template takes and how long the first and subsequent renders of the index
+page take, in three situations:
+
+    separate   one environment per router (the old setup; base.html is
+               compiled once per environment)
+    no cache   one shared environment without bytecode cache
+    bytecode   one shared environment with a warm bytecode cache (a restart)
+
+Usage:
+    python -m benchmarks.bench_templates [--entries 20] [--repeat 200]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.config import get_settings
+from app.templating import create_environment, precompile
+from app.translations import SUPPORTED_LANGUAGES, Translator
+
+settings = get_settings()
+
+# Templates each router used to render with its own environment
+ROUTER_TEMPLATES = [
+    ["error.html"],  # main.py
+    ["index.html", "privacy.html", "imprint.html"],  # routes/pages.py
+    ["admin.html"],  # routes/admin.py
+]
+
+
+def _context(entries: int) -> dict:
+    start = datetime(2024, 1, 1, 19, 0)
+    items = [
+        SimpleNamespace(
+            id=i,
+            callsign=f"OE{i % 10}ABC",
+            message=f"Vielen Dank für die Runde, 73 ({i})",
+            runde_datetime=start,
+            created_at=start + timedelta(minutes=i),
+        )
+        for i in range(entries)
+    ]
+    return {
+        "entries": items,
+        "is_readonly": False,
+        "error_message": None,
+        "success_message": None,
+        "settings": settings,
+        "pagination": {
+            "page": 1, "per_page": entries, "total_entries": entries * 10, "total_pages": 10,
+            "has_prev": False, "has_next": True, "prev_cursor": None, "next_cursor": "abc",
+        },
+        "t": Translator("de"),
+        "lang": "de",
+        "languages": SUPPORTED_LANGUAGES,
+    }
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:>9.2f}"
+
+
+def _measure(make_envs, context: dict, repeat: int):
+    start = time.perf_counter()
+    envs = make_envs()
+    for env, names in envs:
+        for name in names:
+            env.get_template(name)
+    load = time.perf_counter() - start
+
+    index_env = envs[0][0] if len(envs) == 1 else envs[1][0]
+    start = time.perf_counter()
+    index_env.get_template("index.html").render(context)
+    first = time.perf_counter() - start
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        index_env.get_template("index.html").render(context)
+        samples.append(time.perf_counter() - start)
+    return load, first, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=settings.ENTRIES_PER_PAGE)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    context = _context(args.entries)
+    all_templates = [name for names in ROUTER_TEMPLATES for name in names]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Fill the bytecode cache, as the previous process run would have
+        precompile(create_environment(cache_dir=cache_dir))
+
+        scenarios = {
+            "separate": lambda: [(create_environment(cache_dir=""), names) for names in ROUTER_TEMPLATES],
+            "no cache": lambda: [(create_environment(cache_dir=""), all_templates)],
+            "bytecode": lambda: [(create_environment(cache_dir=cache_dir), all_templates)],
+        }
+
+        print(f"{'setup':<10} {'load ms':>9} {'1st ms':>9} {'next ms':>9}")
+        for label, make_envs in scenarios.items():
+            load, first, steady = _measure(make_envs, context, args.repeat)
+            print(f"{label:<10} {_ms(load)} {_ms(first)} {_ms(steady)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+gbHam Benchmark: translation lookups and render time per language
+
+Compares the previous lookup (nested dict with fallback and a str.replace
+loop per call) with the compiled catalogs, for every translation key, and
+measures the index page render time per language.
+
+Usage:
+    python -m benchmarks.bench_translations [--repeat 200]
+"""
+
+import argparse
+import statistics
+import time
+
+from app.templating import create_environment
+from app.translations import DEFAULT_LANGUAGE, SUPPORTED_LANGUAGES, TRANSLATIONS, Translator
+from benchmarks.bench_templates import _context
+
+
+def legacy_translation(key: str, lang: str, *args) -> str:
+    """The lookup as implemented before the catalogs were compiled."""
+    if lang not in SUPPORTED_LANGUAGES:
+        lang = DEFAULT_LANGUAGE
+    translation_dict = TRANSLATIONS.get(key)
+    if not translation_dict:
+        return key
+    text = translation_dict.get(lang) or translation_dict.get(DEFAULT_LANGUAGE) or key
+    if args:
+        for i, arg in enumerate(args):
+            text = text.replace(f"{{{i}}}", str(arg))
+    return text
+
+
+def _median_us(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    keys = list(TRANSLATIONS)
+    template = create_environment(cache_dir="").get_template("index.html")
+
+    print(f"{'lang':<6} {'legacy us':>10} {'compiled us':>12} {'render ms':>10}   ({len(keys)} keys)")
+    for lang in SUPPORTED_LANGUAGES:
+        translator = Translator(lang)
+
+        def legacy():
+            for key in keys:
+                legacy_translation(key, lang, 60)
+
+        def compiled():
+            for key in keys:
+                translator(key, 60)
+
+        context = {**_context(20), "t": translator, "lang": lang}
+        render_ms = _median_us(lambda: template.render(context), args.repeat) / 1000
+        print(
+            f"{lang:<6} {_median_us(legacy, args.repeat):>10.1f} "
+            f"{_median_us(compiled, args.repeat):>12.1f} {render_ms:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
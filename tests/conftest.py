@@ -0,0 +1,98 @@
+"""
+gbHam Test Configuration
+Points the app at a throwaway database before any app module is imported.
+
+Set TEST_DATABASE_URL to run the suite against another backend, e.g. the
+PostgreSQL service from docker-compose.test.yml. Tests marked `sqlite_only`
+are skipped there.
+"""
+
+import os
+import tempfile
+
+_TEST_DIR = tempfile.mkdtemp(prefix="gbham-tests-")
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    os.getenv("TEST_DATABASE_URL") or f"sqlite:///{_TEST_DIR}/gbham.db",
+)
+os.environ.setdefault("ADMIN_TOKEN", "test-admin-token")
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "100000")
+os.environ.setdefault("ENTRY_COOLDOWN", "0")
+os.environ.setdefault("ARCHIVE_DIR", f"{_TEST_DIR}/archive")
+os.environ.setdefault("TEMPLATE_CACHE_DIR", f"{_TEST_DIR}/template-cache")
+
+from datetime import datetime, timedelta  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import SessionLocal, engine, init_db, is_sqlite  # noqa: E402
+from app.main import app  # noqa: E402
+from app.idempotency import idempotency_store  # noqa: E402
+from app.models import GuestbookEntry, IdempotencyKey, ReadOnlyMode  # noqa: E402
+from app.page_cache import content_version  # noqa: E402
+from app.runtime_settings import runtime_settings  # noqa: E402
+
+ADMIN_TOKEN = os.environ["ADMIN_TOKEN"]
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "sqlite_only: test relies on SQLite-specific behaviour")
+
+
+def pytest_collection_modifyitems(config, items):
+    if is_sqlite(engine):
+        return
+    skip = pytest.mark.skip(reason=f"SQLite only (running on {engine.dialect.name})")
+    for item in items:
+        if "sqlite_only" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def db():
+    """Writer session on an empty guestbook."""
+    init_db()
+    session = SessionLocal()
+    session.query(GuestbookEntry).delete()
+    session.query(ReadOnlyMode).delete()
+    session.query(IdempotencyKey).delete()
+    session.commit()
+    idempotency_store.clear()
+    runtime_settings.load(session)
+    session.commit()  # release the single writer connection
+    content_version.bump()  # entries are changed behind the routes' back
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """Test client bound to the empty guestbook."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_entries(db):
+    """Insert `count` entries, one minute apart, newest last."""
+
+    def _make(count: int, start: datetime = datetime(2024, 1, 1, 19, 0)):
+        entries = [
+            GuestbookEntry(
+                callsign=f"OE{i % 10}ABC",
+                message=f"Eintrag {i}",
+                runde_datetime=start,
+                created_at=start + timedelta(minutes=i),
+            )
+            for i in range(count)
+        ]
+        db.add_all(entries)
+        db.commit()
+        content_version.bump()
+        return entries
+
+    return _make
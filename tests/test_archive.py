@@ -0,0 +1,237 @@
+"""
+gbHam Archive Tests
+Moving old entries into yearly files and reading them back.
+"""
+
+import os
+import shutil
+from datetime import datetime
+
+import pytest
+
+from app.archive import (
+    ARCHIVED_COUNT_KEY,
+    archive_boundary,
+    archive_entries,
+    archive_path,
+    archive_years,
+    archived_count,
+    update_archived_count,
+)
+from app.config import get_settings
+from app.database import ReadSessionLocal, engine
+from app.importer import import_csv
+from app.models import AppSettings, GuestbookEntry
+from app.pagination import cursor_for_offset, paginate
+from app.search import search_entries
+settings = get_settings()
+ADMIN_TOKEN = os.environ["ADMIN_TOKEN"]
+
+pytestmark = pytest.mark.sqlite_only
+
+
+@pytest.fixture
+def archived(db, make_entries):
+    """30 entries from 2022 and 2023 archived, 5 entries live."""
+    make_entries(15, start=datetime(2022, 6, 1, 19, 0))
+    make_entries(15, start=datetime(2023, 6, 1, 19, 0))
+    make_entries(5, start=datetime.utcnow().replace(microsecond=0))
+
+    with engine.connect() as connection:
+        reports = archive_entries(connection, older_than_days=30)
+    update_archived_count(db)
+    db.commit()
+    yield reports
+
+    shutil.rmtree(settings.ARCHIVE_DIR, ignore_errors=True)
+    db.query(AppSettings).filter(AppSettings.key == ARCHIVED_COUNT_KEY).delete()
+    db.commit()
+
+
+class TestArchiveEntries:
+    """Test moving entries into archive files."""
+
+    def test_moves_old_entries_per_year(self, db, archived):
+        assert [(r.year, r.moved) for r in archived] == [(2022, 15), (2023, 15)]
+        assert archive_years() == [2023, 2022]
+        assert db.query(GuestbookEntry).count() == 5
+        assert archived_count() == 30
+
+    def test_second_run_moves_nothing(self, db, archived):
+        with engine.connect() as connection:
+            assert archive_entries(connection, older_than_days=30) == []
+
+    def test_newest_entry_is_never_archived(self, db, make_entries):
+        make_entries(3, start=datetime(2021, 1, 1))
+        try:
+            with engine.connect() as connection:
+                reports = archive_entries(connection, older_than_days=30)
+            assert reports[0].moved == 2
+            assert db.query(GuestbookEntry).count() == 1
+        finally:
+            shutil.rmtree(settings.ARCHIVE_DIR, ignore_errors=True)
+
+    def test_nothing_newer_than_the_retained_entry(self, db, make_entries):
+        make_entries(3, start=datetime(2022, 6, 1, 19, 0))
+        make_entries(3, start=datetime(2023, 6, 1, 19, 0))
+        # Imported last, so it has the highest id despite its age
+        db.add(GuestbookEntry(
+            callsign="OE8XBB", message="Importiert", runde_datetime=datetime(2021, 3, 1, 19, 0),
+            created_at=datetime(2021, 3, 1, 19, 5),
+        ))
+        db.commit()
+        try:
+            with engine.connect() as connection:
+                assert archive_entries(connection, older_than_days=30) == []
+            assert db.query(GuestbookEntry).count() == 7
+
+            db.query(GuestbookEntry).filter(GuestbookEntry.message == "Importiert").delete()
+            db.commit()
+            make_entries(1, start=datetime(2023, 6, 1, 20, 0))
+            with engine.connect() as connection:
+                reports = archive_entries(connection, older_than_days=30)
+            assert [(r.year, r.moved) for r in reports] == [(2022, 3), (2023, 3)]
+
+            reader = ReadSessionLocal()
+            try:
+                live = reader.query(GuestbookEntry.created_at).all()
+                boundary = archive_boundary(reader.connection())
+            finally:
+                reader.close()
+            assert [row.created_at for row in live] == [datetime(2023, 6, 1, 20, 0)]
+            assert boundary < live[0].created_at
+        finally:
+            shutil.rmtree(settings.ARCHIVE_DIR, ignore_errors=True)
+
+    def test_archive_file_per_year(self, archived):
+        assert os.path.exists(archive_path(2022))
+        assert os.path.exists(archive_path(2023))
+
+
+class TestArchiveReads:
+    """Test that archived years remain readable."""
+
+    def test_pagination_continues_into_archive(self, archived):
+        db = ReadSessionLocal()
+        try:
+            seen = []
+            before = None
+            while True:
+                page = paginate(db, 10, before=before)
+                seen.extend(entry.message for entry in page.items)
+                if not page.has_next:
+                    break
+                before = page.next_cursor
+            assert len(seen) == 35
+            assert len(set(seen)) == 15  # messages repeat per batch
+        finally:
+            db.close()
+
+    def test_previous_page_from_archive(self, archived):
+        db = ReadSessionLocal()
+        try:
+            first = paginate(db, 10)
+            second = paginate(db, 10, before=first.next_cursor)
+            back = paginate(db, 10, after=second.prev_cursor)
+            assert [e.id for e in back.items] == [e.id for e in first.items]
+        finally:
+            db.close()
+
+    def test_legacy_offset_into_archive(self, archived):
+        db = ReadSessionLocal()
+        try:
+            cursor = cursor_for_offset(db, 20, 10)
+            assert cursor is not None
+            assert cursor.created_at.year == 2023
+        finally:
+            db.close()
+
+    def test_search_finds_archived_entries(self, archived):
+        db = ReadSessionLocal()
+        try:
+            result = search_entries(db, "Eintrag", limit=100)
+            assert len(result.items) == 35
+        finally:
+            db.close()
+
+    def test_index_counts_archived_entries(self, client, archived):
+        response = client.get("/")
+        assert response.status_code == 200
+        assert "35" in response.text
+
+    def test_csv_export_includes_archive(self, client, archived):
+        response = client.get(f"/admin/export/csv?token={ADMIN_TOKEN}")
+        assert response.status_code == 200
+        rows = response.text.strip().splitlines()
+        assert len(rows) == 1 + 35
+        assert "2022-06-01T19:00:00" in rows[-1]
+
+    def test_admin_deletes_archived_entry(self, client, db, archived):
+        db_read = ReadSessionLocal()
+        try:
+            oldest = paginate(db_read, 100).items[-1]
+        finally:
+            db_read.close()
+
+        response = client.post(
+            f"/admin/delete/{oldest.id}?token={ADMIN_TOKEN}", follow_redirects=False
+        )
+        assert response.status_code == 303
+        assert archived_count() == 29
+
+    def test_ndjson_stream_includes_archive(self, client, archived):
+        response = client.get("/api/entries/stream")
+        lines = response.text.splitlines()
+        assert len(lines) == 35
+        assert '"2022-06-01T19:00:00' in lines[0]
+
+    def test_ndjson_stream_skips_years_outside_range(self, client, archived):
+        response = client.get("/api/entries/stream", params={"since": "2023-01-01T00:00:00"})
+        assert len(response.text.splitlines()) == 20
+
+
+class TestImportAfterArchiving:
+    """Test that imports keep live entries newer than the archive."""
+
+    def test_boundary_is_newest_archived_entry(self, archived):
+        with engine.connect() as connection:
+            assert archive_boundary(connection) == datetime(2023, 6, 1, 19, 14)
+
+    def test_rows_older_than_archive_are_rejected(self, client, db, archived):
+        data = (
+            '"ID","Rufzeichen","Nachricht","Runde","Datum"\n'
+            '"","OE8XBB","Altes Log","2022-03-01T19:00:00","2022-03-01T19:05:00"\n'
+            '"","OE8XBB","Grenzfall","2023-06-01T19:00:00","2023-06-01T19:14:00"\n'
+            '"","OE8XBB","Neueres Log","2024-01-05T19:00:00","2024-01-05T19:05:00"\n'
+        )
+        response = client.post(
+            f"/admin/import/csv?token={ADMIN_TOKEN}",
+            files={"file": ("log.csv", data.encode("utf-8"), "text/csv")},
+        )
+        report = response.json()
+        assert report["imported"] == 1
+        assert [r["line"] for r in report["rejected"]] == [2, 3]
+        assert report["rejected"][0]["reason"].startswith("Älter als das Archiv")
+
+        # Every entry, archived ones included, is still reachable in order
+        reader = ReadSessionLocal()
+        try:
+            seen, before = [], None
+            while True:
+                page = paginate(reader, 10, before=before)
+                seen.extend(page.items)
+                if not page.has_next:
+                    break
+                before = page.next_cursor
+        finally:
+            reader.close()
+        assert len(seen) == 36
+        created = [entry.created_at for entry in seen]
+        assert created == sorted(created, reverse=True)
+
+    def test_import_without_archive_keeps_old_dates(self, db):
+        lines = [
+            '"ID","Rufzeichen","Nachricht","Runde","Datum"\n',
+            '"","OE8XBB","Altes Log","2019-03-01T19:00:00","2019-03-01T19:05:00"\n',
+        ]
+        assert import_csv(lines).imported == 1
@@ -0,0 +1,69 @@
+"""
+gbHam Static Asset Tests
+Minification, hashed names and serving from memory.
+"""
+
+import json
+import re
+
+from app.assets import AssetPipeline, assets, minify_css, minify_svg
+from app.cli import main as cli_main
+
+
+class TestMinify:
+    """Test the minifiers."""
+
+    def test_css(self):
+        css = "/* Kopf */\nbody {\n    color: #333;\n    margin: 0;\n}\na :hover, b > i { x: 1 }\n"
+        assert minify_css(css) == "body{color:#333;margin:0}a :hover,b>i{x:1}"
+
+    def test_svg_keeps_text(self):
+        svg = '<svg>\n  <!-- Logo -->\n  <text x="1" >gb Ham</text>\n  <path d="M1 2" />\n</svg>'
+        assert minify_svg(svg) == '<svg><text x="1">gb Ham</text><path d="M1 2"/></svg>'
+
+
+class TestPipeline:
+    """Test hashing and the build command."""
+
+    def test_hash_follows_content(self, tmp_path):
+        (tmp_path / "style.css").write_text("body { color: red; }")
+        pipeline = AssetPipeline(str(tmp_path))
+        first = pipeline.url("style.css")
+        (tmp_path / "style.css").write_text("body { color: blue; }")
+        pipeline.build()
+        assert re.fullmatch(r"/static/style\.[0-9a-f]{12}\.css", first)
+        assert pipeline.url("style.css") != first
+        assert pipeline.url("unknown.png") == "/static/unknown.png"
+
+    def test_build_assets_command(self, tmp_path):
+        assert cli_main(["build-assets", "--output", str(tmp_path)]) == 0
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        hashed = manifest["style.css"]
+        assert (tmp_path / hashed).exists()
+        assert (tmp_path / f"{hashed}.gz").exists()
+
+
+class TestServing:
+    """Test the static file handler."""
+
+    def test_templates_link_hashed_names(self, client):
+        html = client.get("/").text
+        assert assets.url("style.css") in html
+        assert 'href="/static/style.css"' not in html
+
+    def test_hashed_asset_is_immutable(self, client):
+        response = client.get(assets.url("style.css"), headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert "immutable" in response.headers["Cache-Control"]
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Content-Type"].startswith("text/css")
+        again = client.get(
+            assets.url("style.css"),
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+        )
+        assert again.status_code == 304
+
+    def test_original_name_still_served(self, client):
+        response = client.get("/static/favicon.svg")
+        assert response.status_code == 200
+        assert "immutable" not in response.headers.get("Cache-Control", "")
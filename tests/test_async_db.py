@@ -0,0 +1,55 @@
+"""
+gbHam Async Database Tests
+Database work must not block the event loop.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.routes import pages
+
+
+@pytest.mark.asyncio
+async def test_requests_progress_while_slow_query_runs(db, make_entries, monkeypatch):
+    """A slow query on / must not stall concurrent API requests."""
+    make_entries(20)
+    real_state = pages.content_state
+
+    def slow_state(session):
+        time.sleep(1.0)
+        return real_state(session)
+
+    monkeypatch.setattr(pages, "content_state", slow_state)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        finished = {}
+
+        async def fetch(name, url):
+            response = await client.get(url)
+            finished[name] = time.perf_counter()
+            return response
+
+        started = time.perf_counter()
+        slow = asyncio.create_task(fetch("slow", "/"))
+        await asyncio.sleep(0.05)
+        fast = await asyncio.gather(*(fetch(f"api{i}", "/api/entries") for i in range(5)))
+        await slow
+
+    assert all(response.status_code == 200 for response in fast)
+    assert slow.result().status_code == 200
+    for i in range(5):
+        assert finished[f"api{i}"] - started < 0.5
+    assert finished["slow"] - started >= 1.0
+
+
+def test_csv_export_streams_all_entries(client, make_entries):
+    make_entries(1200)
+    response = client.get("/admin/export/csv?token=test-admin-token")
+    lines = response.text.strip().splitlines()
+    assert lines[0] == '"ID","Rufzeichen","Nachricht","Runde","Datum"'
+    assert len(lines) == 1201
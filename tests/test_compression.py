@@ -0,0 +1,147 @@
+"""
+gbHam Compression Tests
+Content negotiation, dynamic compression and precompressed responses.
+"""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.compression import (
+    CompressionMiddleware,
+    Precompressed,
+    encoded_etag,
+    negotiate_encoding,
+    strip_encoding,
+    vary_on_encoding,
+)
+
+BIG = "73 de OE8XBB " * 200
+
+
+def _app():
+    def big(request):
+        return PlainTextResponse(BIG, headers={"ETag": '"abc"'})
+
+    def small(request):
+        return PlainTextResponse("ok")
+
+    def encoded(request):
+        return Response(gzip.compress(BIG.encode()), headers={"Content-Encoding": "gzip"},
+                        media_type="text/plain")
+
+    def events(request):
+        return StreamingResponse(iter(["data: 1\n\n"] * 100), media_type="text/event-stream")
+
+    def streamed(request):
+        return StreamingResponse(iter([BIG] * 3), media_type="text/plain")
+
+    app = Starlette(routes=[
+        Route("/big", big), Route("/small", small), Route("/encoded", encoded),
+        Route("/events", events), Route("/streamed", streamed),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+class TestNegotiation:
+    """Test Accept-Encoding parsing."""
+
+    def test_preference_order(self):
+        assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+        assert negotiate_encoding("gzip;q=1, br;q=0.5", ("br", "gzip")) == "gzip"
+
+    def test_refused_and_missing(self):
+        assert negotiate_encoding("gzip;q=0", ("gzip",)) is None
+        assert negotiate_encoding("", ("gzip",)) is None
+        assert negotiate_encoding("*", ("gzip",)) == "gzip"
+
+    def test_etag_suffix_roundtrip(self):
+        assert strip_encoding(encoded_etag('"abc"', "gzip")) == '"abc"'
+        assert encoded_etag('W/"abc"', "gzip") == 'W/"abc"'
+
+
+class TestMiddleware:
+    """Test the compression middleware."""
+
+    def test_compresses_large_responses(self):
+        response = _app().get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["ETag"] == '"abc-gzip"'
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert response.text == BIG
+
+    def test_skips_small_responses(self):
+        response = _app().get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["Vary"]
+
+    def test_vary_not_repeated(self):
+        headers = MutableHeaders(headers={"Vary": "accept-encoding, Cookie"})
+        vary_on_encoding(headers)
+        assert headers["Vary"] == "accept-encoding, Cookie"
+        headers = MutableHeaders(headers={"Vary": "Cookie"})
+        vary_on_encoding(headers)
+        assert headers["Vary"] == "Cookie, Accept-Encoding"
+
+    def test_keeps_existing_encoding(self):
+        response = _app().get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.text == BIG
+
+    def test_skips_event_streams(self):
+        response = _app().get("/events", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+    def test_streamed_response(self):
+        response = _app().get("/streamed", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert response.text == BIG * 3
+
+    def test_identity(self):
+        response = _app().get("/big", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in response.headers
+
+
+class TestPrecompressed:
+    """Test precompressed bodies and their use by the app."""
+
+    def test_variants(self):
+        content = Precompressed.of(BIG.encode())
+        encoding, body = content.select("gzip")
+        assert encoding == "gzip"
+        assert gzip.decompress(body) == BIG.encode()
+        assert content.select("identity") == (None, BIG.encode())
+
+    def test_brotli_variant(self):
+        brotli = pytest.importorskip("brotli")
+        content = Precompressed.of(BIG.encode())
+        encoding, body = content.select("gzip, br")
+        assert encoding == "br"
+        assert brotli.decompress(body) == BIG.encode()
+
+    def test_cached_index_page_is_precompressed(self, client, make_entries):
+        make_entries(3)
+        client.get("/", headers={"Accept-Encoding": "gzip"})
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["X-Page-Cache"] == "hit"
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Cookie" in response.headers["Vary"]
+        assert response.headers["Vary"].lower().count("accept-encoding") == 1
+        again = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+        assert again.status_code == 304
+
+    def test_static_file(self, client):
+        response = client.get("/static/style.css", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert ".entries-table" in response.text
+        again = client.get(
+            "/static/style.css",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]},
+        )
+        assert again.status_code == 304
@@ -0,0 +1,76 @@
+"""
+gbHam Conditional Request Tests
+ETag / Last-Modified handling on the index page and /api/entries.
+"""
+
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+
+from app.routes import pages
+
+
+@pytest.mark.parametrize("url", ["/", "/api/entries"])
+class TestConditionalGet:
+    """Test validators and 304 responses."""
+
+    def test_validators_present(self, client, make_entries, url):
+        make_entries(2)
+        response = client.get(url)
+        assert response.headers["ETag"].startswith('"')
+        assert response.headers["Cache-Control"] == "no-cache"
+        assert parsedate_to_datetime(response.headers["Last-Modified"])
+
+    def test_if_none_match(self, client, make_entries, url):
+        make_entries(2)
+        etag = client.get(url).headers["ETag"]
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    def test_if_none_match_list_and_weak(self, client, make_entries, url):
+        make_entries(1)
+        etag = client.get(url).headers["ETag"]
+        response = client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+        assert response.status_code == 304
+
+    def test_new_entry_changes_etag(self, client, make_entries, url):
+        make_entries(1)
+        etag = client.get(url).headers["ETag"]
+        make_entries(1, start=datetime(2024, 2, 1))
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_if_modified_since(self, client, make_entries, url):
+        make_entries(1)
+        modified = client.get(url).headers["Last-Modified"]
+        assert client.get(url, headers={"If-Modified-Since": modified}).status_code == 304
+
+        earlier = parsedate_to_datetime(modified) - timedelta(seconds=10)
+        header = format_datetime(earlier, usegmt=True)
+        assert client.get(url, headers={"If-Modified-Since": header}).status_code == 200
+
+    def test_etag_wins_over_if_modified_since(self, client, make_entries, url):
+        make_entries(1)
+        modified = client.get(url).headers["Last-Modified"]
+        response = client.get(url, headers={"If-None-Match": '"stale"', "If-Modified-Since": modified})
+        assert response.status_code == 200
+
+
+def test_etag_varies_by_language(client, make_entries):
+    make_entries(1)
+    german = client.get("/", cookies={"gbham_lang": "de"}).headers["ETag"]
+    english = client.get("/", cookies={"gbham_lang": "en"}).headers["ETag"]
+    assert german != english
+
+
+def test_not_modified_skips_rendering(client, make_entries, monkeypatch):
+    make_entries(1)
+    etag = client.get("/").headers["ETag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("entries loaded for a 304")
+
+    monkeypatch.setattr(pages, "paginate", fail)
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,46 @@
+"""
+gbHam Entry Counter Tests
+Trigger-maintained entry count and the repair command.
+"""
+
+from app.cli import main as cli_main
+from app.counters import get_entry_count
+from app.models import EntryCount, GuestbookEntry
+
+
+class TestEntryCounter:
+    """Test that the counter follows inserts and deletes."""
+
+    def test_counts_inserts(self, db, make_entries):
+        make_entries(7)
+        assert get_entry_count(db) == 7
+
+    def test_counts_deletes(self, db, make_entries):
+        entries = make_entries(3)
+        db.delete(entries[0])
+        db.commit()
+        assert get_entry_count(db) == 2
+
+    def test_counts_bulk_deletes(self, db, make_entries):
+        make_entries(5)
+        db.query(GuestbookEntry).filter(GuestbookEntry.message != "Eintrag 0").delete()
+        db.commit()
+        assert get_entry_count(db) == 1
+
+    def test_index_shows_count(self, client, make_entries):
+        make_entries(4)
+        assert '<span class="entries-count">(4)</span>' in client.get("/").text
+
+
+class TestRecount:
+    """Test the repair command."""
+
+    def test_recount_repairs_drift(self, db, make_entries):
+        make_entries(6)
+        db.get(EntryCount, 1).total = 99
+        db.commit()
+
+        assert cli_main(["recount-entries"]) == 0
+
+        db.expire_all()
+        assert get_entry_count(db) == 6
@@ -0,0 +1,85 @@
+"""
+gbHam Database Tests
+Connection pragmas and reader/writer separation.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.config import get_settings
+from app.database import (
+    create_server_engine,
+    engine,
+    init_db,
+    is_sqlite,
+    is_sqlite_url,
+    read_engine,
+)
+
+settings = get_settings()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    init_db()
+
+
+@pytest.mark.sqlite_only
+class TestConnectionPragmas:
+    """Test that tuned pragmas are applied per connection."""
+
+    def test_writer_uses_wal(self):
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    def test_synchronous_normal(self):
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+
+    def test_busy_timeout(self):
+        with read_engine.connect() as conn:
+            timeout = conn.execute(text("PRAGMA busy_timeout")).scalar()
+            assert timeout == settings.SQLITE_BUSY_TIMEOUT
+
+    def test_temp_store_memory(self):
+        with read_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2
+
+
+@pytest.mark.sqlite_only
+class TestReaderWriterSeparation:
+    """Test that the reader pool cannot write."""
+
+    def test_reader_is_query_only(self):
+        with read_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+
+    def test_reader_rejects_writes(self):
+        with read_engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("DELETE FROM guestbook_entries"))
+
+    def test_single_writer_connection(self):
+        assert engine.pool.size() == 1
+
+
+class TestEngineFactory:
+    """Test dialect detection and server pool settings."""
+
+    def test_detects_sqlite(self):
+        assert is_sqlite_url("sqlite:///./data/gbham.db")
+        assert not is_sqlite_url("postgresql+psycopg://gbham@localhost/gbham")
+
+    def test_reader_and_writer_share_dialect(self):
+        assert is_sqlite(engine) == is_sqlite(read_engine)
+
+    def test_server_pool_from_settings(self, tmp_path):
+        server = create_server_engine(f"sqlite:///{tmp_path}/pool.db")
+        try:
+            assert server.pool.size() == settings.DB_POOL_SIZE
+            assert server.pool._max_overflow == settings.DB_MAX_OVERFLOW
+            assert server.pool._recycle == settings.DB_POOL_RECYCLE
+            assert server.pool._pre_ping
+        finally:
+            server.dispose()
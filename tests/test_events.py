@@ -0,0 +1,154 @@
+"""
+gbHam Live Event Tests
+Broadcast hub, Last-Event-ID resume, backpressure and the SSE route.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.events import EventHub, TooManySubscribers, event_hub, event_stream
+from app.models import GuestbookEntry
+
+ADMIN_TOKEN = os.environ["ADMIN_TOKEN"]
+
+
+async def _read(stream, count: int):
+    """Next `count` chunks of an event stream."""
+    return [await stream.__anext__() for _ in range(count)]
+
+
+def _data(chunk: bytes) -> dict:
+    return json.loads(chunk.split(b"data: ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_every_subscriber():
+    hub = EventHub(buffer_size=10, queue_size=10, max_subscribers=10)
+    first, second = hub.subscribe(), hub.subscribe()
+    event = hub.publish_deleted(7)
+
+    assert first.queue.get_nowait() is event
+    assert second.queue.get_nowait() is event
+    assert event.encode() == f"id: {hub.boot}.1\nevent: deleted\ndata: {{\"id\":7}}\n\n".encode()
+
+
+@pytest.mark.asyncio
+async def test_resume_from_last_event_id():
+    hub = EventHub(buffer_size=10, queue_size=10, max_subscribers=10)
+    events = [hub.publish_deleted(i) for i in range(5)]
+
+    subscription = hub.subscribe(events[1].id)
+    assert subscription.backlog == events[2:]
+    assert not subscription.reset
+
+    assert hub.subscribe(events[-1].id).backlog == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("last_event_id", ["1.3", "garbage", "{boot}.99", "{boot}.1"])
+async def test_unresumable_id_resets(last_event_id):
+    hub = EventHub(buffer_size=3, queue_size=10, max_subscribers=10)
+    for i in range(6):
+        hub.publish_deleted(i)
+
+    subscription = hub.subscribe(last_event_id.format(boot=hub.boot))
+    assert subscription.reset
+    assert subscription.backlog == []
+
+    stream = event_stream(hub, subscription, heartbeat=1)
+    _, reset = await _read(stream, 2)
+    assert reset == f"id: {hub.boot}.6\nevent: reset\ndata: {{}}\n\n".encode()
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped():
+    hub = EventHub(buffer_size=10, queue_size=2, max_subscribers=10)
+    slow = hub.subscribe()
+    for i in range(3):
+        hub.publish_deleted(i)
+
+    assert slow.dropped
+    assert hub.subscriber_count == 0
+    assert hub.dropped == 1
+    # The stream ends right away; the client reconnects and resumes from the buffer
+    chunks = [chunk async for chunk in event_stream(hub, slow, heartbeat=1)]
+    assert chunks == [b"retry: 3000\n\n"]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_cap():
+    hub = EventHub(buffer_size=10, queue_size=10, max_subscribers=2)
+    first = hub.subscribe()
+    hub.subscribe()
+    with pytest.raises(TooManySubscribers):
+        hub.subscribe()
+
+    hub.unsubscribe(first)
+    hub.subscribe()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_backlog_live_events_and_keepalive():
+    hub = EventHub(buffer_size=10, queue_size=10, max_subscribers=10)
+    missed = hub.publish_deleted(1)
+    subscription = hub.subscribe(f"{hub.boot}.0")
+    stream = event_stream(hub, subscription, heartbeat=0.01)
+
+    retry, backlog = await _read(stream, 2)
+    assert retry == b"retry: 3000\n\n"
+    assert backlog == missed.encode()
+
+    assert await stream.__anext__() == b": keepalive\n\n"
+    live = hub.publish_deleted(2)
+    assert await stream.__anext__() == live.encode()
+
+    await stream.aclose()
+    assert hub.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_close_ends_streams():
+    hub = EventHub(buffer_size=10, queue_size=10, max_subscribers=10)
+    subscription = hub.subscribe()
+    stream = event_stream(hub, subscription, heartbeat=1)
+    await stream.__anext__()
+
+    hub.close()
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(stream.__anext__(), 1)
+
+
+class TestEventRoutes:
+    """Test publishing from the routes and the subscriber limit."""
+
+    def test_create_and_delete_publish(self, client, db):
+        before = event_hub.published
+        response = client.post(
+            "/api/entries",
+            data={"callsign": "OE8XBB", "message": "73 aus Villach", "runde_datetime": "2024-03-01T19:00"},
+            follow_redirects=False,
+        )
+        assert response.status_code == 303
+        created = event_hub._buffer[-1]
+        assert created.name == "created"
+        entry = _data(created.encode())
+        assert entry["callsign"] == "OE8XBB"
+        assert entry["runde_datetime"] == "2024-03-01T19:00:00"
+        assert not entry["created_at"].endswith("Z")
+        assert db.query(GuestbookEntry).filter_by(id=entry["id"]).count() == 1
+        db.rollback()
+
+        client.post(f"/admin/delete/{entry['id']}?token={ADMIN_TOKEN}", follow_redirects=False)
+        deleted = event_hub._buffer[-1]
+        assert (deleted.name, _data(deleted.encode())) == ("deleted", {"id": entry["id"]})
+        assert event_hub.published == before + 2
+
+    def test_subscriber_limit_returns_503(self, client, monkeypatch):
+        monkeypatch.setattr(event_hub, "max_subscribers", 0)
+        response = client.get("/api/entries/events")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "30"
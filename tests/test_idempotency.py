@@ -0,0 +1,120 @@
+"""
+gbHam Idempotency Tests
+Repeated entry form submissions create one entry.
+"""
+
+import asyncio
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.database import ReadSessionLocal
+from app.idempotency import IdempotencyStore, idempotency_key, idempotency_store
+from app.models import GuestbookEntry, IdempotencyKey
+from app.security import rate_limiter
+from app.writer import EntryWriter
+
+FORM = {"callsign": "OE8XBB", "message": "73 aus Villach", "runde_datetime": "2024-03-01T19:00"}
+
+
+def _post(client, **fields):
+    return client.post("/api/entries", data={**FORM, **fields}, follow_redirects=False)
+
+
+def _count(db) -> int:
+    count = db.query(GuestbookEntry).count()
+    db.rollback()
+    return count
+
+
+class TestFormSubmission:
+    """Test replays through the entry route."""
+
+    def test_form_carries_token(self, client, db):
+        html = client.get("/").text
+        assert re.search(r'name="form_token" value="[\w-]{16,}"', html)
+
+    def test_double_submit_creates_one_entry(self, client, db, monkeypatch):
+        replays = idempotency_store.replays
+        assert _post(client, form_token="abc").headers["location"] == "/?success=1"
+        # The cooldown would reject a second entry; the replay is answered first
+        monkeypatch.setattr(rate_limiter, "is_entry_cooldown_active", lambda ip: True)
+        response = _post(client, form_token="abc")
+
+        assert response.status_code == 303
+        assert response.headers["location"] == "/?success=1"
+        assert _count(db) == 1
+        assert idempotency_store.replays == replays + 1
+
+    def test_other_fields_or_token_are_new_entries(self, client, db):
+        _post(client, form_token="abc")
+        _post(client, form_token="abc", message="Zweiter Durchgang")
+        _post(client, form_token="def")
+        assert _count(db) == 3
+
+    def test_without_token_every_submission_counts(self, client, db):
+        _post(client)
+        _post(client)
+        assert _count(db) == 2
+
+    def test_replay_after_restart(self, client, db):
+        _post(client, form_token="abc")
+        idempotency_store.clear()  # as after a restart
+        assert _post(client, form_token="abc").headers["location"] == "/?success=1"
+        assert _count(db) == 1
+
+
+class TestStore:
+    """Test expiry and the database side of the store."""
+
+    def _key(self, db, key: str, age: timedelta):
+        db.add(IdempotencyKey(key=key, location="/?success=1", created_at=datetime.utcnow() - age))
+        db.commit()
+
+    def test_key_depends_on_token_and_fields(self):
+        assert idempotency_key("", "a") is None
+        assert idempotency_key("t", "a", "b") != idempotency_key("t", "ab", "")
+        assert idempotency_key("t", "a") == idempotency_key("t", "a")
+
+    def test_expired_keys_are_ignored_and_purged(self, db):
+        store = IdempotencyStore(ttl=60)
+        self._key(db, "old", timedelta(minutes=5))
+        self._key(db, "new", timedelta(seconds=5))
+
+        reader = ReadSessionLocal()
+        try:
+            assert store.lookup(reader, "old") is None
+            assert store.lookup(reader, "new") == "/?success=1"
+        finally:
+            reader.close()
+
+        assert store.purge(db) == 1
+        assert store.purge(db) == 0  # not again within PURGE_INTERVAL
+        db.commit()
+        assert [k.key for k in db.query(IdempotencyKey)] == ["new"]
+
+    def test_memory_is_bounded(self):
+        store = IdempotencyStore(ttl=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            store.remember(key, "/")
+        assert store.cached("a") is None
+        assert store.cached("c") == "/"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_replay_is_rejected_by_the_writer(db):
+    writer = EntryWriter(batch_size=10, batch_delay=0.01)
+
+    def submission():
+        entry = GuestbookEntry(callsign="OE8XBB", message="73", runde_datetime=datetime(2024, 3, 1, 19, 0))
+        return writer.submit(entry, IdempotencyKey(key="same", location="/?success=1"))
+
+    results = await asyncio.gather(submission(), submission(), return_exceptions=True)
+    await writer.stop()
+
+    assert isinstance(results[0], GuestbookEntry)
+    assert isinstance(results[1], IntegrityError)
+    assert _count(db) == 1
+    assert idempotency_store.cached("same") == "/?success=1"
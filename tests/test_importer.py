@@ -0,0 +1,198 @@
+"""
+gbHam CSV Import Tests
+Round trip with the export, row validation and batching; check-in batches.
+"""
+
+import io
+import os
+from datetime import datetime
+
+import pytest
+
+from app.cli import main
+from app.events import event_hub
+from app.importer import checkin_entries, import_csv, prepare_entry
+from app.models import GuestbookEntry
+from app.security import rate_limiter
+
+ADMIN_TOKEN = os.environ["ADMIN_TOKEN"]
+
+HEADER = '"ID","Rufzeichen","Nachricht","Runde","Datum"\n'
+
+
+def _csv(*rows):
+    return io.StringIO(HEADER + "".join(rows), newline="")
+
+
+class TestPrepareEntry:
+    """Test the shared validation chain."""
+
+    def test_sanitizes(self):
+        entry = prepare_entry("  OE8XBB ", "<b>73</b>", datetime(2024, 1, 1))
+        assert entry.callsign == "OE8XBB"
+        assert entry.message == "&lt;b&gt;73&lt;/b&gt;"
+
+    @pytest.mark.parametrize("message", ["Besuche www.example.com", "viagra billig"])
+    def test_filters(self, message):
+        with pytest.raises(ValueError):
+            prepare_entry("OE8XBB", message, datetime(2024, 1, 1))
+
+
+class TestImport:
+    """Test importing CSV files."""
+
+    def test_export_round_trip(self, client, db, make_entries):
+        make_entries(5)
+        db.add(GuestbookEntry(
+            callsign="OE8XBB",
+            message="Tom &amp; Jerry &lt;3",
+            runde_datetime=datetime(2024, 1, 1),
+        ))
+        db.commit()
+        exported = client.get(f"/admin/export/csv?token={ADMIN_TOKEN}").text
+
+        db.query(GuestbookEntry).delete()
+        db.commit()
+
+        report = import_csv(io.StringIO(exported, newline=""))
+        assert report.imported == 6
+        assert report.rejected_count == 0
+        messages = {e.message for e in db.query(GuestbookEntry)}
+        assert "Tom &amp; Jerry &lt;3" in messages  # escaped once, not twice
+        assert db.query(GuestbookEntry).filter_by(message="Eintrag 0").one().created_at.minute == 0
+
+    def test_reimport_skips_duplicates(self, db):
+        rows = '"","OE8XBB","Hallo","2024-01-01T19:00:00",""\n'
+        assert import_csv(_csv(rows)).imported == 1
+        report = import_csv(_csv(rows, rows))
+        assert report.imported == 0
+        assert [r.reason for r in report.rejected] == ["Doppelter Eintrag"] * 2
+
+    def test_rejects_invalid_rows_with_line_numbers(self, db):
+        report = import_csv(_csv(
+            '"","OE8XBB","Gut","2024-01-01T19:00:00",""\n',
+            '"","X","Zu kurzes Rufzeichen","2024-01-01T19:00:00",""\n',
+            '"","OE8XBB","Link www.example.com","2024-01-01T19:00:00",""\n',
+            '"","OE8XBB","Kein Datum","gestern",""\n',
+            '"","OE8XBB"\n',
+        ))
+        assert report.imported == 1
+        assert [r.line for r in report.rejected] == [3, 4, 5, 6]
+
+    def test_batches(self, db):
+        rows = [f'"","OE8XBB","Nachricht {i}","2024-01-01T19:00:00",""\n' for i in range(25)]
+        report = import_csv(_csv(*rows), batch_size=10)
+        assert report.imported == 25
+        assert db.query(GuestbookEntry).count() == 25
+        assert report.rows_per_second > 0
+
+    def test_offset_dates_stored_as_utc(self, db):
+        report = import_csv(_csv(
+            '"","OE8XBB","Mit Zeitzone","2024-01-01T19:00:00","2024-01-01T20:00:00+01:00"\n',
+            '"","OE1ABC","Ohne Zeitzone","2024-01-01T19:00:00","2024-01-01T19:30:00"\n',
+        ))
+        assert report.imported == 2
+        stored = dict(db.query(GuestbookEntry.callsign, GuestbookEntry.created_at))
+        assert stored == {"OE8XBB": datetime(2024, 1, 1, 19, 0), "OE1ABC": datetime(2024, 1, 1, 19, 30)}
+
+    def test_missing_columns(self, db):
+        with pytest.raises(ValueError):
+            import_csv(io.StringIO("Name,Text\na,b\n"))
+
+
+class TestImportInterfaces:
+    """Test the admin endpoint and CLI."""
+
+    def test_admin_endpoint(self, client, db):
+        data = HEADER + '"","OE8XBB","Hallo","2024-01-01T19:00:00",""\n'
+        response = client.post(
+            f"/admin/import/csv?token={ADMIN_TOKEN}",
+            files={"file": ("log.csv", data.encode("utf-8"), "text/csv")},
+        )
+        assert response.status_code == 200
+        assert response.json()["imported"] == 1
+
+    def test_admin_endpoint_requires_token(self, client, db):
+        response = client.post("/admin/import/csv", files={"file": ("log.csv", b"", "text/csv")})
+        assert response.status_code == 401
+
+    def test_admin_endpoint_bad_header(self, client, db):
+        response = client.post(
+            f"/admin/import/csv?token={ADMIN_TOKEN}",
+            files={"file": ("log.csv", b"a,b\n1,2\n", "text/csv")},
+        )
+        assert response.status_code == 400
+
+    def test_cli(self, db, tmp_path, capsys):
+        path = tmp_path / "log.csv"
+        path.write_text(HEADER + '"","OE8XBB","Hallo","2024-01-01T19:00:00",""\n', encoding="utf-8")
+        assert main(["import-csv", str(path)]) == 0
+        assert "1 importiert" in capsys.readouterr().out
+
+
+class TestCheckin:
+    """Test check-in batches for net control."""
+
+    RUNDE = datetime(2024, 3, 1, 19, 0)
+
+    def test_per_row_results(self, db):
+        report = checkin_entries(self.RUNDE, [
+            ("OE1ABC", "73"),
+            ("x", "zu kurzes Rufzeichen"),
+            ("OE3DEF", "Siehe https://example.com"),
+            ("OE1ABC", "73"),
+            ("OE1ABC", "Nochmal 73"),
+        ])
+        result = report.as_dict()
+        assert (result["created"], result["duplicate"], result["rejected"]) == (2, 1, 2)
+        assert [r["status"] for r in result["results"]] == [
+            "created", "rejected", "rejected", "duplicate", "created",
+        ]
+        assert result["results"][2]["reason"] == "Enthält einen Link"
+
+        ids = [r["id"] for r in result["results"] if r["status"] == "created"]
+        stored = db.query(GuestbookEntry).order_by(GuestbookEntry.id).all()
+        assert [e.id for e in stored] == ids
+        assert {e.runde_datetime for e in stored} == {self.RUNDE}
+
+    def test_existing_entries_are_duplicates(self, db):
+        checkin_entries(self.RUNDE, [("OE1ABC", "73")])
+        report = checkin_entries(self.RUNDE, [("OE1ABC", "73"), ("OE2XYZ", "73")])
+        assert [r.status for r in report.results] == ["duplicate", "created"]
+        # Another runde is not a duplicate
+        later = checkin_entries(datetime(2024, 3, 8, 19, 0), [("OE1ABC", "73")])
+        assert later.results[0].status == "created"
+
+    def test_admin_endpoint(self, client, db):
+        before = event_hub.published
+        response = client.post(
+            f"/admin/checkin?token={ADMIN_TOKEN}",
+            json={
+                "runde_datetime": "2024-03-01T19:00:00",
+                "entries": [{"callsign": f"OE{i}ABC", "message": "73"} for i in range(40)],
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["created"] == 40
+        assert db.query(GuestbookEntry).count() == 40
+        assert event_hub.published == before + 40
+
+    def test_admin_endpoint_no_cooldown(self, client, db, monkeypatch):
+        monkeypatch.setattr(rate_limiter, "is_entry_cooldown_active", lambda ip: True)
+        for i in range(2):
+            response = client.post(
+                f"/admin/checkin?token={ADMIN_TOKEN}",
+                json={"runde_datetime": "2024-03-01T19:00:00", "entries": [{"callsign": f"OE{i}ABC", "message": "73"}]},
+            )
+            assert response.json()["created"] == 1
+
+    def test_admin_endpoint_requires_token(self, client, db):
+        response = client.post("/admin/checkin", json={"runde_datetime": "2024-03-01T19:00:00", "entries": []})
+        assert response.status_code == 401
+
+    def test_admin_endpoint_validates_body(self, client, db):
+        response = client.post(
+            f"/admin/checkin?token={ADMIN_TOKEN}",
+            json={"runde_datetime": "2024-03-01T19:00:00", "entries": []},
+        )
+        assert response.status_code == 422
@@ -0,0 +1,125 @@
+"""
+gbHam Migration Tests
+Upgrading databases created by older releases.
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app.database import create_sqlite_engine
+from app.migrations import MIGRATIONS, create_index_online, current_version, dry_run, run_migrations
+
+LATEST = MIGRATIONS[-1].version
+
+# Schema as created by gbHam 1.0.0
+LEGACY_SCHEMA = """
+CREATE TABLE guestbook_entries (
+    id INTEGER NOT NULL PRIMARY KEY,
+    callsign VARCHAR(15) NOT NULL,
+    message VARCHAR(300) NOT NULL,
+    runde_datetime DATETIME NOT NULL,
+    created_at DATETIME NOT NULL
+);
+CREATE INDEX ix_guestbook_entries_id ON guestbook_entries (id);
+CREATE INDEX ix_guestbook_entries_callsign ON guestbook_entries (callsign);
+CREATE INDEX ix_guestbook_entries_runde_datetime ON guestbook_entries (runde_datetime);
+CREATE INDEX ix_guestbook_entries_created_at ON guestbook_entries (created_at);
+CREATE TABLE app_settings (
+    id INTEGER NOT NULL PRIMARY KEY,
+    key VARCHAR(50) NOT NULL,
+    value VARCHAR(255) NOT NULL
+);
+CREATE TABLE readonly_mode (
+    id INTEGER NOT NULL PRIMARY KEY,
+    enabled BOOLEAN NOT NULL
+);
+INSERT INTO guestbook_entries (callsign, message, runde_datetime, created_at)
+VALUES ('OE8XBB', '73', '2023-05-01 19:00:00', '2023-05-01 19:05:00'),
+       ('OE8JOTA', 'Grüße', '2023-05-01 19:00:00', '2023-05-01 19:06:00');
+"""
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    return str(path)
+
+
+def _index_names(engine):
+    return {index["name"] for index in inspect(engine).get_indexes("guestbook_entries")}
+
+
+def test_upgrade_legacy_database(legacy_db):
+    engine = create_sqlite_engine(f"sqlite:///{legacy_db}")
+    reports = run_migrations(engine)
+
+    assert [r.version for r in reports] == [m.version for m in MIGRATIONS]
+    assert current_version(engine) == LATEST
+    indexes = _index_names(engine)
+    assert "ix_guestbook_entries_created_at_id" in indexes
+    assert "ix_guestbook_entries_runde_callsign" in indexes
+    assert "ix_guestbook_entries_created_at" not in indexes
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT total FROM entry_count")).scalar() == 2
+    engine.dispose()
+
+
+def test_migrations_run_once(legacy_db):
+    engine = create_sqlite_engine(f"sqlite:///{legacy_db}")
+    run_migrations(engine)
+    assert run_migrations(engine) == []
+    engine.dispose()
+
+
+def test_dry_run_leaves_original_untouched(legacy_db):
+    reports = dry_run(legacy_db)
+
+    assert [r.version for r in reports] == [m.version for m in MIGRATIONS]
+    assert all(r.seconds >= 0 for r in reports)
+    engine = create_sqlite_engine(f"sqlite:///{legacy_db}")
+    assert "ix_guestbook_entries_created_at_id" not in _index_names(engine)
+    engine.dispose()
+
+
+class _RecordingConnection:
+    """Stands in for a PostgreSQL connection; records the SQL it is given."""
+
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self, invalid: bool = False):
+        self.invalid = invalid
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return SimpleNamespace(first=lambda: (1,) if self.invalid else None)
+
+
+def test_postgres_indexes_are_built_concurrently():
+    connection = _RecordingConnection()
+    create_index_online(connection, "ix_test", "guestbook_entries", ["created_at", "id"])
+    assert connection.statements[-1] == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_test ON guestbook_entries (created_at, id)"
+    )
+    assert not any("DROP" in statement for statement in connection.statements)
+
+
+def test_postgres_invalid_index_is_rebuilt():
+    connection = _RecordingConnection(invalid=True)
+    create_index_online(connection, "ix_test", "guestbook_entries", ["(lower(callsign))"], using="GIN")
+    assert connection.statements[1:] == [
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_test",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_test ON guestbook_entries USING GIN ((lower(callsign)))",
+    ]
+
+
+def test_index_steps_are_online():
+    online = {m.version for m in MIGRATIONS if m.online}
+    assert online == {2, 3, 6}
+
@@ -0,0 +1,126 @@
+"""
+gbHam Page Cache Tests
+LRU/TTL behaviour and invalidation of the cached index page.
+"""
+
+import os
+import time
+from datetime import datetime
+
+from app.models import GuestbookEntry
+from app.page_cache import PageCache, page_cache
+
+ADMIN_TOKEN = os.environ["ADMIN_TOKEN"]
+
+
+class TestPageCache:
+    """Test the cache itself."""
+
+    def test_hit_and_miss_counters(self):
+        cache = PageCache(max_entries=4, ttl=60)
+        assert cache.get("a") is None
+        cache.put("a", b"page")
+        assert cache.get("a") == b"page"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self):
+        cache = PageCache(max_entries=2, ttl=60)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert len(cache) == 2
+
+    def test_ttl(self):
+        cache = PageCache(max_entries=2, ttl=0.01)
+        cache.put("a", b"1")
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_disabled(self):
+        cache = PageCache(max_entries=0, ttl=60)
+        cache.put("a", b"1")
+        assert cache.get("a") is None
+
+
+class TestIndexCaching:
+    """Test caching of the index page."""
+
+    def test_second_request_is_a_hit(self, client, make_entries):
+        make_entries(3)
+        first = client.get("/")
+        second = client.get("/")
+        assert first.headers["X-Page-Cache"] == "miss"
+        assert second.headers["X-Page-Cache"] == "hit"
+        assert first.text == second.text
+
+    def test_new_entry_invalidates(self, client, make_entries):
+        client.get("/")
+        response = client.post(
+            "/api/entries",
+            data={"callsign": "OE8XBB", "message": "Neu im Cache", "runde_datetime": "2024-01-01T19:00"},
+            follow_redirects=False,
+        )
+        assert response.status_code == 303
+        page = client.get("/")
+        assert page.headers["X-Page-Cache"] == "miss"
+        assert "Neu im Cache" in page.text
+
+    def test_write_from_other_process_is_a_miss(self, client, db, make_entries):
+        make_entries(2)
+        first = client.get("/")
+        assert client.get("/").headers["X-Page-Cache"] == "hit"
+
+        # As from another worker or the CLI import: content_version is not bumped
+        db.add(GuestbookEntry(
+            callsign="OE8XBB", message="Von nebenan", runde_datetime=datetime(2024, 1, 1, 19, 0),
+        ))
+        db.commit()
+
+        page = client.get("/")
+        assert page.headers["X-Page-Cache"] == "miss"
+        assert page.headers["ETag"] != first.headers["ETag"]
+        assert "Von nebenan" in page.text
+        again = client.get("/", headers={"If-None-Match": page.headers["ETag"]})
+        assert again.status_code == 304
+
+    def test_admin_delete_invalidates(self, client, db, make_entries):
+        entry_id = make_entries(2)[1].id
+        db.rollback()  # release the writer connection for the admin route
+        assert "Eintrag 1" in client.get("/").text
+        client.post(f"/admin/delete/{entry_id}?token={ADMIN_TOKEN}", follow_redirects=False)
+        assert "Eintrag 1" not in client.get("/").text
+
+    def test_readonly_toggle_invalidates(self, client, make_entries):
+        before = client.get("/").text
+        client.post(f"/admin/readonly/toggle?token={ADMIN_TOKEN}", follow_redirects=False)
+        after = client.get("/")
+        assert after.headers["X-Page-Cache"] == "miss"
+        assert after.text != before
+
+    def test_flash_messages_vary(self, client, make_entries):
+        plain = client.get("/")
+        success = client.get("/?success=1")
+        assert success.text != plain.text
+        assert client.get("/").headers["X-Page-Cache"] == "hit"
+
+    def test_cooldown_bypasses_cache(self, client, make_entries):
+        first = client.get("/?error=cooldown&remaining=42")
+        second = client.get("/?error=cooldown&remaining=17")
+        assert first.headers["X-Page-Cache"] == "bypass"
+        assert "17" in second.text
+
+    def test_language_cookie_set_on_hit(self, client, make_entries):
+        client.get("/?lang=en")
+        client.cookies.clear()
+        response = client.get("/?lang=en")
+        assert response.headers["X-Page-Cache"] == "hit"
+        assert "gbham_lang=en" in response.headers["set-cookie"]
+
+    def test_language_cookie_varies(self, client, make_entries):
+        english = client.get("/", cookies={"gbham_lang": "en"})
+        german = client.get("/", cookies={"gbham_lang": "de"})
+        assert english.text != german.text
+        page_cache.clear()
@@ -0,0 +1,107 @@
+"""
+gbHam Pagination Tests
+Keyset cursors for the index page and the JSON API.
+"""
+
+import base64
+import re
+
+import pytest
+
+from app.pagination import Cursor
+from app.routes import pages
+
+
+class TestCursor:
+    """Test cursor token encoding."""
+
+    def test_roundtrip(self, make_entries):
+        entry = make_entries(1)[0]
+        cursor = Cursor.decode(Cursor.for_entry(entry, page=3).encode())
+        assert (cursor.created_at, cursor.id, cursor.page) == (entry.created_at, entry.id, 3)
+
+    @pytest.mark.parametrize("token", ["", "not-a-cursor", "!!!", "MjAyNHwx"])
+    def test_malformed_rejected(self, token: str):
+        with pytest.raises(ValueError):
+            Cursor.decode(token)
+
+
+class TestApiPagination:
+    """Test cursor pagination on /api/entries."""
+
+    def test_walk_all_pages(self, client, make_entries):
+        make_entries(25)
+        seen = []
+        url = "/api/entries?limit=10"
+        while url:
+            response = client.get(url)
+            seen.extend(e["message"] for e in response.json())
+            url = response.links.get("next", {}).get("url")
+        assert seen == [f"Eintrag {i}" for i in range(24, -1, -1)]
+
+    def test_prev_link_returns_previous_page(self, client, make_entries):
+        make_entries(25)
+        first = client.get("/api/entries?limit=10").json()
+        second = client.get("/api/entries?limit=10").links["next"]["url"]
+        back = client.get(second).links["prev"]["url"]
+        assert client.get(back).json() == first
+
+    def test_oversized_cursor_is_rejected(self, client, make_entries):
+        make_entries(3)
+        for raw in (b"2024-01-01T00:00:00|99999999999999999999999|1", b"2024-01-01T00:00:00|1|9223372036854775808"):
+            token = base64.urlsafe_b64encode(raw).decode().rstrip("=")
+            assert client.get(f"/api/entries?before={token}").status_code == 400
+        assert client.get(f"/?before={token}", follow_redirects=False).status_code == 302
+
+    def test_offset_redirects_to_cursor(self, client, make_entries):
+        make_entries(25)
+        response = client.get("/api/entries?limit=10&offset=10", follow_redirects=False)
+        assert response.status_code == 307
+        assert "before=" in response.headers["location"]
+        messages = [e["message"] for e in client.get("/api/entries?limit=10&offset=10").json()]
+        assert messages == [f"Eintrag {i}" for i in range(14, 4, -1)]
+
+    def test_offset_past_end_is_empty(self, client, make_entries):
+        make_entries(5)
+        assert client.get("/api/entries?offset=50").json() == []
+
+
+class TestIndexPagination:
+    """Test cursor pagination on the index page."""
+
+    def test_page_param_redirects_to_cursor(self, client, make_entries):
+        make_entries(40)
+        response = client.get("/?page=2&lang=en", follow_redirects=False)
+        assert response.status_code == 302
+        assert "before=" in response.headers["location"]
+
+    def test_redirected_page_shows_matching_entries(self, client, make_entries):
+        make_entries(40)
+        html = client.get("/?page=2&lang=en").text
+        assert "Eintrag 24" in html
+        assert "Eintrag 25" not in html
+        assert "Page 2 of 3" in html
+
+    def test_last_page_link_uses_cursor(self, client, make_entries, monkeypatch):
+        make_entries(40)
+        html = client.get("/?lang=en").text
+        last = re.search(r'href="(/\?after=[\w-]+&lang=en)" class="pagination-btn pagination-last"', html)
+        assert last is not None
+
+        calls = []
+        monkeypatch.setattr(pages, "cursor_for_offset", lambda *args: calls.append(args))
+        response = client.get(last.group(1), follow_redirects=False)
+        assert response.status_code == 200
+        assert not calls
+
+        html = response.text
+        assert [f"Eintrag {i}" in html for i in (9, 10)] == [True, False]
+        assert "Page 3 of 3" in html
+        assert 'pagination-next disabled' in html
+
+        # Stepping back lines up with the pages counted from the top
+        prev = re.search(r'href="/\?after=([\w-]+)&lang=en" class="pagination-btn pagination-prev"', html)
+        html = client.get(f"/?after={prev.group(1)}&lang=en").text
+        assert "Eintrag 10" in html and "Eintrag 24" in html
+        assert "Eintrag 9" not in html and "Eintrag 25" not in html
+        assert "Page 2 of 3" in html
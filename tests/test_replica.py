@@ -0,0 +1,147 @@
+"""
+gbHam Replica Tests
+Snapshot publishing, reader refresh and bounded staleness.
+"""
+
+import os
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.config import get_settings
+from app.models import GuestbookEntry
+from app.replica import STALENESS_HEADER, ReplicaPublisher, ReplicaReader, replica_reader
+
+settings = get_settings()
+
+pytestmark = pytest.mark.sqlite_only
+
+
+@pytest.fixture
+def replica(tmp_path, db):
+    """Publisher and reader on a replica of the test database."""
+    path = str(tmp_path / "replica.db")
+    publisher = ReplicaPublisher(
+        source_path=make_url(settings.DATABASE_URL).database,
+        replica_path=path,
+        interval=60,
+        max_writes=10,
+    )
+    reader = ReplicaReader(replica_path=path, max_staleness=30)
+    yield publisher, reader
+    reader.dispose()
+    if publisher._source is not None:
+        publisher._source.close()
+    if publisher._lock_file is not None:
+        publisher._lock_file.close()
+
+
+def _count(reader):
+    session, _ = reader.session()
+    try:
+        return session.query(GuestbookEntry).count()
+    finally:
+        session.close()
+
+
+class TestPublisher:
+    """Test snapshot publishing."""
+
+    def test_publishes_snapshot(self, replica, make_entries):
+        publisher, reader = replica
+        make_entries(3)
+        assert publisher.publish_if_changed()
+        assert _count(reader) == 3
+
+    def test_unchanged_database_is_not_copied(self, replica, make_entries):
+        publisher, reader = replica
+        make_entries(1)
+        publisher.publish_if_changed()
+        inode = os.stat(publisher.replica_path).st_ino
+        assert not publisher.publish_if_changed()
+        assert os.stat(publisher.replica_path).st_ino == inode
+
+    def test_snapshot_uses_rollback_journal(self, replica, make_entries):
+        publisher, reader = replica
+        make_entries(1)
+        publisher.publish_if_changed()
+        session, _ = reader.session()
+        try:
+            assert session.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        finally:
+            session.close()
+
+
+class TestReader:
+    """Test reading from snapshots."""
+
+    def test_writes_appear_after_next_publish(self, replica, make_entries):
+        publisher, reader = replica
+        make_entries(2)
+        publisher.publish_if_changed()
+        assert _count(reader) == 2
+
+        make_entries(3, start=datetime(2024, 2, 1))
+        assert _count(reader) == 2
+        publisher.publish_if_changed()
+        assert _count(reader) == 5
+
+    def test_missing_replica(self, tmp_path):
+        reader = ReplicaReader(replica_path=str(tmp_path / "missing.db"))
+        assert reader.session() == (None, None)
+        assert reader.staleness() is None
+
+    def test_stale_replica_is_not_used(self, replica, make_entries):
+        publisher, reader = replica
+        make_entries(1)
+        publisher.publish_if_changed()
+        old = time.time() - 120
+        os.utime(publisher.replica_path, (old, old))
+        assert reader.session() == (None, None)
+
+    def test_touch_keeps_unchanged_replica_fresh(self, replica, make_entries):
+        publisher, reader = replica
+        make_entries(1)
+        publisher.publish_if_changed()
+        old = time.time() - 120
+        os.utime(publisher.replica_path, (old, old))
+        publisher.publish_if_changed()
+        assert reader.staleness() < 5
+
+
+class TestRoutes:
+    """Test replica use by GET routes."""
+
+    def test_staleness_header(self, client, monkeypatch, replica, make_entries):
+        publisher, reader = replica
+        make_entries(2)
+        publisher.publish_if_changed()
+        monkeypatch.setattr(settings, "REPLICA_ENABLED", True)
+        monkeypatch.setattr(replica_reader, "replica_path", publisher.replica_path)
+
+        make_entries(1, start=datetime(2024, 3, 1))
+        response = client.get("/api/entries")
+        assert len(response.json()) == 2
+        assert float(response.headers[STALENESS_HEADER]) < 5
+        replica_reader.dispose()
+
+    def test_after_posting_reads_live_database(self, client, monkeypatch, replica, make_entries):
+        publisher, reader = replica
+        make_entries(2)
+        publisher.publish_if_changed()
+        monkeypatch.setattr(settings, "REPLICA_ENABLED", True)
+        monkeypatch.setattr(replica_reader, "replica_path", publisher.replica_path)
+
+        make_entries(1, start=datetime(2024, 3, 1))
+        response = client.get("/?success=1")
+        assert response.headers[STALENESS_HEADER] == "0.0"
+        replica_reader.dispose()
+
+    def test_disabled_replica_reads_live_database(self, client, make_entries):
+        make_entries(1)
+        response = client.get("/api/entries")
+        assert len(response.json()) == 1
+        assert response.headers[STALENESS_HEADER] == "0.0"
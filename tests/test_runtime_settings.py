@@ -0,0 +1,84 @@
+"""
+gbHam Runtime Settings Tests
+Cached read-only flag and cross-process change detection.
+"""
+
+import threading
+
+from sqlalchemy import event
+
+from app.database import read_engine
+from app.runtime_settings import RuntimeSettings, runtime_settings
+
+TOKEN = "test-admin-token"
+
+
+def test_toggle_updates_cache(client):
+    client.post(f"/admin/readonly/toggle?token={TOKEN}")
+    assert runtime_settings.readonly is True
+
+    response = client.post(
+        "/api/entries",
+        data={"callsign": "OE8XBB", "message": "73", "runde_datetime": "2024-03-01T19:00"},
+        follow_redirects=False,
+    )
+    assert response.headers["location"] == "/?error=readonly"
+
+
+def test_other_process_notices_change(db):
+    other = RuntimeSettings(refresh_interval=0)
+    other.load(db)
+    version = other.version
+
+    runtime_settings.toggle_readonly(db)
+
+    other.refresh(db)
+    assert other.readonly is True
+    assert other.version == version + 1
+
+
+def test_no_settings_query_per_request(client):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(read_engine, "before_cursor_execute", record)
+    try:
+        for _ in range(5):
+            client.get("/")
+    finally:
+        event.remove(read_engine, "before_cursor_execute", record)
+
+    assert not [s for s in statements if "readonly_mode" in s or "app_settings" in s]
+
+
+def test_set_value(db):
+    runtime_settings.set(db, "motd", "Runde heute auf 145.500")
+    assert runtime_settings.get("motd") == "Runde heute auf 145.500"
+
+
+def test_one_thread_refreshes_at_a_time(db, monkeypatch):
+    other = RuntimeSettings(refresh_interval=0)
+    other.load(db)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_refresh(session):
+        calls.append(session)
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(other, "refresh", slow_refresh)
+    checking = threading.Thread(target=other._refresh_with_own_session)
+    checking.start()
+    assert started.wait(5)
+
+    # Returns right away with the cached state instead of checking as well
+    other._refresh_with_own_session()
+    assert len(calls) == 1
+
+    release.set()
+    checking.join(5)
+    other._refresh_with_own_session()
+    assert len(calls) == 2
@@ -0,0 +1,100 @@
+"""
+gbHam Search Tests
+FTS5 index sync, query escaping and ranked pagination.
+"""
+
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.models import GuestbookEntry
+from app.search import build_match_query, build_tsquery, search_entries
+
+
+def _add(db, callsign, message):
+    entry = GuestbookEntry(callsign=callsign, message=message, runde_datetime=datetime(2024, 1, 1))
+    db.add(entry)
+    db.commit()
+    return entry
+
+
+class TestMatchQuery:
+    """Test conversion of user input to FTS5 syntax."""
+
+    def test_terms_quoted_as_prefix(self):
+        assert build_match_query("OE8 Villach") == '"OE8"* "Villach"*'
+
+    def test_tsquery_terms_quoted_as_prefix(self):
+        assert build_tsquery("OE8 d'Villach") == "'OE8':* & 'd''Villach':*"
+
+    @pytest.mark.parametrize("text", ['"', "NEAR(a b)", "a OR b", "col:value", "*"])
+    def test_operators_are_literal(self, db, text):
+        # Must not raise an FTS5 syntax error
+        search_entries(db, text)
+
+    def test_control_characters_are_dropped(self, client, db):
+        _add(db, "OE8XBB", "Grüße vom Dobratsch")
+        assert build_match_query("Dob\x00rat\x1b") == '"Dobrat"*'
+        assert build_tsquery("a\x00b") == "'ab':*"
+        assert build_match_query("\x00\x01") is None
+
+        response = client.get("/api/search", params={"q": "Dob\x00ratsch"})
+        assert response.status_code == 200
+        assert [e["callsign"] for e in response.json()] == ["OE8XBB"]
+        assert client.get("/api/search", params={"q": "\x00"}).json() == []
+
+    def test_empty_query(self, db):
+        assert build_match_query("   ") is None
+        assert search_entries(db, "").items == []
+
+
+class TestSearch:
+    """Test search results."""
+
+    def test_finds_message_and_callsign(self, db):
+        _add(db, "OE8XBB", "Grüße vom Dobratsch")
+        _add(db, "OE1ABC", "Schöne Runde")
+        assert [e.callsign for e in search_entries(db, "dobratsch").items] == ["OE8XBB"]
+        assert [e.callsign for e in search_entries(db, "oe1").items] == ["OE1ABC"]
+
+    @pytest.mark.sqlite_only
+    def test_diacritics_ignored(self, db):
+        _add(db, "OE8XBB", "Grüße aus Kärnten")
+        assert len(search_entries(db, "karnten").items) == 1
+
+    def test_deleted_entries_disappear(self, db):
+        entry = _add(db, "OE8XBB", "Relais Gerlitzen")
+        db.delete(entry)
+        db.commit()
+        assert search_entries(db, "gerlitzen").items == []
+
+    def test_ranked_pagination_is_complete(self, db):
+        for i in range(25):
+            _add(db, f"OE{i % 10}AB", "Runde " + "Relais " * (i % 4 + 1))
+        seen, cursor = [], None
+        while True:
+            page = search_entries(db, "relais", limit=10, cursor=cursor)
+            seen.extend(e.id for e in page.items)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        assert len(seen) == len(set(seen)) == 25
+
+    def test_api_endpoint(self, client, db):
+        _add(db, "OE8XBB", "Funkrunde Villach")
+        response = client.get("/api/search?q=villach")
+        assert [e["callsign"] for e in response.json()] == ["OE8XBB"]
+
+    def test_oversized_cursor_is_rejected(self, client, db):
+        _add(db, "OE8XBB", "Funkrunde Villach")
+        token = base64.urlsafe_b64encode(b"-1.0|99999999999999999999999").decode().rstrip("=")
+        response = client.get(f"/api/search?q=villach&cursor={token}")
+        assert response.status_code == 400
+
+    def test_admin_search_box(self, client, db):
+        _add(db, "OE8XBB", "Funkrunde Villach")
+        _add(db, "OE1ABC", "Wien")
+        html = client.get("/admin?token=test-admin-token&q=villach").text
+        assert "OE8XBB" in html
+        assert "OE1ABC" not in html
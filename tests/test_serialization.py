@@ -0,0 +1,64 @@
+"""
+gbHam Serialization Tests
+The fast JSON path must match the Pydantic response model.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app import serialization
+from app.models import GuestbookEntry
+from app.schemas import GuestbookEntryResponse
+from app.serialization import ENTRY_COLUMNS, entries_to_json
+
+
+def _pydantic_json(entries) -> list:
+    return jsonable_encoder([GuestbookEntryResponse.model_validate(e) for e in entries])
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestEntriesJson:
+    """Test the fast path against the Pydantic path."""
+
+    def test_same_output_as_response_model(self, db, encoder):
+        db.add_all([
+            GuestbookEntry(
+                callsign="OE8XBB", message="Grüße aus Kärnten \"73\"",
+                runde_datetime=datetime(2024, 1, 1, 19, 0),
+                created_at=datetime(2024, 1, 1, 19, 5, 30, 123400),
+            ),
+            GuestbookEntry(
+                callsign="S51AB", message="Lep pozdrav",
+                runde_datetime=datetime(2024, 1, 1, 19, 0),
+                created_at=datetime(2024, 1, 1, 19, 6),
+            ),
+        ])
+        db.commit()
+        entries = db.query(GuestbookEntry).order_by(GuestbookEntry.id).all()
+        rows = db.query(*ENTRY_COLUMNS).order_by(GuestbookEntry.id).all()
+        body = entries_to_json(rows)
+        assert json.loads(body) == _pydantic_json(entries)
+        assert "Grüße".encode("utf-8") in body
+
+    def test_utc_datetimes_use_z(self, encoder):
+        row = (1, "OE1ABC", "x", datetime(2024, 1, 1, 19, 0), datetime(2024, 1, 1, tzinfo=timezone.utc))
+        assert json.loads(entries_to_json([row]))[0]["created_at"] == "2024-01-01T00:00:00Z"
+
+    def test_api_shape(self, client, make_entries):
+        make_entries(3)
+        response = client.get("/api/entries?limit=2")
+        assert response.headers["Content-Type"] == "application/json"
+        assert list(response.json()[0]) == list(GuestbookEntryResponse.model_fields)
+        assert 'rel="next"' in response.headers["Link"]
+        assert "ETag" in response.headers
@@ -0,0 +1,71 @@
+"""
+gbHam Static Pages Tests
+Pre-rendered privacy and imprint pages.
+"""
+
+import gzip
+
+from app.config import get_settings
+from app.routes.pages import static_pages
+from app.static_pages import StaticPageCache
+
+settings = get_settings()
+
+
+class TestStaticPageCache:
+    """Test rendering and caching."""
+
+    def test_rendered_once_per_language(self):
+        cache = StaticPageCache(static_pages.env)
+        cache.prerender()
+        renders = cache.renders
+        assert renders == 8
+        cache.get("privacy", "en")
+        assert cache.renders == renders
+
+    def test_gzip_variant(self):
+        cache = StaticPageCache(static_pages.env)
+        page = cache.get("imprint", "de")
+        encoding, body = page.content.select("gzip")
+        assert encoding == "gzip"
+        assert gzip.decompress(body) == page.content.body
+
+    def test_served_from_memory_after_render(self, monkeypatch):
+        cache = StaticPageCache(static_pages.env)
+        before = cache.get("imprint", "de")
+        # Settings are fixed per process; a lookup does not look at them again
+        monkeypatch.setattr(settings, "OPERATOR_NAME", "Erika Musterfrau")
+        assert cache.get("imprint", "de") is before
+        assert cache.renders == 1
+
+        fresh = StaticPageCache(static_pages.env).get("imprint", "de")
+        assert b"Erika Musterfrau" in fresh.content.body
+
+
+class TestStaticPageRoutes:
+    """Test the served responses."""
+
+    def test_gzip_served(self, client):
+        response = client.get("/privacy?lang=en", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert "max-age" in response.headers["Cache-Control"]
+        assert settings.OPERATOR_CALLSIGN in response.text
+
+    def test_identity_served(self, client):
+        response = client.get("/imprint", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response.headers
+
+    def test_not_modified(self, client):
+        first = client.get("/imprint?lang=it")
+        second = client.get("/imprint?lang=it", headers={"If-None-Match": first.headers["ETag"]})
+        assert second.status_code == 304
+        assert second.content == b""
+
+    def test_languages_differ(self, client):
+        de = client.get("/privacy?lang=de")
+        en = client.get("/privacy?lang=en")
+        assert de.headers["ETag"] != en.headers["ETag"]
+        assert en.cookies.get("gbham_lang") == "en"
@@ -0,0 +1,65 @@
+"""
+gbHam NDJSON Stream Tests
+Full-history streaming through /api/entries/stream.
+"""
+
+import json
+from datetime import datetime
+
+from app.database import ReadSessionLocal
+from app.routes import guestbook
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestEntryStream:
+    """Test the NDJSON endpoint."""
+
+    def test_streams_everything_oldest_first(self, client, make_entries, monkeypatch):
+        monkeypatch.setattr(guestbook, "STREAM_CHUNK_SIZE", 7)
+        make_entries(25)
+        response = client.get("/api/entries/stream")
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        entries = _lines(response)
+        assert [e["message"] for e in entries] == [f"Eintrag {i}" for i in range(25)]
+        assert set(entries[0]) == {"id", "callsign", "message", "runde_datetime", "created_at"}
+
+    def test_since_and_until(self, client, make_entries):
+        make_entries(10, start=datetime(2024, 1, 1, 19, 0))
+        response = client.get(
+            "/api/entries/stream",
+            params={"since": "2024-01-01T19:03:00", "until": "2024-01-01T19:06:00"},
+        )
+        assert [e["message"] for e in _lines(response)] == ["Eintrag 3", "Eintrag 4", "Eintrag 5"]
+
+    def test_timezone_aware_bounds(self, client, make_entries):
+        make_entries(10, start=datetime(2024, 1, 1, 19, 0))
+        response = client.get("/api/entries/stream", params={"since": "2024-01-01T20:08:00+01:00"})
+        assert [e["message"] for e in _lines(response)] == ["Eintrag 8", "Eintrag 9"]
+
+    def test_empty(self, client, db):
+        response = client.get("/api/entries/stream")
+        assert response.status_code == 200
+        assert response.text == ""
+
+    def test_session_per_chunk(self, make_entries, monkeypatch):
+        monkeypatch.setattr(guestbook, "STREAM_CHUNK_SIZE", 10)
+        make_entries(25)
+        sessions = []
+
+        def session_factory():
+            session = ReadSessionLocal()
+            sessions.append(session)
+            return session
+
+        monkeypatch.setattr(guestbook, "ReadSessionLocal", session_factory)
+        chunks = []
+        for chunk in guestbook.iter_entries_ndjson():
+            # No connection is held while the client reads
+            assert all(not session.in_transaction() for session in sessions)
+            chunks.append(chunk)
+        assert [chunk.count(b"\n") for chunk in chunks] == [10, 10, 5]
+        assert len(sessions) == 3
+
@@ -0,0 +1,39 @@
+"""
+gbHam Templating Tests
+Shared environment, bytecode cache and precompilation.
+"""
+
+import os
+
+from app import main
+from app.routes import admin, pages
+from app.templating import create_environment, precompile, templates
+
+
+class TestTemplating:
+    """Test the shared template environment."""
+
+    def test_single_environment(self):
+        assert main.templates is pages.templates is admin.templates is templates
+        assert pages.static_pages.env is templates.env
+
+    def test_auto_reload_off_by_default(self):
+        assert templates.env.auto_reload is False
+
+    def test_bytecode_cache_written_and_reused(self, tmp_path):
+        precompile(create_environment(cache_dir=str(tmp_path)))
+        cached = os.listdir(tmp_path)
+        assert len(cached) >= len(templates.env.list_templates())
+
+        env = create_environment(cache_dir=str(tmp_path))
+        precompile(env)
+        assert sorted(os.listdir(tmp_path)) == sorted(cached)
+        assert "static_url" in env.globals
+
+    def test_cache_can_be_disabled(self):
+        assert create_environment(cache_dir="").bytecode_cache is None
+
+    def test_precompile_loads_all_templates(self):
+        env = create_environment(cache_dir="")
+        precompile(env)
+        assert len(env.cache) == len(env.list_templates(extensions=["html"]))
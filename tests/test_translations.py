@@ -0,0 +1,55 @@
+"""
+gbHam Translation Tests
+Compiled catalogs, placeholders, fallbacks and external catalog files.
+"""
+
+import json
+
+from app.translations import (
+    BUILTIN_LANGUAGES,
+    TRANSLATIONS,
+    Catalogs,
+    Translator,
+    compile_message,
+    format_message,
+    get_translation,
+)
+
+
+class TestCompiledCatalogs:
+    """Test lookups against the source dictionary."""
+
+    def test_every_key_matches_source(self):
+        for lang in BUILTIN_LANGUAGES:
+            translator = Translator(lang)
+            for key, texts in TRANSLATIONS.items():
+                assert translator(key) == (texts.get(lang) or texts["de"])
+
+    def test_placeholders(self):
+        assert get_translation("error_cooldown", "en", 42) == "Please wait 42 more seconds between entries."
+        message = compile_message("{0} und {1}, {0}")
+        assert format_message(message, ("A", "B")) == "A und B, A"
+        assert format_message(message, ("A",)) == "A und {1}, A"
+
+    def test_fallbacks(self):
+        assert get_translation("entries", "xx") == get_translation("entries", "de")
+        assert get_translation("gibt_es_nicht", "en") == "gibt_es_nicht"
+        assert Translator("xx").lang == "de"
+
+
+class TestExternalCatalogs:
+    """Test catalogs loaded from files."""
+
+    def test_new_language_loaded_lazily(self, tmp_path):
+        (tmp_path / "hr.json").write_text(json.dumps({"entries": "Unosi"}), encoding="utf-8")
+        catalogs = Catalogs({"entries": {"de": "Einträge"}, "nav": {"de": "Navigation"}}, str(tmp_path))
+        assert catalogs.external_languages() == ["hr"]
+        assert catalogs._tables == {}
+        table = catalogs.table("hr")
+        assert table == {"entries": "Unosi", "nav": "Navigation"}
+
+    def test_file_overrides_builtin_text(self, tmp_path):
+        (tmp_path / "en.json").write_text(json.dumps({"entries": "Log {0}"}), encoding="utf-8")
+        catalogs = Catalogs({"entries": {"de": "Einträge", "en": "Entries"}}, str(tmp_path))
+        assert format_message(catalogs.table("en")["entries"], (3,)) == "Log 3"
+        assert catalogs.table("de")["entries"] == "Einträge"
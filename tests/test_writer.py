@@ -0,0 +1,79 @@
+"""
+gbHam Entry Writer Tests
+Group commit of concurrent entry submissions.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.counters import get_entry_count
+from app.models import GuestbookEntry
+from app.writer import EntryWriter
+
+
+def _entry(i: int) -> GuestbookEntry:
+    return GuestbookEntry(
+        callsign=f"OE{i % 10}XYZ",
+        message=f"Check-in {i}",
+        runde_datetime=datetime(2024, 3, 1, 19, 0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_share_commits(db):
+    writer = EntryWriter(batch_size=50, batch_delay=0.02)
+    entries = await asyncio.gather(*(writer.submit(_entry(i)) for i in range(40)))
+    await writer.stop()
+
+    assert len({entry.id for entry in entries}) == 40
+    assert writer.rows == 40
+    assert writer.batches < 40
+    assert get_entry_count(db) == 40
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limits_transaction(db):
+    writer = EntryWriter(batch_size=10, batch_delay=0.05)
+    await asyncio.gather(*(writer.submit(_entry(i)) for i in range(25)))
+    await writer.stop()
+    assert writer.batches >= 3
+
+
+@pytest.mark.asyncio
+async def test_failing_row_does_not_fail_batch(db):
+    writer = EntryWriter(batch_size=10, batch_delay=0.02)
+    broken = _entry(99)
+    broken.callsign = None  # violates NOT NULL
+    results = await asyncio.gather(
+        writer.submit(_entry(1)), writer.submit(broken), writer.submit(_entry(2)),
+        return_exceptions=True,
+    )
+    await writer.stop()
+
+    assert isinstance(results[1], Exception)
+    assert results[0].id and results[2].id
+    assert get_entry_count(db) == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queue(db):
+    writer = EntryWriter(batch_size=5, batch_delay=0.01)
+    pending = [asyncio.ensure_future(writer.submit(_entry(i))) for i in range(12)]
+    await asyncio.sleep(0)
+    await writer.stop()
+
+    assert all(task.done() for task in pending)
+    assert get_entry_count(db) == 12
+
+
+def test_post_entry_is_committed(client, db):
+    response = client.post(
+        "/api/entries",
+        data={"callsign": "OE8XBB", "message": "73 aus Villach", "runde_datetime": "2024-03-01T19:00"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert response.headers["location"] == "/?success=1"
+    assert db.query(GuestbookEntry).filter_by(callsign="OE8XBB").count() == 1